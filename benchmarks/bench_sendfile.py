@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""HLS segment gönderiminde sendfile ile kullanıcı alanı kopyalamanın CPU maliyetini karşılaştırır
+
+Sunucu ayrı bir süreçte çalışır; istemciler yerel döngü (loopback) üzerinden aynı segmenti
+paralel indirir. Sonuçta her mod için Gbit/s ve Gbit başına sunucu CPU süresi yazdırılır.
+
+Kullanım: python benchmarks/bench_sendfile.py [--size-mb 32] [--clients 8] [--total-gb 4]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def serve(mode, directory):
+    """Sunucu süreci: hazır olunca portu yazdırır, /__cpu isteğine CPU süresini döndürür"""
+    import iptv_manager
+
+    class BenchHandler(iptv_manager.HLSRequestHandler):
+        use_sendfile = mode == "sendfile"
+
+        def do_GET(self):
+            if self.path == "/__cpu":
+                times = os.times()
+                body = f"{times.user + times.system}".encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            super().do_GET()
+
+        def log_message(self, format, *args):
+            pass
+
+    # Önbellek kapalı: önbellekteki segmentler bellekten yazılır, sendfile hiç kullanılmazdı
+    runner = iptv_manager.ChannelRunner(directory, 0, iptv_manager.ChannelScheduler(1),
+                                        iptv_manager.FFmpegTelemetry(), cache_mb=0)
+    httpd = runner.create_http_server(BenchHandler, "127.0.0.1", max_workers=64)
+    print(httpd.server_address[1], flush=True)
+    httpd.serve_forever()
+
+
+def server_cpu(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", "/__cpu")
+    return float(conn.getresponse().read())
+
+
+def run_mode(mode, directory, size, clients, total_bytes):
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", mode, directory],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        port = int(proc.stdout.readline())
+        requests_per_client = max(1, total_bytes // size // clients)
+        errors = []
+
+        def client():
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            try:
+                for _ in range(requests_per_client):
+                    conn.request("GET", "/segment.ts")
+                    response = conn.getresponse()
+                    while response.read(1024 * 1024):
+                        pass
+            except Exception as e:
+                errors.append(e)
+
+        cpu_before = server_cpu(port)
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        cpu = server_cpu(port) - cpu_before
+
+        gbits = requests_per_client * clients * size * 8 / 1e9
+        return {
+            "mode": mode,
+            "gbit_per_s": gbits / elapsed,
+            "cpu_s_per_gbit": cpu / gbits,
+            "errors": len(errors)
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=32, help="Segment boyutu (MB)")
+    parser.add_argument("--clients", type=int, default=8, help="Paralel istemci sayısı")
+    parser.add_argument("--total-gb", type=float, default=4, help="Her mod için aktarılacak toplam veri (GB)")
+    parser.add_argument("--serve", nargs=2, metavar=("MODE", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    directory = tempfile.mkdtemp(prefix="iptv_bench_")
+    try:
+        size = args.size_mb * 1024 * 1024
+        with open(os.path.join(directory, "segment.ts"), "wb") as f:
+            f.write(os.urandom(size))
+
+        print(f"{'Mod':<10} {'Gbit/s':>8} {'CPU sn/Gbit':>12} {'Hata':>6}")
+        for mode in ("copy", "sendfile"):
+            result = run_mode(mode, directory, size, args.clients, int(args.total_gb * 1e9))
+            print(f"{result['mode']:<10} {result['gbit_per_s']:>8.2f} {result['cpu_s_per_gbit']:>12.3f} {result['errors']:>6}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
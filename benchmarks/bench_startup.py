@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Soğuk başlangıç süresini ölçer: modül içe aktarma, başsız komut ve arayüz hazırlığı
+
+Her ölçüm yeni bir Python sürecinde yapılır; sonuçta en iyi ve ortanca süreler ile
+`-X importtime` çıktısına göre en pahalı içe aktarmalar yazdırılır.
+
+Kullanım: python benchmarks/bench_startup.py [--runs 10] [--top 10]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "iptv_manager.py")
+
+
+def scenarios(config_file, output):
+    import_code = f"import sys; sys.path.insert(0, {ROOT!r}); import iptv_manager"
+    return [
+        ("import", [sys.executable, "-c", import_code]),
+        ("export-m3u", [sys.executable, SCRIPT, "--config", config_file, "export-m3u",
+                        "--output", output, "--base-url", "http://127.0.0.1:8080"]),
+        # Arayüz açılmadan önceki adımlar: Tk yükleme ve (önbellekli) FFmpeg kontrolü
+        ("gui-hazırlık", [sys.executable, "-c", import_code + "; iptv_manager.load_tk(); "
+                          "iptv_manager.check_requirements(gui=False)"]),
+    ]
+
+
+def measure(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT)
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def top_imports(count):
+    """`-X importtime` çıktısından kümülatif süresi en yüksek modülleri döndür"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                             f"import sys; sys.path.insert(0, {ROOT!r}); import iptv_manager"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, cwd=ROOT)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(":", 1)[1].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Her senaryo için çalıştırma sayısı")
+    parser.add_argument("--top", type=int, default=10, help="Gösterilecek en pahalı içe aktarma sayısı")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="iptv_startup_")
+    try:
+        config_file = os.path.join(directory, "channels_config.json")
+        with open(config_file, "w") as f:
+            json.dump({"channels": [{"name": f"Kanal {i}", "paths": []} for i in range(50)]}, f)
+
+        # Bayt kodu derlemesi ölçüme karışmasın
+        subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {ROOT!r}); import iptv_manager"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT)
+
+        print(f"{'Senaryo':<14} {'En iyi ms':>10} {'Ortanca ms':>11}")
+        for name, command in scenarios(config_file, os.path.join(directory, "out.m3u")):
+            best, median = measure(command, args.runs)
+            print(f"{name:<14} {best * 1000:>10.1f} {median * 1000:>11.1f}")
+
+        print(f"\n{'Modül':<40} {'Kümülatif ms':>13} {'Kendi ms':>9}")
+        for cumulative_us, self_us, name in top_imports(args.top):
+            print(f"{name:<40} {cumulative_us / 1000:>13.1f} {self_us / 1000:>9.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
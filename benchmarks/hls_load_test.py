@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Çok sayıda HLS oynatıcıyı taklit eden yük testi
+
+Sahte bir segment üretici kanal dizinlerine canlı oynatma listesi ve segment yazar (gerçek video
+gerekmez). Yerel bir sunucu örneği ayrı süreçte başlatılır; her sanal oynatıcı .m3u8 dosyasını
+hedef süre aralığıyla yoklar, yeni segmentleri indirir ve tampon boşalırsa takılma sayar.
+Sonuçta aktarım hızı, oynatma listesi/segment gecikme yüzdelikleri, takılma ve hata oranları
+yazdırılır.
+
+Kullanım:
+    python benchmarks/hls_load_test.py --players 200 --channels 4 --duration 60
+    python benchmarks/hls_load_test.py --players 500 --processes 4       # çok süreçli sunucu
+    python benchmarks/hls_load_test.py --url http://sunucu:8080 --output-dir /yol/hls  # dış sunucu
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeSegmentProducer(threading.Thread):
+    """FFmpeg yerine her hedef sürede bir segment yazan üretici"""
+    def __init__(self, output_dir, channels, target_duration, segment_bytes, window=6):
+        super().__init__(daemon=True)
+        self.output_dir = output_dir
+        self.channels = channels
+        self.target_duration = target_duration
+        self.payload = os.urandom(segment_bytes)
+        self.window = window
+        self.sequence = 0
+        self.stopped = threading.Event()
+        for channel in channels:
+            os.makedirs(os.path.join(output_dir, channel), exist_ok=True)
+        # Oynatıcılar hemen başlayabilsin diye pencereyi önceden doldur
+        for _ in range(window):
+            self.produce()
+
+    def produce(self):
+        first = max(0, self.sequence - self.window + 1)
+        for channel in self.channels:
+            channel_dir = os.path.join(self.output_dir, channel)
+            with open(os.path.join(channel_dir, f"seg_{self.sequence}.ts"), "wb") as f:
+                f.write(self.payload)
+            stale = os.path.join(channel_dir, f"seg_{first - 3}.ts")
+            if os.path.exists(stale):
+                os.remove(stale)
+
+            lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{self.target_duration}",
+                     f"#EXT-X-MEDIA-SEQUENCE:{first}"]
+            for sequence in range(first, self.sequence + 1):
+                lines += [f"#EXTINF:{self.target_duration:.3f},", f"seg_{sequence}.ts"]
+            playlist = os.path.join(channel_dir, f"{channel}.m3u8")
+            with open(playlist + ".tmp", "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(playlist + ".tmp", playlist)
+        self.sequence += 1
+
+    def run(self):
+        while not self.stopped.wait(self.target_duration):
+            self.produce()
+
+
+class Player(threading.Thread):
+    """Canlı HLS yayını izleyen sanal oynatıcı"""
+    def __init__(self, base_url, channel, deadline, start_delay=0):
+        super().__init__(daemon=True)
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.channel = channel
+        self.deadline = deadline
+        self.start_delay = start_delay
+        self.connection = None
+        self.playlist_latency = []
+        self.segment_latency = []
+        self.bytes = 0
+        self.requests = 0
+        self.errors = 0
+        self.stalls = 0
+
+    def get(self, path):
+        """Keep-alive bağlantı üzerinden GET; (durum, gövde, süre) döndürür"""
+        self.requests += 1
+        start = time.perf_counter()
+        for attempt in range(2):
+            try:
+                if self.connection is None:
+                    self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                self.connection.request("GET", path)
+                response = self.connection.getresponse()
+                body = response.read()
+                if response.getheader("Connection", "").lower() == "close":
+                    self.connection.close()
+                    self.connection = None
+                return response.status, body, time.perf_counter() - start
+            except (OSError, http.client.HTTPException):
+                if self.connection:
+                    self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def run(self):
+        time.sleep(self.start_delay)
+        playlist_path = f"/{self.channel}/{self.channel}.m3u8"
+        next_sequence = None
+        buffer_seconds = 0.0
+        started = stalled = False
+        last_tick = time.monotonic()
+
+        while time.monotonic() < self.deadline:
+            target_duration = 4.0
+            new_segment = False
+            try:
+                status, body, elapsed = self.get(playlist_path)
+                if status != 200:
+                    self.errors += 1
+                else:
+                    self.playlist_latency.append(elapsed)
+                    media_sequence, durations, segments = 0, [], []
+                    for line in body.decode("utf-8", "replace").splitlines():
+                        if line.startswith("#EXT-X-TARGETDURATION:"):
+                            target_duration = float(line.split(":", 1)[1])
+                        elif line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+                            media_sequence = int(line.split(":", 1)[1])
+                        elif line.startswith("#EXTINF:"):
+                            durations.append(float(line[8:].split(",", 1)[0]))
+                        elif line and not line.startswith("#"):
+                            segments.append(line)
+
+                    # Oynatıcılar gibi canlı kenarın üç segment gerisinden başla
+                    if next_sequence is None:
+                        next_sequence = media_sequence + max(0, len(segments) - 3)
+                    for index, segment in enumerate(segments):
+                        sequence = media_sequence + index
+                        if sequence < next_sequence:
+                            continue
+                        status, body, elapsed = self.get(f"/{self.channel}/{segment}")
+                        next_sequence = sequence + 1
+                        if status != 200:
+                            self.errors += 1
+                            continue
+                        self.segment_latency.append(elapsed)
+                        self.bytes += len(body)
+                        buffer_seconds += durations[index] if index < len(durations) else target_duration
+                        new_segment = True
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+
+            # Oynatma tamponu gerçek zamanda tükenir
+            now = time.monotonic()
+            if started:
+                buffer_seconds -= now - last_tick
+            last_tick = now
+            if new_segment:
+                started = True
+                stalled = False
+            if started and buffer_seconds <= 0:
+                buffer_seconds = 0
+                if not stalled:
+                    self.stalls += 1
+                    stalled = True
+
+            # Yeni segment yoksa hedef sürenin yarısı kadar sonra tekrar yokla (HLS kuralı)
+            time.sleep(target_duration if new_segment else target_duration / 2)
+
+        if self.connection:
+            self.connection.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def serve(args):
+    """Sunucu süreci: çıktı dizinini yerel örnek gibi sunar"""
+    import iptv_manager
+
+    runner = iptv_manager.ChannelRunner(args.output_dir, args.port, iptv_manager.ChannelScheduler(1),
+                                        iptv_manager.FFmpegTelemetry(), cache_mb=args.cache_mb)
+    iptv_manager.HLSRequestHandler.log_message = lambda self, format, *a: None
+    if args.processes > 1:
+        supervisor = iptv_manager.PreforkSupervisor(runner, args.processes, [
+            "--host", "127.0.0.1", "--port", str(args.port), "--output-dir", args.output_dir,
+            "--http-workers", str(args.http_workers), "--cache-mb", str(args.cache_mb)
+        ])
+        supervisor.start()
+        print("ready", flush=True)
+        try:
+            sys.stdin.read()
+        finally:
+            supervisor.stop()
+        return
+
+    httpd = runner.create_http_server(host="127.0.0.1", max_workers=args.http_workers)
+    print("ready", flush=True)
+    httpd.serve_forever()
+
+
+def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            http.client.HTTPConnection("127.0.0.1", port, timeout=1).connect()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=100, help="Sanal oynatıcı sayısı")
+    parser.add_argument("--channels", type=int, default=4, help="Kanal sayısı")
+    parser.add_argument("--duration", type=float, default=60, help="Test süresi (sn)")
+    parser.add_argument("--ramp", type=float, default=5, help="Oynatıcıların başlatılma süresi (sn)")
+    parser.add_argument("--target-duration", type=int, default=2, help="Segment süresi (sn)")
+    parser.add_argument("--bitrate-kbps", type=int, default=3000, help="Sahte yayın bit hızı")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--processes", type=int, default=1, help="Sunucu süreç sayısı (>1: SO_REUSEPORT)")
+    parser.add_argument("--http-workers", type=int, default=256)
+    parser.add_argument("--cache-mb", type=float, default=64)
+    parser.add_argument("--url", default="", help="Yerel örnek yerine bu sunucuyu test et")
+    parser.add_argument("--output-dir", default="", help="Sahte segmentlerin yazılacağı dizin")
+    parser.add_argument("--json", action="store_true", help="Sonucu JSON olarak yazdır")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    temp_dir = None
+    if not args.output_dir:
+        temp_dir = args.output_dir = tempfile.mkdtemp(prefix="iptv_load_")
+    channels = [f"yuk{i + 1}" for i in range(args.channels)]
+    producer = FakeSegmentProducer(args.output_dir, channels, args.target_duration,
+                                   args.bitrate_kbps * 1000 // 8 * args.target_duration)
+    producer.start()
+
+    server = None
+    base_url = args.url.rstrip("/")
+    if not base_url:
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve",
+                                   "--output-dir", args.output_dir, "--port", str(args.port),
+                                   "--processes", str(args.processes), "--http-workers", str(args.http_workers),
+                                   "--cache-mb", str(args.cache_mb)],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        server.stdout.readline()
+        if not wait_for_port(args.port):
+            server.kill()
+            sys.exit("Sunucu başlatılamadı")
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        start = time.monotonic()
+        deadline = start + args.duration
+        players = [Player(base_url, random.choice(channels), deadline, args.ramp * i / max(1, args.players))
+                   for i in range(args.players)]
+        for player in players:
+            player.start()
+        for player in players:
+            player.join()
+        elapsed = time.monotonic() - start
+    finally:
+        producer.stopped.set()
+        if server:
+            server.terminate()
+            server.wait()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    playlist_latency = [value for player in players for value in player.playlist_latency]
+    segment_latency = [value for player in players for value in player.segment_latency]
+    requests_total = sum(player.requests for player in players)
+    errors = sum(player.errors for player in players)
+    result = {
+        "players": args.players,
+        "duration_s": round(elapsed, 1),
+        "throughput_mbit_s": round(sum(player.bytes for player in players) * 8 / elapsed / 1e6, 2),
+        "requests": requests_total,
+        "errors": errors,
+        "error_rate": round(errors / requests_total, 4) if requests_total else 0.0,
+        "stalls": sum(player.stalls for player in players),
+        "stalled_players": sum(1 for player in players if player.stalls),
+        "playlist_ms": {name: round(percentile(playlist_latency, q) * 1000, 1)
+                        for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))},
+        "segment_ms": {name: round(percentile(segment_latency, q) * 1000, 1)
+                       for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))}
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"Oynatıcı: {result['players']}  Süre: {result['duration_s']} sn  "
+          f"Aktarım: {result['throughput_mbit_s']} Mbit/s")
+    print(f"İstek: {result['requests']}  Hata: {result['errors']} (%{result['error_rate'] * 100:.2f})  "
+          f"Takılma: {result['stalls']} ({result['stalled_players']} oynatıcı)")
+    for name in ("playlist_ms", "segment_ms"):
+        label = "Oynatma listesi" if name == "playlist_ms" else "Segment"
+        values = result[name]
+        print(f"{label:<16} p50 {values['p50']:>8} ms   p90 {values['p90']:>8} ms   p99 {values['p99']:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
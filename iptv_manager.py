@@ -8,40 +8,305 @@ import subprocess
 import threading
 import socket
 import glob
+import io
+import functools
+import contextlib
+import shutil
+import email.utils
 import http.server
 import socketserver
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
 import logging
 import traceback
+import contextvars
+import logging.handlers
 import datetime
-import requests
-import xml.etree.ElementTree as ET
 import re
-from urllib.parse import quote
+from urllib.parse import quote, unquote, urlsplit, parse_qsl
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
 import time
 import unicodedata
 from datetime import datetime, timedelta
 
-# Hata günlüğü ayarları
+# tkinter, requests ve ElementTree ağır modüllerdir; yalnızca onları kullanan özellik çalışınca
+# yüklenir, böylece başsız komutlar ve HTTP alt süreçleri hızlı açılır
+tk = ttk = filedialog = messagebox = scrolledtext = None
+
+def load_tk():
+    """Tkinter modüllerini ilk ihtiyaçta yükle; Tk yoksa False döndür"""
+    global tk, ttk, filedialog, messagebox, scrolledtext
+    if tk is None:
+        try:
+            import tkinter
+            from tkinter import ttk as tk_ttk, filedialog as tk_filedialog
+            from tkinter import messagebox as tk_messagebox, scrolledtext as tk_scrolledtext
+        except ImportError:
+            return False
+        tk, ttk, filedialog, messagebox, scrolledtext = (tkinter, tk_ttk, tk_filedialog,
+                                                         tk_messagebox, tk_scrolledtext)
+    return True
+
+# Hata günlüğü ayarları - dizin ve dosya ilk kayıt yazılırken oluşturulur (setup_logging)
 log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
+log_file = os.path.join(log_dir, "iptv_manager.log")
+
+# Betik olarak çalışınca da aynı ad kullanılsın ('logging.levels' ayarı bu adla yapılır)
+logger = logging.getLogger("iptv_manager")
+
+# Yapılandırmadaki "logging" anahtarının varsayılanları
+LOGGING_DEFAULTS = {
+    "level": "INFO",          # kök seviye
+    "levels": {},             # logger adı -> seviye, ör. {"urllib3": "WARNING"}
+    "json": False,            # dosyaya JSON satırları yaz (channel/job alanlarıyla)
+    "max_mb": 10,             # dosya bu boyutu aşınca döndürülür (0 = sınırsız)
+    "daily": True,            # gün değişince döndür
+    "backups": 10,            # saklanacak en fazla eski dosya
+    "retention_days": 14      # bundan eski dosyalar silinir (0 = süresiz)
+}
+
+# İş parçacığına/göreve özgü günlük alanları (kanal, iş kimliği)
+LOG_CONTEXT = contextvars.ContextVar("log_context", default={})
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Bu blokta yazılan kayıtlara ek alanlar ekle (JSON çıktısında görünür)"""
+    token = LOG_CONTEXT.set({**LOG_CONTEXT.get(), **fields})
+    try:
+        yield
+    finally:
+        LOG_CONTEXT.reset(token)
+
+def run_with_log_context(fn, *args, **fields):
+    with log_context(**fields):
+        return fn(*args)
+
+class LogContextFilter(logging.Filter):
+    """Kayda log_context alanlarını ekle (kaydı yazan iş parçacığında, kuyruğa girmeden önce çalışır)"""
+    def filter(self, record):
+        for key, value in LOG_CONTEXT.get().items():
+            if getattr(record, key, None) is None:
+                setattr(record, key, value)
+        return True
+
+class JsonLogFormatter(logging.Formatter):
+    """Kaydı tek satırlık JSON olarak biçimlendir"""
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key in ("channel", "job"):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Boyut aşılınca ya da gün değişince döndürülen, eski dosyaları silen günlük işleyicisi
+
+    Döndürülen dosya <ad>_YYYYmmdd_HHMMSS<uzantı> adını alır; 'backups' adetten fazlası ve
+    'retention_days' günden eskileri silinir. Dizin ve dosya ilk kayıtta oluşturulur.
+    """
+    def __init__(self, filename, max_bytes=0, backups=10, retention_days=0, daily=True):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self.retention_days = retention_days
+        self.daily = daily
+        try:
+            self.day = datetime.fromtimestamp(os.path.getmtime(filename)).date()
+        except OSError:
+            self.day = datetime.now().date()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record):
+        if self.daily and datetime.now().date() != self.day and os.path.exists(self.baseFilename):
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            root, ext = os.path.splitext(self.baseFilename)
+            rotated = f"{root}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+            suffix = 1
+            while os.path.exists(rotated):
+                rotated = f"{root}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}{ext}"
+                suffix += 1
+            os.replace(self.baseFilename, rotated)
+        self.day = datetime.now().date()
+        self.cleanup()
+
+    def rotated_files(self):
+        """Döndürülmüş dosyalar, yeniden eskiye"""
+        root = glob.escape(os.path.splitext(self.baseFilename)[0])
+        # Biçim değiştirildiyse diğer uzantıdaki eski dosyalar da sayılır
+        files = glob.glob(f"{root}_????????_??????*.log") + glob.glob(f"{root}_????????_??????*.jsonl")
+        return sorted(files, key=lambda path: os.path.getmtime(path), reverse=True)
+
+    def cleanup(self):
+        """Sayı ve yaş sınırını aşan eski günlük dosyalarını sil"""
+        try:
+            files = self.rotated_files()
+        except OSError:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        for index, path in enumerate(files):
+            try:
+                if index >= self.backupCount or (self.retention_days and os.path.getmtime(path) < cutoff):
+                    os.remove(path)
+            except OSError:
+                pass
+
+_log_listener = None  # setup_logging'in çalışan QueueListener'ı
+
+def _stop_log_listener():
+    """Kuyrukta bekleyen kayıtları yaz ve günlük dosyasını kapat"""
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+def setup_logging(options=None, name="iptv_manager", rotate=True):
+    """Kök logger'ı yapılandır (modül içe aktarılırken değil, program başlarken çağrılır)
+
+    Kayıtlar kuyruğa yazılır; dosya ve konsol işleyicileri ayrı bir iş parçacığında (QueueListener)
+    çalışır, böylece sık yazılan kayıtlar çağıranı disk G/Ç'sinde bekletmez. options yapılandırmadaki
+    "logging" anahtarıdır (bkz. LOGGING_DEFAULTS); name günlük dosyasının adıdır. rotate=False ise
+    dosya yalnızca sona eklenir, döndürülmez (aynı anda çalışabilen kısa komutlar için). Tekrar
+    çağrılırsa önceki yapılandırma kapatılıp yenisiyle değiştirilir.
+    """
+    global log_file, _log_listener
+    import queue
+    options = {**LOGGING_DEFAULTS, **(options or {})}
+    if not rotate:
+        options.update(max_mb=0, daily=False)
+    
+    log_file = os.path.join(log_dir, name + (".jsonl" if options["json"] else ".log"))
+    file_handler = RotatingLogHandler(log_file, int(float(options["max_mb"]) * 1024 * 1024),
+                                      int(options["backups"]), float(options["retention_days"]),
+                                      bool(options["daily"]))
+    text_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(JsonLogFormatter() if options["json"] else text_formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(text_formatter)
+    if rotate:
+        file_handler.cleanup()
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(LogContextFilter())
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(str(options["level"]).upper())
+    for logger_name, level in options["levels"].items():
+        logging.getLogger(logger_name).setLevel(str(level).upper())
+    
+    # Önceki dinleyici kendi kuyruğunda kalan kayıtları yazıp kapanır
+    _stop_log_listener()
+    listener.start()
+    _log_listener = listener
+    # Çıkışta kuyrukta bekleyen kayıtlar da yazılsın (tekrar çağrılarda bir kez kayıtlı kalır)
+    import atexit
+    atexit.unregister(_stop_log_listener)
+    atexit.register(_stop_log_listener)
+    return listener
+
+def argv_option(argv, option, default=None):
+    """Komut satırındaki '--secenek deger' değerini argparse'tan önce oku (günlük ayarı için)"""
+    if option in argv[:-1]:
+        return argv[argv.index(option) + 1]
+    return default
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+LOG_RECORD_PATTERN = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d+ - (\w+) - ")
+
+def filter_log_records(text, level=None, channel=None):
+    """Günlük metnini kayıtlara böl (çok satırlı hata izleri kayda dahil) ve süz
 
-log_file = os.path.join(log_dir, f"iptv_manager_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+    level verilirse o seviye ve üstü, channel verilirse kanal adını içeren kayıtlar döndürülür.
+    """
+    min_rank = LOG_LEVELS.index(level) if level in LOG_LEVELS else 0
+    channel = channel.casefold() if channel else None
+    records = []
+    current, current_level = [], None
+    for line in text.splitlines() + [None]:
+        line_level = None
+        if line is not None:
+            match = LOG_RECORD_PATTERN.match(line)
+            if match:
+                line_level = match.group(1)
+            elif line.startswith("{"):
+                # JSON satırı biçimindeki kayıt
+                try:
+                    line_level = str(json.loads(line).get("level", ""))
+                except (ValueError, AttributeError):
+                    pass
+            if line_level is None:
+                # Önceki kaydın devamı (hata izi vb.)
+                current.append(line)
+                continue
+        if current:
+            record = "\n".join(current)
+            rank = LOG_LEVELS.index(current_level) if current_level in LOG_LEVELS else 0
+            if rank >= min_rank and (not channel or channel in record.casefold()):
+                records.append(record)
+        if line is not None:
+            current, current_level = [line], line_level
+    return records
 
-# Kök logger'ı yapılandır
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+def read_log_window(path, before=None, after=None, limit=64 * 1024, level=None, channel=None):
+    """Günlük dosyasının en fazla 'limit' baytlık bölümünü oku; dosyanın tamamı belleğe alınmaz
 
-logger = logging.getLogger(__name__)
-logger.info("IPTV Manager başlatılıyor...")
+    after verilirse o bayt ofsetinden sonra eklenen satırlar (takip), verilmezse 'before' ofsetinden
+    (yoksa dosya sonundan) geriye doğru tam satırlar okunur. Dönen start/end ofsetleri sonraki
+    sayfa ve takip istekleri için kullanılır.
+    """
+    size = os.path.getsize(path)
+    if after is not None:
+        # Dosya kesildiyse ya da döndürüldüyse baştan oku
+        begin = after if after <= size else 0
+        end = min(size, begin + limit)
+    else:
+        end = size if before is None else max(0, min(before, size))
+        begin = max(0, end - limit)
+    
+    with open(path, "rb") as f:
+        f.seek(begin)
+        data = f.read(end - begin)
+    
+    # Yarım satırları dışarıda bırak: sondaki henüz yazılıyor olabilir, baştaki önceki sayfaya ait
+    if end == size or after is not None:
+        cut = data.rfind(b"\n")
+        if cut >= 0 or (after is not None and end == size):
+            end -= len(data) - cut - 1
+            data = data[:cut + 1]
+    if after is None and begin > 0:
+        cut = data.find(b"\n")
+        if cut >= 0:
+            begin += cut + 1
+            data = data[cut + 1:]
+    
+    return {
+        "path": path,
+        "size": size,
+        "start": begin,
+        "end": end,
+        "records": filter_log_records(data.decode("utf-8", errors="replace"), level, channel)
+    }
 
 # Beklenmeyen hataları yakala ve kaydet
 def handle_exception(exc_type, exc_value, exc_traceback):
@@ -66,19 +331,82 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 # Global hata yakalayıcı
 sys.excepthook = handle_exception
 
-# Uygulamayı başlatmadan önce gerekli kontroller
-def check_requirements():
-    """Gerekli modüllerin yüklü olup olmadığını kontrol et"""
+FFMPEG_PROBE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ffmpeg_capabilities.json")
+_ffmpeg_probes = {}
+
+def _ffmpeg_list(path, option):
+    """ffmpeg -muxers / -encoders çıktısındaki adları döndür"""
+    try:
+        output = subprocess.run([path, "-hide_banner", option], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True, errors="replace", timeout=10).stdout
+    except (subprocess.SubprocessError, OSError):
+        return []
+    names, started = [], False
+    for line in output.splitlines():
+        if line.strip().startswith("--"):
+            started = True
+        elif started and len(line.split()) >= 2:
+            names.append(line.split()[1])
+    return names
+
+def ffmpeg_capabilities(binary="ffmpeg"):
+    """FFmpeg sürümünü, muxer ve encoder listesini döndür; FFmpeg yoksa None
+
+    Sonuç ikili dosyanın yolu, mtime'ı ve boyutuyla anahtarlanıp diske yazılır; FFmpeg
+    güncellenmedikçe sonraki açılışlarda alt süreç çalıştırılmaz.
+    """
+    path = shutil.which(binary)
+    if not path:
+        return None
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    key = f"{path}|{stat.st_mtime_ns}|{stat.st_size}"
+    if key in _ffmpeg_probes:
+        return _ffmpeg_probes[key]
+
     try:
-        # FFmpeg kontrolü
+        with open(FFMPEG_PROBE_CACHE, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    capabilities = cache.get(key)
+    if capabilities is None:
+        try:
+            result = subprocess.run([path, "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, errors="replace", check=True, timeout=10)
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.error(f"FFmpeg çalıştırılamadı: {str(e)}")
+            return None
+        capabilities = {
+            "path": path,
+            "version": (result.stdout.splitlines() or [""])[0],
+            "muxers": _ffmpeg_list(path, "-muxers"),
+            "encoders": _ffmpeg_list(path, "-encoders")
+        }
+        # Aynı ikilinin eski sürümlerine ait kayıtları at
+        cache = {k: v for k, v in cache.items() if not k.startswith(path + "|")}
+        cache[key] = capabilities
         try:
-            subprocess.run(['ffmpeg', '-version'], 
-                          stdout=subprocess.PIPE, 
-                          stderr=subprocess.PIPE, 
-                          check=True)
-            logger.info("FFmpeg kontrolü başarılı")
-        except (subprocess.SubprocessError, FileNotFoundError) as e:
-            logger.error(f"FFmpeg bulunamadı: {str(e)}")
+            write_file_atomic(FFMPEG_PROBE_CACHE, json.dumps(cache))
+        except OSError as e:
+            logger.warning(f"FFmpeg yetenek önbelleği yazılamadı: {str(e)}")
+    _ffmpeg_probes[key] = capabilities
+    return capabilities
+
+# Uygulamayı başlatmadan önce gerekli kontroller
+def check_requirements(gui=True):
+    """Gerekli modüllerin yüklü olup olmadığını kontrol et (gui=False ise hatalar yalnızca loglanır)"""
+    if gui and not load_tk():
+        logger.error("Tkinter bulunamadı; arayüzsüz çalıştırmak için: python iptv_manager.py serve")
+        return False
+
+    try:
+        # FFmpeg kontrolü - sonuç ikili dosya değişene kadar önbellekten okunur
+        capabilities = ffmpeg_capabilities()
+        if capabilities is None:
+            logger.error("FFmpeg bulunamadı")
+            if not gui:
+                return False
             messagebox.showerror(
                 "FFmpeg Bulunamadı",
                 "FFmpeg yüklü değil veya PATH'e eklenmemiş.\n\n"
@@ -86,13 +414,189 @@ def check_requirements():
                 "https://ffmpeg.org/download.html"
             )
             return False
+        if capabilities["muxers"] and "hls" not in capabilities["muxers"]:
+            logger.error(f"FFmpeg HLS çıkışını desteklemiyor: {capabilities['path']}")
+            if gui:
+                messagebox.showerror("FFmpeg Hatası", "Kurulu FFmpeg HLS çıkışını (hls muxer) desteklemiyor.")
+            return False
+        logger.info(f"FFmpeg kontrolü başarılı ({capabilities['version']})")
         
         return True
     except Exception as e:
         logger.error(f"Gereksinim kontrolü hatası: {str(e)}")
-        messagebox.showerror("Gereksinim Kontrolü Hatası", str(e))
+        if gui:
+            messagebox.showerror("Gereksinim Kontrolü Hatası", str(e))
         return False
 
+class MetricsRegistry:
+    """Prometheus metin biçiminde dışa aktarılan sayaçlar, histogramlar ve anlık değerler
+
+    Her iş parçacığı kendi sayaç kopyasına yazar; kilit yalnızca bir iş parçacığı ilk kez
+    ölçüm yaptığında ve /metrics okunurken alınır, böylece ölçüm sıcak yolu yavaşlatmaz.
+    Anlık değerler (gauge) okuma sırasında kayıtlı toplayıcı fonksiyonlardan alınır.
+    """
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self):
+        self.meta = {}        # metrik adı -> (tür, açıklama, histogram kovaları)
+        self.shards = []      # iş parçacığı başına {(ad, etiketler): değer}
+        self.collectors = []  # [(ad, etiketler sözlüğü, değer)] döndüren fonksiyonlar
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def describe(self, name, kind, help_text, buckets=None):
+        self.meta[name] = (kind, help_text, tuple(buckets or self.DEFAULT_BUCKETS) if kind == "histogram" else None)
+
+    def _shard(self):
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.shards.append(shard)
+        return shard
+
+    def inc(self, name, value=1, **labels):
+        shard = self._shard()
+        key = (name, tuple(sorted(labels.items())))
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        shard = self._shard()
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self.meta[name][2]
+        histogram = shard.get(key)
+        if histogram is None:
+            histogram = shard[key] = [0] * (len(buckets) + 2)  # kovalar, toplam, adet
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                histogram[i] += 1
+                break
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def add_collector(self, collector):
+        with self.lock:
+            self.collectors.append(collector)
+
+    def remove_collector(self, collector):
+        with self.lock:
+            if collector in self.collectors:
+                self.collectors.remove(collector)
+
+    @staticmethod
+    def _format_labels(labels, extra=""):
+        parts = []
+        for key, value in labels:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            parts.append(f'{key}="{value}"')
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    @staticmethod
+    def _format_value(value):
+        return str(value) if isinstance(value, int) else repr(float(value))
+
+    @staticmethod
+    def _add(totals, key, value):
+        if isinstance(value, list):
+            total = totals.setdefault(key, [0] * len(value))
+            for i, item in enumerate(value):
+                total[i] += item
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+    def _totals(self):
+        with self.lock:
+            shards = list(self.shards)
+            collectors = list(self.collectors)
+
+        totals = {}
+        for shard in shards:
+            for key, value in list(shard.items()):
+                self._add(totals, key, value)
+        for collector in collectors:
+            try:
+                for name, labels, value in collector():
+                    totals[(name, tuple(sorted(labels.items())))] = value
+            except Exception as e:
+                logger.error(f"Metrik toplayıcı hatası: {str(e)}")
+        return totals
+
+    def snapshot(self):
+        """Tüm metriklerin JSON'a çevrilebilir anlık görüntüsü (başka süreçte birleştirmek için)"""
+        return [[name, [list(label) for label in labels], value] for (name, labels), value in self._totals().items()]
+
+    def merge_snapshot(self, totals, snapshot, skip=()):
+        """Anlık görüntüyü toplamlara ekle ('skip' içindeki metrikler hariç)"""
+        for name, labels, value in snapshot:
+            if name not in skip:
+                self._add(totals, (name, tuple(tuple(label) for label in labels)), value)
+
+    def render(self, extra_snapshots=(), skip=()):
+        """Tüm metrikleri Prometheus metin biçiminde döndür
+
+        extra_snapshots: diğer süreçlerden gelen anlık görüntüler, bu sürecin değerlerine eklenir.
+        """
+        totals = self._totals()
+        for snapshot in extra_snapshots:
+            self.merge_snapshot(totals, snapshot, skip)
+
+        by_name = {}
+        for (name, labels), value in totals.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            kind, help_text, buckets = self.meta.get(name, ("untyped", "", None))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(by_name[name]):
+                if kind != "histogram":
+                    lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets, value):
+                    cumulative += count
+                    bucket_labels = self._format_labels(labels, 'le="%s"' % bound)
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                bucket_labels = self._format_labels(labels, 'le="+Inf"')
+                lines.append(f"{name}_bucket{bucket_labels} {value[-1]}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {self._format_value(value[-2])}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+# Uygulama genelindeki metrikler (/metrics)
+METRICS = MetricsRegistry()
+METRICS.describe("iptv_http_requests_total", "counter", "HTTP istek sayısı (rota ve durum koduna göre)")
+METRICS.describe("iptv_http_request_duration_seconds", "histogram", "HTTP istek süresi (rotaya göre)")
+METRICS.describe("iptv_http_rejected_total", "counter", "Bağlantı sınırları nedeniyle reddedilen bağlantı sayısı")
+METRICS.describe("iptv_http_open_connections", "gauge", "Açık HTTP bağlantısı sayısı")
+METRICS.describe("iptv_http_processes", "gauge", "Çalışan HTTP alt süreci sayısı")
+METRICS.describe("iptv_http_process_restarts_total", "counter", "Yeniden başlatılan HTTP alt süreci sayısı")
+METRICS.describe("iptv_http_sent_bytes_total", "counter", "Kanal başına gönderilen HLS baytı")
+METRICS.describe("iptv_active_viewers", "gauge", "Kanaldaki açık izleyici oturumu sayısı")
+METRICS.describe("iptv_viewer_sessions_total", "counter", "Kanalda açılan izleyici oturumu sayısı")
+METRICS.describe("iptv_segment_cache_bytes", "gauge", "Segment önbelleğinin bellek kullanımı")
+METRICS.describe("iptv_segment_cache_hits_total", "counter", "Segment önbelleği isabet sayısı")
+METRICS.describe("iptv_segment_cache_misses_total", "counter", "Segment önbelleği ıskalama (disk okuma) sayısı")
+METRICS.describe("iptv_ffmpeg_up", "gauge", "Kanalın FFmpeg işlemi çalışıyorsa 1, değilse 0")
+METRICS.describe("iptv_ffmpeg_restarts_total", "counter", "Kanalın FFmpeg işleminin yeniden başlatılma sayısı")
+METRICS.describe("iptv_ffmpeg_exits_total", "counter", "Kanalın FFmpeg işleminin beklenmedik sonlanma sayısı")
+METRICS.describe("iptv_tmdb_requests_total", "counter", "TMDB API istek sayısı")
+METRICS.describe("iptv_tmdb_request_duration_seconds", "histogram", "TMDB API istek süresi")
+METRICS.describe("iptv_epg_stage_duration_seconds", "histogram", "EPG oluşturma aşamalarının süresi",
+                 buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600))
+METRICS.describe("iptv_epg_generations_total", "counter", "EPG oluşturma sayısı (sonuca göre)")
+
 class TMDBVideoEPGGenerator:
     def __init__(self):
         self.video_files = []
@@ -100,6 +604,21 @@ class TMDBVideoEPGGenerator:
         self.TMDB_API_KEY = "6126fc134d763a314ae9a08f5da38bde"
         self.TMDB_BASE_URL = "https://api.themoviedb.org/3"
     
+    def tmdb_get(self, url, params):
+        """TMDB API isteği gönder, sayısını ve süresini metriklere kaydet"""
+        path = url[len(self.TMDB_BASE_URL):].strip("/")
+        endpoint = "details" if path.rsplit("/", 1)[-1].isdigit() else path
+        import requests
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = requests.get(url, params=params)
+            status = str(response.status_code)
+            return response
+        finally:
+            METRICS.observe("iptv_tmdb_request_duration_seconds", time.perf_counter() - start, endpoint=endpoint)
+            METRICS.inc("iptv_tmdb_requests_total", endpoint=endpoint, status=status)
+    
     # format_size metodu ekliyorum - hata giderimi için
     def format_size(self, size_bytes):
         """Dosya boyutunu okunabilir formata çevir"""
@@ -171,7 +690,7 @@ class TMDBVideoEPGGenerator:
                 'include_adult': False
             }
             
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -179,7 +698,7 @@ class TMDBVideoEPGGenerator:
             
             # Bulunamazsa Türkçe dene
             params['language'] = 'tr-TR'
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -201,7 +720,7 @@ class TMDBVideoEPGGenerator:
                 'include_adult': False
             }
             
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -209,7 +728,7 @@ class TMDBVideoEPGGenerator:
             
             # Bulunamazsa Türkçe dene
             params['language'] = 'tr-TR'
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -231,14 +750,14 @@ class TMDBVideoEPGGenerator:
                 'language': 'tr-TR'
             }
             
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 tr_data = response.json()
                 
                 # Türkçe açıklama varsa kullan, yoksa İngilizce al
                 if not tr_data.get('overview'):
                     params['language'] = 'en-US'
-                    en_response = requests.get(url, params=params)
+                    en_response = self.tmdb_get(url, params)
                     if en_response.status_code == 200:
                         en_data = en_response.json()
                         tr_data['overview'] = en_data.get('overview', 'Açıklama bulunamadı.')
@@ -250,8 +769,12 @@ class TMDBVideoEPGGenerator:
             return None
     
     def extract_video_info_with_tmdb(self, file_path, progress_callback=None, ask_user=False, 
-                                    parent_window=None, default_media_type=None, default_tmdb_id=None):
-        """Video dosyasından TMDB ile bilgi çıkar - İyileştirilmiş ve interaktif sürüm"""
+                                    parent_window=None, default_media_type=None, default_tmdb_id=None,
+                                    ask_string=None):
+        """Video dosyasından TMDB ile bilgi çıkar - İyileştirilmiş ve interaktif sürüm
+
+        ask_string(başlık, soru) verilirse sorular onunla sorulur (arka plan iş parçacıkları için).
+        """
         try:
             filename = os.path.basename(file_path)
             clean_name = self.clean_filename_for_search(filename)
@@ -272,30 +795,30 @@ class TMDBVideoEPGGenerator:
                 progress_callback(f"TMDB bilgileri alınıyor: {filename}")
             
             # İnteraktif mod aktifse ve varsayılan değerler yoksa kullanıcıya sor
-            if ask_user and parent_window and not default_tmdb_id:
-                from tkinter import simpledialog
+            if ask_user and (parent_window or ask_string) and not default_tmdb_id:
+                if ask_string is None:
+                    from tkinter import simpledialog
+                    ask_string = lambda title, prompt: simpledialog.askstring(title, prompt, parent=parent_window)
                 
                 # Öncelikle TMDB ID'sini sor
-                tmdb_id_input = simpledialog.askstring(
+                tmdb_id_input = ask_string(
                     "TMDB ID",
                     f"'{filename}' için TMDB ID'sini girin:\n"
                     f"(Bu ID'yi themoviedb.org sitesinden bulabilirsiniz)\n"
-                    f"Boş bırakırsanız medya türünü seçmeniz istenecektir.",
-                    parent=parent_window
+                    f"Boş bırakırsanız medya türünü seçmeniz istenecektir."
                 )
                 
                 if tmdb_id_input and tmdb_id_input.strip().isdigit():
                     manual_tmdb_id = int(tmdb_id_input.strip())
                     
                     # Medya türünü de sor (TMDB ID verildiğinde)
-                    media_type_choice = simpledialog.askstring(
+                    media_type_choice = ask_string(
                         "Medya Türü",
                         f"TMDB ID: {manual_tmdb_id}\n"
                         f"Bu ID hangi türde medyaya ait?\n"
                         "1. Film\n"
                         "2. TV Dizisi\n"
-                        "Seçiminizi yapın (1/2):",
-                        parent=parent_window
+                        "Seçiminizi yapın (1/2):"
                     )
                     
                     if media_type_choice == "1":
@@ -307,13 +830,12 @@ class TMDBVideoEPGGenerator:
                         progress_callback(f"Manuel TMDB ID kullanılıyor: {manual_tmdb_id} ({media_type})")
                 else:
                     # TMDB ID verilmediyse medya türünü sor
-                    media_type_choice = simpledialog.askstring(
+                    media_type_choice = ask_string(
                         "İçerik Türü",
                         f"'{filename}' için içerik türünü seçin:\n"
                         "1. Film\n"
                         "2. TV Dizisi\n"
-                        "Seçiminizi yapın (1/2) veya boş bırakın (otomatik):",
-                        parent=parent_window
+                        "Seçiminizi yapın (1/2) veya boş bırakın (otomatik):"
                     )
                     
                     if media_type_choice == "1":
@@ -321,138 +843,138 @@ class TMDBVideoEPGGenerator:
                     elif media_type_choice == "2":
                         media_type = "tv"
         
-        # Manuel TMDB ID verilmişse, doğrudan API'yi kullan
-        if manual_tmdb_id:
-            try:
-                tmdb_info = self.get_tmdb_details(manual_tmdb_id, media_type)
-                if tmdb_info:
-                    if progress_callback:
-                        title = tmdb_info.get('title', tmdb_info.get('name', 'N/A'))
-                        progress_callback(f"✅ TMDB ID ile bulundu: {title} ({media_type})")
-                else:
-                    if progress_callback:
-                        progress_callback(f"❌ TMDB ID ile bilgi bulunamadı: {manual_tmdb_id} ({media_type})")
-            except Exception as e:
-                if progress_callback:
-                    progress_callback(f"❌ TMDB ID ile sorgulama hatası: {str(e)}")
-                logger.error(f"TMDB ID sorgusu hatası: {str(e)}")
-        # Manuel ID yoksa otomatik arama yap
-        elif len(search_query.replace(' ', '')) >= 3:
-            try:
-                if media_type == 'movie':
-                    # Film olarak ara
-                    movie_result = self.search_tmdb_movie(search_query)
-                    if movie_result:
-                        tmdb_info = self.get_tmdb_details(movie_result['id'], 'movie')
+            # Manuel TMDB ID verilmişse, doğrudan API'yi kullan
+            if manual_tmdb_id:
+                try:
+                    tmdb_info = self.get_tmdb_details(manual_tmdb_id, media_type)
+                    if tmdb_info:
+                        if progress_callback:
+                            title = tmdb_info.get('title', tmdb_info.get('name', 'N/A'))
+                            progress_callback(f"✅ TMDB ID ile bulundu: {title} ({media_type})")
+                    else:
                         if progress_callback:
-                            progress_callback(f"✅ Film bulundu: {movie_result.get('title', 'N/A')}")
-                    elif not ask_user:  # Kullanıcı sormadıysak TV olarak da ara
-                        # Film bulunamazsa TV dizisi olarak ara
+                            progress_callback(f"❌ TMDB ID ile bilgi bulunamadı: {manual_tmdb_id} ({media_type})")
+                except Exception as e:
+                    if progress_callback:
+                        progress_callback(f"❌ TMDB ID ile sorgulama hatası: {str(e)}")
+                    logger.error(f"TMDB ID sorgusu hatası: {str(e)}")
+            # Manuel ID yoksa otomatik arama yap
+            elif len(search_query.replace(' ', '')) >= 3:
+                try:
+                    if media_type == 'movie':
+                        # Film olarak ara
+                        movie_result = self.search_tmdb_movie(search_query)
+                        if movie_result:
+                            tmdb_info = self.get_tmdb_details(movie_result['id'], 'movie')
+                            if progress_callback:
+                                progress_callback(f"✅ Film bulundu: {movie_result.get('title', 'N/A')}")
+                        elif not ask_user:  # Kullanıcı sormadıysak TV olarak da ara
+                            # Film bulunamazsa TV dizisi olarak ara
+                            tv_result = self.search_tmdb_tv(search_query)
+                            if tv_result:
+                                tmdb_info = self.get_tmdb_details(tv_result['id'], 'tv')
+                                media_type = 'tv'
+                                if progress_callback:
+                                    progress_callback(f"✅ Dizi bulundu: {tv_result.get('name', 'N/A')}")
+                            else:
+                                if progress_callback:
+                                    progress_callback(f"❌ TMDB'de bulunamadı: {search_query}")
+                    else:  # media_type == 'tv'
+                        # TV dizisi olarak ara
                         tv_result = self.search_tmdb_tv(search_query)
                         if tv_result:
                             tmdb_info = self.get_tmdb_details(tv_result['id'], 'tv')
-                            media_type = 'tv'
                             if progress_callback:
                                 progress_callback(f"✅ Dizi bulundu: {tv_result.get('name', 'N/A')}")
                         else:
                             if progress_callback:
                                 progress_callback(f"❌ TMDB'de bulunamadı: {search_query}")
-                else:  # media_type == 'tv'
-                    # TV dizisi olarak ara
-                    tv_result = self.search_tmdb_tv(search_query)
-                    if tv_result:
-                        tmdb_info = self.get_tmdb_details(tv_result['id'], 'tv')
-                        if progress_callback:
-                            progress_callback(f"✅ Dizi bulundu: {tv_result.get('name', 'N/A')}")
-                    else:
-                        if progress_callback:
-                            progress_callback(f"❌ TMDB'de bulunamadı: {search_query}")
-            except Exception as e:
+                except Exception as e:
+                    if progress_callback:
+                        progress_callback(f"❌ TMDB arama hatası: {str(e)}")
+                    logger.error(f"TMDB arama hatası: {str(e)}")
+            else:
                 if progress_callback:
-                    progress_callback(f"❌ TMDB arama hatası: {str(e)}")
-                logger.error(f"TMDB arama hatası: {str(e)}")
-        else:
-            if progress_callback:
-                progress_callback(f"❌ Çok kısa arama terimi: {search_query}")
-            
-        # API rate limiting için bekleme
-        time.sleep(0.3)
-        
-        if tmdb_info:
-            # TMDB bilgilerini kullan
-            if media_type == 'movie':
-                title = tmdb_info.get('title', clean_name)
-                description = tmdb_info.get('overview', 'Açıklama bulunamadı.')
-                release_date = tmdb_info.get('release_date', '')
-                genres = [g['name'] for g in tmdb_info.get('genres', [])] if 'genres' in tmdb_info else []
-                runtime = tmdb_info.get('runtime', 120)  # dakika
-                rating = tmdb_info.get('vote_average', 0)
-                poster_path = tmdb_info.get('poster_path', '')
-                original_title = tmdb_info.get('original_title', title)
-                tmdb_id = tmdb_info.get('id', '')
-            else:  # TV
-                title = tmdb_info.get('name', clean_name)
-                description = tmdb_info.get('overview', 'Açıklama bulunamadı.')
-                release_date = tmdb_info.get('first_air_date', '')
-                genres = [g['name'] for g in tmdb_info.get('genres', [])] if 'genres' in tmdb_info else []
-                runtime = tmdb_info.get('episode_run_time', [45])[0] if tmdb_info.get('episode_run_time') else 45
-                rating = tmdb_info.get('vote_average', 0)
-                poster_path = tmdb_info.get('poster_path', '')
-                original_title = tmdb_info.get('original_name', title)
-                tmdb_id = tmdb_info.get('id', '')
-            
-            # Süreyi saniyeye çevir
-            duration_seconds = runtime * 60
-            
-            # Açıklamayı zenginleştir
-            enhanced_description = f"{description}\n\n"
-            if original_title != title:
-                enhanced_description += f"🎬 Orijinal Adı: {original_title}\n"
-            enhanced_description += f"📊 TMDB ID: {tmdb_id}\n"
-            if release_date:
-                enhanced_description += f"📅 Yayın Tarihi: {release_date}\n"
-            if genres:
-                enhanced_description += f"🎭 Türler: {', '.join(genres)}\n"
-            if rating > 0:
-                enhanced_description += f"⭐ TMDB Puanı: {rating:.1f}/10\n"
-            enhanced_description += f"💾 Dosya Boyutu: {self.format_size(size)}\n"
-            enhanced_description += f"📁 Dosya: {filename}\n"
-            enhanced_description += f"🔍 Arama Terimi: {search_query}"
-            
-            poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else ""
+                    progress_callback(f"❌ Çok kısa arama terimi: {search_query}")
             
-        else:
-            # TMDB'de bulunamadı, temel bilgileri kullan
-            title = clean_name if clean_name.strip() else filename
-            duration_seconds = max(3600, size / (1024 * 1024 * 1024) * 3600)  # Tahmini süre
-            enhanced_description = f"🎬 Başlık: {title}\n"
-            enhanced_description += f"📁 Dosya: {filename}\n"
-            enhanced_description += f"💾 Dosya Boyutu: {self.format_size(size)}\n"
-            enhanced_description += f"🔍 Arama Terimi: {search_query}\n"
-            enhanced_description += f"⚠ TMDB'de bulunamadı - Manuel olarak kontrol edin"
-            genres = ['Bilinmiyor']
-            rating = 0
-            poster_url = ""
-            original_title = title
-            tmdb_id = ""
-        
-        return {
-            'filename': filename,
-            'title': title,
-            'original_title': original_title if tmdb_info else title,
-            'description': enhanced_description,
-            'duration': int(duration_seconds),
-            'size': size,
-            'modified': mod_time,
-            'path': file_path,
-            'tmdb_found': tmdb_info is not None,
-            'media_type': media_type,
-            'genres': genres,
-            'rating': rating,
-            'poster_url': poster_url,
-            'clean_search_name': search_query,
-            'tmdb_id': tmdb_id
-        }
+            # API rate limiting için bekleme
+            time.sleep(0.3)
+        
+            if tmdb_info:
+                # TMDB bilgilerini kullan
+                if media_type == 'movie':
+                    title = tmdb_info.get('title', clean_name)
+                    description = tmdb_info.get('overview', 'Açıklama bulunamadı.')
+                    release_date = tmdb_info.get('release_date', '')
+                    genres = [g['name'] for g in tmdb_info.get('genres', [])] if 'genres' in tmdb_info else []
+                    runtime = tmdb_info.get('runtime', 120)  # dakika
+                    rating = tmdb_info.get('vote_average', 0)
+                    poster_path = tmdb_info.get('poster_path', '')
+                    original_title = tmdb_info.get('original_title', title)
+                    tmdb_id = tmdb_info.get('id', '')
+                else:  # TV
+                    title = tmdb_info.get('name', clean_name)
+                    description = tmdb_info.get('overview', 'Açıklama bulunamadı.')
+                    release_date = tmdb_info.get('first_air_date', '')
+                    genres = [g['name'] for g in tmdb_info.get('genres', [])] if 'genres' in tmdb_info else []
+                    runtime = tmdb_info.get('episode_run_time', [45])[0] if tmdb_info.get('episode_run_time') else 45
+                    rating = tmdb_info.get('vote_average', 0)
+                    poster_path = tmdb_info.get('poster_path', '')
+                    original_title = tmdb_info.get('original_name', title)
+                    tmdb_id = tmdb_info.get('id', '')
+            
+                # Süreyi saniyeye çevir
+                duration_seconds = runtime * 60
+            
+                # Açıklamayı zenginleştir
+                enhanced_description = f"{description}\n\n"
+                if original_title != title:
+                    enhanced_description += f"🎬 Orijinal Adı: {original_title}\n"
+                enhanced_description += f"📊 TMDB ID: {tmdb_id}\n"
+                if release_date:
+                    enhanced_description += f"📅 Yayın Tarihi: {release_date}\n"
+                if genres:
+                    enhanced_description += f"🎭 Türler: {', '.join(genres)}\n"
+                if rating > 0:
+                    enhanced_description += f"⭐ TMDB Puanı: {rating:.1f}/10\n"
+                enhanced_description += f"💾 Dosya Boyutu: {self.format_size(size)}\n"
+                enhanced_description += f"📁 Dosya: {filename}\n"
+                enhanced_description += f"🔍 Arama Terimi: {search_query}"
+            
+                poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else ""
+            
+            else:
+                # TMDB'de bulunamadı, temel bilgileri kullan
+                title = clean_name if clean_name.strip() else filename
+                duration_seconds = max(3600, size / (1024 * 1024 * 1024) * 3600)  # Tahmini süre
+                enhanced_description = f"🎬 Başlık: {title}\n"
+                enhanced_description += f"📁 Dosya: {filename}\n"
+                enhanced_description += f"💾 Dosya Boyutu: {self.format_size(size)}\n"
+                enhanced_description += f"🔍 Arama Terimi: {search_query}\n"
+                enhanced_description += f"⚠ TMDB'de bulunamadı - Manuel olarak kontrol edin"
+                genres = ['Bilinmiyor']
+                rating = 0
+                poster_url = ""
+                original_title = title
+                tmdb_id = ""
+        
+            return {
+                'filename': filename,
+                'title': title,
+                'original_title': original_title if tmdb_info else title,
+                'description': enhanced_description,
+                'duration': int(duration_seconds),
+                'size': size,
+                'modified': mod_time,
+                'path': file_path,
+                'tmdb_found': tmdb_info is not None,
+                'media_type': media_type,
+                'genres': genres,
+                'rating': rating,
+                'poster_url': poster_url,
+                'clean_search_name': search_query,
+                'tmdb_id': tmdb_id
+            }
         except Exception as e:
             logger.error(f"Video bilgisi çıkarma hatası: {str(e)}", exc_info=True)
             if progress_callback:
@@ -489,7 +1011,7 @@ class TMDBVideoEPGGenerator:
                 'include_adult': False
             }
             
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -497,7 +1019,7 @@ class TMDBVideoEPGGenerator:
             
             # Bulunamazsa Türkçe dene
             params['language'] = 'tr-TR'
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -519,7 +1041,7 @@ class TMDBVideoEPGGenerator:
                 'include_adult': False
             }
             
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -527,7 +1049,7 @@ class TMDBVideoEPGGenerator:
             
             # Bulunamazsa Türkçe dene
             params['language'] = 'tr-TR'
-            response = requests.get(url, params=params)
+            response = self.tmdb_get(url, params)
             if response.status_code == 200:
                 results = response.json().get('results', [])
                 if results:
@@ -537,127 +1059,3237 @@ class TMDBVideoEPGGenerator:
         except Exception as e:
             print(f"TMDB TV search error: {e}")
             return None
-    
-    def get_tmdb_details(self, tmdb_id, media_type='movie'):
-        """TMDB'den detaylı bilgi al"""
+    
+    def get_tmdb_details(self, tmdb_id, media_type='movie'):
+        """TMDB'den detaylı bilgi al"""
+        try:
+            url = f"{self.TMDB_BASE_URL}/{media_type}/{tmdb_id}"
+            
+            # Önce Türkçe dene
+            params = {
+                'api_key': self.TMDB_API_KEY,
+                'language': 'tr-TR'
+            }
+            
+            response = self.tmdb_get(url, params)
+            if response.status_code == 200:
+                tr_data = response.json()
+                
+                # Türkçe açıklama varsa kullan, yoksa İngilizce al
+                if not tr_data.get('overview'):
+                    params['language'] = 'en-US'
+                    en_response = self.tmdb_get(url, params)
+                    if en_response.status_code == 200:
+                        en_data = en_response.json()
+                        tr_data['overview'] = en_data.get('overview', 'Açıklama bulunamadı.')
+                
+                return tr_data
+            return None
+        except Exception as e:
+            print(f"TMDB details error: {e}")
+            return None
+    
+    def generate_epg_from_videos(self, video_files_by_folder, days=7):
+        """Video dosyalarından EPG oluştur"""
+        import xml.etree.ElementTree as ET
+        root = ET.Element('tv', generator_name="TMDB Video EPG Generator")
+        
+        # Kanalları ekle
+        for folder_name, channel_info in self.channels.items():
+            channel_elem = ET.SubElement(root, 'channel', id=folder_name)
+            display_name = ET.SubElement(channel_elem, 'display-name')
+            display_name.text = channel_info['display_name']
+            
+            # Kanal açıklaması
+            desc = ET.SubElement(channel_elem, 'desc')
+            desc.text = f"Video klasörü: {channel_info['display_name']}"
+        
+        # Her klasör için programları ekle
+        for folder_name, video_files in video_files_by_folder.items():
+            if folder_name not in self.channels:
+                continue
+                
+            current_time = datetime.now().replace(hour=6, minute=0, second=0, microsecond=0)
+            
+            for day in range(days):
+                day_start = current_time + timedelta(days=day)
+                time_cursor = day_start
+                
+                # O gün için video dosyalarını sırayla yerleştir
+                for video_info in video_files:
+                    # Gün sona erdiyse sonraki güne geç
+                    next_day = day_start + timedelta(days=1)
+                    if time_cursor >= next_day:
+                        break
+                    
+                    # Program süresi
+                    duration = max(1800, min(video_info['duration'], 14400))
+                    
+                    programme = ET.SubElement(root, 'programme',
+                                            channel=folder_name,
+                                            start=time_cursor.strftime('%Y%m%d%H%M%S +0000'),
+                                            stop=(time_cursor + timedelta(seconds=duration)).strftime('%Y%m%d%H%M%S +0000'))
+                    
+                    # Başlık
+                    title = ET.SubElement(programme, 'title', lang='tr')
+                    title.text = video_info['title']
+                    
+                    # Açıklama
+                    desc = ET.SubElement(programme, 'desc', lang='tr')
+                    desc.text = video_info['description']
+                    
+                    # Kategori
+                    category = ET.SubElement(programme, 'category', lang='tr')
+                    if video_info.get('genres'):
+                        category.text = video_info['genres'][0]
+                    else:
+                        category.text = 'Film' if video_info.get('media_type') == 'movie' else 'Dizi'
+                    
+                    # Süre
+                    length = ET.SubElement(programme, 'length', units='seconds')
+                    length.text = str(duration)
+                    
+                    # Rating varsa ekle
+                    if video_info.get('rating', 0) > 0:
+                        rating = ET.SubElement(programme, 'star-rating')
+                        value = ET.SubElement(rating, 'value')
+                        value.text = f"{video_info['rating']:.1f}/10"
+                    
+                    # Poster varsa ekle
+                    if video_info.get('poster_url'):
+                        icon = ET.SubElement(programme, 'icon', src=video_info['poster_url'])
+                    
+                    # Credits (TMDB kaynak bilgisi)
+                    if video_info.get('tmdb_found'):
+                        credits = ET.SubElement(programme, 'credits')
+                        adapter = ET.SubElement(credits, 'adapter')
+                        adapter.text = "TMDB (The Movie Database)"
+                    
+                    # Bir sonraki programın başlangıç zamanı
+                    time_cursor += timedelta(seconds=duration)
+                    
+                    # Programlar arası 5 dakika reklam/tanıtım
+                    time_cursor += timedelta(minutes=5)
+        
+        return ET.tostring(root, encoding='unicode')
+    
+    def save_epg(self, filename, content):
+        """EPG'yi dosyaya kaydet"""
+        directory = os.path.dirname(filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov", ".wmv")
+
+def find_video_files(folder_path, progress=None):
+    """Klasördeki ve alt klasörlerdeki video dosyalarını alfabetik sırayla döndür"""
+    video_files = set()
+    for ext in VIDEO_EXTENSIONS:
+        try:
+            video_files.update(glob.glob(os.path.join(folder_path, "**", "*" + ext), recursive=True))
+        except Exception as e:
+            if progress:
+                progress(f"Uzantı tarama hatası {ext}: {str(e)}")
+    return sorted(video_files)
+
+def generate_epg_file(folders, output_path, days=7, generator=None, progress=None):
+    """EPG'yi arayüz olmadan üret ve kaydet (TMDB bilgileri otomatik çekilir); özet sözlük döndürür"""
+    progress = progress or logger.info
+    generator = generator or TMDBVideoEPGGenerator()
+    generator.channels = {}
+    video_files_by_folder = {}
+    stage_times = {"scan": 0.0, "metadata": 0.0}
+    for folder_path in folders:
+        folder_name = os.path.basename(os.path.normpath(folder_path))
+        generator.add_channel_from_folder(folder_name)
+
+        scan_start = time.perf_counter()
+        video_files = find_video_files(folder_path, progress)
+        stage_times["scan"] += time.perf_counter() - scan_start
+        progress(f"'{folder_name}' klasöründe {len(video_files)} video dosyası bulundu")
+
+        metadata_start = time.perf_counter()
+        folder_videos = []
+        for video_file in video_files:
+            try:
+                folder_videos.append(generator.extract_video_info_with_tmdb(video_file, progress_callback=progress))
+            except Exception as e:
+                progress(f"Dosya işleme hatası: {str(e)}")
+        stage_times["metadata"] += time.perf_counter() - metadata_start
+        if folder_videos:
+            video_files_by_folder[folder_name] = folder_videos
+
+    for stage, duration in stage_times.items():
+        METRICS.observe("iptv_epg_stage_duration_seconds", duration, stage=stage)
+    if not video_files_by_folder:
+        METRICS.inc("iptv_epg_generations_total", result="empty")
+        raise ValueError("EPG oluşturulamıyor: İşlenebilir video bulunamadı")
+
+    try:
+        with METRICS.timer("iptv_epg_stage_duration_seconds", stage="render"):
+            epg_content = generator.generate_epg_from_videos(video_files_by_folder, days)
+        with METRICS.timer("iptv_epg_stage_duration_seconds", stage="save"):
+            generator.save_epg(output_path, epg_content)
+    except Exception:
+        METRICS.inc("iptv_epg_generations_total", result="error")
+        raise
+    METRICS.inc("iptv_epg_generations_total", result="success")
+    return {
+        "path": output_path,
+        "days": days,
+        "channels": len(video_files_by_folder),
+        "videos": sum(len(videos) for videos in video_files_by_folder.values())
+    }
+
+# Kanal öncelik sınıfları - HTTP sunucusu ve EPG işleri varsayılan öncelikte (nice 0) kaldığı için
+# tüm kodlayıcılar onların arkasında, düşük öncelikli kanallar ise en arkada çalışır
+PRIORITY_CLASSES = {
+    "high": {
+        "label": "Yüksek (Premium)",
+        "rank": 0,
+        "nice": 2,
+        "ionice_class": 2,
+        "ionice_level": 1,
+        "win_class": "NORMAL_PRIORITY_CLASS",
+        "preemptible": False
+    },
+    "normal": {
+        "label": "Normal",
+        "rank": 1,
+        "nice": 8,
+        "ionice_class": 2,
+        "ionice_level": 4,
+        "win_class": "BELOW_NORMAL_PRIORITY_CLASS",
+        "preemptible": False
+    },
+    "low": {
+        "label": "Düşük",
+        "rank": 2,
+        "nice": 15,
+        "ionice_class": 2,
+        "ionice_level": 7,
+        "win_class": "IDLE_PRIORITY_CLASS",
+        "preemptible": True
+    }
+}
+DEFAULT_PRIORITY = "normal"
+
+class ChannelScheduler:
+    """Eşzamanlı çalışan FFmpeg kodlayıcı sayısını sınırlar ve fazlasını öncelik sırasıyla kuyruğa alır
+
+    Sınır isteğe bağlıdır: max_active 0 ya da None ise tüm kanallar hemen başlatılır (-c copy
+    işlemleri çok az CPU kullandığından varsayılan olarak sınır yoktur).
+    """
+    def __init__(self, max_active=0, affinity=None):
+        self.max_active = max_active if max_active and max_active > 0 else 0  # 0 = sınırsız
+        self.affinity = affinity or {}  # öncelik sınıfı -> CPU listesi
+        self.active = {}   # kanal adı -> öncelik sınıfı
+        self.queue = []    # (sıra, sıra numarası, kanal adı, öncelik sınıfı)
+        self._seq = 0
+        self.lock = threading.Lock()
+
+    def normalize_priority(self, priority):
+        """Bilinmeyen öncelik değerlerini varsayılan sınıfa çevir"""
+        return priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY
+
+    def request(self, channel_name, priority):
+        """Kanal için kodlayıcı yuvası iste
+
+        ("start", None) -> kanal hemen başlatılabilir
+        ("start", kurban) -> kanal başlatılabilir, ancak önce 'kurban' kanal durdurulup kuyruğa alınmalı
+        ("queued", None) -> tüm yuvalar dolu, kanal kuyruğa alındı
+        """
+        priority = self.normalize_priority(priority)
+        rank = PRIORITY_CLASSES[priority]["rank"]
+        with self.lock:
+            if channel_name in self.active:
+                return "start", None
+
+            self._remove_from_queue(channel_name)
+
+            if self._has_slot():
+                self.active[channel_name] = priority
+                return "start", None
+
+            # Yuva yoksa daha düşük öncelikli ve kesilebilir bir kanalın yerini al
+            victim = None
+            victim_rank = rank
+            for name, active_priority in self.active.items():
+                active_class = PRIORITY_CLASSES[active_priority]
+                if active_class["preemptible"] and active_class["rank"] > victim_rank:
+                    victim = name
+                    victim_rank = active_class["rank"]
+
+            if victim:
+                victim_priority = self.active.pop(victim)
+                self._enqueue(victim, victim_priority)
+                self.active[channel_name] = priority
+                logger.info(f"'{victim}' kanalı '{channel_name}' için kuyruğa alındı (öncelik: {priority})")
+                return "start", victim
+
+            self._enqueue(channel_name, priority)
+            logger.info(f"Kodlayıcı sınırı dolu ({self.max_active}), '{channel_name}' kuyruğa alındı")
+            return "queued", None
+
+    def _has_slot(self):
+        return not self.max_active or len(self.active) < self.max_active
+
+    def release(self, channel_name):
+        """Kanalın yuvasını serbest bırak ve sırada bekleyen bir sonraki kanalı döndür"""
+        with self.lock:
+            if self.active.pop(channel_name, None) is None:
+                return None
+            if not self.queue or not self._has_slot():
+                return None
+
+            self.queue.sort()
+            _, _, next_name, _ = self.queue.pop(0)
+            return next_name
+
+    def set_priority(self, channel_name, priority):
+        """Çalışan ya da kuyruktaki kanalın öncelik sınıfını güncelle"""
+        priority = self.normalize_priority(priority)
+        with self.lock:
+            if channel_name in self.active:
+                self.active[channel_name] = priority
+            elif self._remove_from_queue(channel_name):
+                self._enqueue(channel_name, priority)
+
+    def cancel(self, channel_name):
+        """Kanalı kuyruktan çıkar"""
+        with self.lock:
+            return self._remove_from_queue(channel_name)
+
+    def is_queued(self, channel_name):
+        with self.lock:
+            return any(entry[2] == channel_name for entry in self.queue)
+
+    def _enqueue(self, channel_name, priority):
+        self._seq += 1
+        self.queue.append((PRIORITY_CLASSES[priority]["rank"], self._seq, channel_name, priority))
+
+    def _remove_from_queue(self, channel_name):
+        before = len(self.queue)
+        self.queue = [entry for entry in self.queue if entry[2] != channel_name]
+        return len(self.queue) != before
+
+    def popen_kwargs(self, priority):
+        """FFmpeg işlemi başlatılırken kullanılacak ek Popen parametreleri"""
+        priority = self.normalize_priority(priority)
+        if sys.platform == "win32":
+            win_class = getattr(subprocess, PRIORITY_CLASSES[priority]["win_class"], 0)
+            return {"creationflags": win_class}
+        return {}
+
+    def apply_priority(self, process, priority):
+        """Başlatılmış FFmpeg işlemine nice/ionice ve CPU affinity uygula
+
+        Uygulanamayan ayarların açıklamalarını liste olarak döndürür (ör. önceliği yükseltme
+        izni yoksa EPERM); boş liste her şeyin uygulandığını gösterir.
+        """
+        priority = self.normalize_priority(priority)
+        priority_class = PRIORITY_CLASSES[priority]
+        pid = process.pid
+        failures = []
+
+        if hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, priority_class["nice"])
+            except OSError as e:
+                logger.warning(f"nice değeri ayarlanamadı (pid {pid}): {str(e)}")
+                failures.append(f"nice: {str(e)}")
+
+        if sys.platform.startswith("linux"):
+            try:
+                result = subprocess.run(
+                    ["ionice", "-c", str(priority_class["ionice_class"]),
+                     "-n", str(priority_class["ionice_level"]), "-p", str(pid)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5
+                )
+                if result.returncode != 0:
+                    logger.warning(f"ionice ayarlanamadı (pid {pid}): çıkış kodu {result.returncode}")
+                    failures.append(f"ionice: çıkış kodu {result.returncode}")
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.warning(f"ionice ayarlanamadı (pid {pid}): {str(e)}")
+                failures.append(f"ionice: {str(e)}")
+
+        cpus = self.affinity.get(priority)
+        if cpus and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(pid, set(cpus))
+            except OSError as e:
+                logger.warning(f"CPU affinity ayarlanamadı (pid {pid}): {str(e)}")
+                failures.append(f"affinity: {str(e)}")
+        return failures
+
+class TaskExecutor:
+    """Uzun süren işleri arka planda çalıştırır, sonuçlarını arayüz iş parçacığına iletir
+
+    on_done(sonuç) ya da on_error(istisna) ui_call ile arayüz iş parçacığında çağrılır; submit()
+    bir Future döndürür ve bu Future geri çağırma çalıştıktan sonra tamamlanır. Böylece disk, ağ
+    ve işlem bekleme süreleri pencereyi dondurmaz, Tk yalnızca kendi iş parçacığından kullanılır.
+    """
+    def __init__(self, ui_call, max_workers=8):
+        self.ui_call = ui_call  # ui_call(fonksiyon, *argümanlar) -> arayüz iş parçacığında çalıştırır
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gorev")
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        reported = Future()
+
+        def report(future):
+            if future.cancelled():
+                # Kapanışta kuyrukta iptal edilen görev; arayüze bildirilecek bir sonuç yok
+                reported.cancel()
+                return
+            error = future.exception()
+            if error is not None and on_error is None:
+                logger.error(f"Arka plan görevi başarısız: {str(error)}")
+
+            def deliver():
+                try:
+                    if error is not None:
+                        if on_error:
+                            on_error(error)
+                    elif on_done:
+                        on_done(future.result())
+                finally:
+                    if error is not None:
+                        reported.set_exception(error)
+                    else:
+                        reported.set_result(future.result())
+
+            try:
+                self.ui_call(deliver)
+            except Exception as e:
+                # Pencere kapandıysa sonuç arayüze iletilemez
+                logger.warning(f"Görev sonucu arayüze iletilemedi: {str(e)}")
+                reported.set_exception(error or e)
+
+        self.executor.submit(fn, *args).add_done_callback(report)
+        return reported
+
+    def shutdown(self):
+        """Bekleyen görevleri iptal et; çalışanların bitmesi beklenmez"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class ChannelOrchestrator:
+    """Toplu kanal başlatma/durdurma işlemlerini arka planda paralel yürütür
+
+    Klasör tarama ve oynatma listesi hazırlığı iş parçacığı havuzunda paralel yapılır, FFmpeg
+    işlemleri ani yükü önlemek için 'stagger' saniye arayla başlatılır. Kanal bazında ilerleme
+    ve toplu sonuç, ui_call ile arayüz iş parçacığına iletilir.
+    """
+    def __init__(self, ui_call, max_workers=8, stagger=0.5, executor=None):
+        self.ui_call = ui_call  # ui_call(fonksiyon, *argümanlar) -> arayüz iş parçacığında çalıştırır
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kanal")
+        self.stagger = stagger
+        self.busy = 0
+        self._launch_lock = threading.Lock()
+        self._next_launch = 0.0
+
+    def _wait_launch_slot(self):
+        """Başlatmaları 'stagger' aralığıyla sıraya diz"""
+        with self._launch_lock:
+            now = time.monotonic()
+            launch_at = max(now, self._next_launch)
+            self._next_launch = launch_at + self.stagger
+        if launch_at > now:
+            time.sleep(launch_at - now)
+
+    def start_batch(self, channel_names, prepare, launch, on_progress, on_done):
+        """Kanalları paralel hazırla ve aralıklı başlat
+
+        prepare(kanal) -> başlatma bağlamı veya video yoksa None
+        launch(kanal, bağlam) -> FFmpeg işlemini başlatır
+        on_progress(kanal, durum, ayrıntı) durum: preparing, running, failed
+        on_done(sonuçlar) sonuçlar: {kanal: True/False}
+        """
+        def start_one(channel_name):
+            try:
+                self.ui_call(on_progress, channel_name, "preparing", "")
+                context = prepare(channel_name)
+                if context is None:
+                    self.ui_call(on_progress, channel_name, "failed", "video dosyası bulunamadı")
+                    return False
+                self._wait_launch_slot()
+                launch(channel_name, context)
+                self.ui_call(on_progress, channel_name, "running", "")
+                return True
+            except Exception as e:
+                logger.error(f"'{channel_name}' kanalı başlatılırken hata: {str(e)}")
+                self.ui_call(on_progress, channel_name, "failed", str(e))
+                return False
+
+        self._run_batch(channel_names, start_one, on_done)
+
+    def stop_batch(self, processes, on_progress, on_done, timeout=5):
+        """FFmpeg işlemlerini paralel durdur
+
+        processes: {kanal: Popen}
+        on_progress(kanal, durum, ayrıntı) durum: stopped, failed
+        """
+        def stop_one(channel_name):
+            process = processes[channel_name]
+            try:
+                process.terminate()
+                try:
+                    process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    logger.warning(f"'{channel_name}' kanalı {timeout} sn içinde kapanmadı, zorla sonlandırılıyor")
+                    process.kill()
+                    process.wait(timeout=timeout)
+                return True
+            except Exception as e:
+                logger.error(f"'{channel_name}' kanalı durdurulurken hata: {str(e)}")
+                return False
+
+        def stop_and_report(channel_name):
+            ok = stop_one(channel_name)
+            self.ui_call(on_progress, channel_name, "stopped" if ok else "failed", "")
+            return ok
+
+        self._run_batch(list(processes), stop_and_report, on_done)
+
+    def _run_batch(self, channel_names, worker, on_done):
+        self.busy += 1
+        futures = {name: self.executor.submit(run_with_log_context, worker, name, channel=name)
+                   for name in channel_names}
+
+        def collect():
+            results = {}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    results[name] = False
+            self.ui_call(self._finish_batch, on_done, results)
+
+        threading.Thread(target=collect, daemon=True).start()
+
+    def _finish_batch(self, on_done, results):
+        self.busy -= 1
+        on_done(results)
+
+class ChannelTelemetry:
+    """Tek bir kanalın FFmpeg -progress çıktısını ayrıştırır ve son örnekleri halka tamponda tutar"""
+    FIELDS = ("time", "speed", "fps", "bitrate_kbps", "total_size", "out_time_s",
+              "drop_frames", "dup_frames", "input_file")
+
+    def __init__(self, channel_name, history=300):
+        self.channel_name = channel_name
+        self.samples = deque(maxlen=history)
+        self.input_file = ""
+        self.last_error = ""
+        self._block = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _to_float(value, suffix=""):
+        value = value.strip()
+        if suffix and value.endswith(suffix):
+            value = value[:-len(suffix)]
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    def feed_progress_line(self, line):
+        """-progress çıktısındaki 'anahtar=değer' satırını işle; 'progress=' satırı bir örneği tamamlar"""
+        if "=" not in line:
+            return
+        key, value = line.split("=", 1)
+        if key != "progress":
+            self._block[key] = value
+            return
+
+        block, self._block = self._block, {}
+        out_time_us = self._to_float(block.get("out_time_us", block.get("out_time_ms", "")))
+        sample = {
+            "time": time.time(),
+            "speed": self._to_float(block.get("speed", ""), "x"),
+            "fps": self._to_float(block.get("fps", "")),
+            "bitrate_kbps": self._to_float(block.get("bitrate", ""), "kbits/s"),
+            "total_size": int(self._to_float(block.get("total_size", "")) or 0),
+            "out_time_s": out_time_us / 1000000 if out_time_us is not None else None,
+            "drop_frames": int(self._to_float(block.get("drop_frames", "")) or 0),
+            "dup_frames": int(self._to_float(block.get("dup_frames", "")) or 0),
+            "input_file": self.input_file
+        }
+        with self.lock:
+            self.samples.append(sample)
+
+    def feed_log_line(self, line):
+        """FFmpeg stderr satırını işle ('-loglevel level+info' biçiminde)"""
+        match = re.search(r"Opening '(.+)' for reading", line)
+        if match:
+            if not match.group(1).endswith("playlist.txt"):
+                self.input_file = match.group(1)
+            return
+        if "[error]" in line or "[fatal]" in line:
+            self.last_error = line
+            logger.error(f"[{self.channel_name}] FFmpeg: {line}")
+        elif "[warning]" in line:
+            logger.warning(f"[{self.channel_name}] FFmpeg: {line}")
+
+    def latest(self):
+        with self.lock:
+            return dict(self.samples[-1]) if self.samples else None
+
+    def history(self):
+        with self.lock:
+            return [dict(sample) for sample in self.samples]
+
+class FFmpegTelemetry:
+    """Kanal bazında FFmpeg telemetrisini toplar ve dışa aktarır
+
+    FFmpeg '-progress pipe:1' ile çalıştırılır; stdout ve stderr her kanal için ayrı
+    okuyucu iş parçacıklarında tüketilir, böylece boru tamponu dolup FFmpeg'i bekletmez.
+    """
+    def __init__(self, history=300):
+        self.history_size = history
+        self.channels = {}  # kanal adı -> ChannelTelemetry
+        self.lock = threading.Lock()
+
+    def ffmpeg_args(self):
+        """Telemetri için FFmpeg komutuna eklenecek parametreler"""
+        return ["-nostdin", "-nostats", "-loglevel", "level+info", "-progress", "pipe:1"]
+
+    def attach(self, channel_name, process):
+        """Yeni başlatılan FFmpeg işleminin çıktılarını okumaya başla"""
+        telemetry = ChannelTelemetry(channel_name, self.history_size)
+        with self.lock:
+            self.channels[channel_name] = telemetry
+
+        if process.stdout:
+            threading.Thread(target=self._read_stream, args=(process.stdout, telemetry.feed_progress_line),
+                             name=f"progress-{channel_name}", daemon=True).start()
+        if process.stderr:
+            threading.Thread(target=self._read_stream, args=(process.stderr, telemetry.feed_log_line),
+                             name=f"stderr-{channel_name}", daemon=True).start()
+        return telemetry
+
+    def _read_stream(self, stream, handler):
+        try:
+            for raw in iter(stream.readline, b""):
+                handler(raw.decode("utf-8", "replace").rstrip())
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def get(self, channel_name):
+        with self.lock:
+            return self.channels.get(channel_name)
+
+    def snapshot(self):
+        """Her kanalın son örneğini döndür"""
+        with self.lock:
+            channels = dict(self.channels)
+        return {name: telemetry.latest() for name, telemetry in channels.items()}
+
+    def export(self, path):
+        """Tüm zaman serisini JSON veya CSV (uzantıya göre) olarak kaydet"""
+        with self.lock:
+            channels = dict(self.channels)
+
+        if path.lower().endswith(".csv"):
+            import csv
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(("channel",) + ChannelTelemetry.FIELDS)
+                for name, telemetry in channels.items():
+                    for sample in telemetry.history():
+                        writer.writerow([name] + [sample.get(field) for field in ChannelTelemetry.FIELDS])
+        else:
+            data = {name: telemetry.history() for name, telemetry in channels.items()}
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+# Segment depolama modları
+SEGMENT_STORE_MODES = ("disk", "tmpfs", "memory")
+
+class MemorySegmentStore:
+    """FFmpeg'in HTTP PUT ile gönderdiği HLS dosyalarını bellekte tutar
+
+    Her kanal için yalnızca son 'window' kadar segment saklanır, eskileri otomatik silinir.
+    """
+    def __init__(self, window=12):
+        self.window = max(3, window)
+        self.files = {}     # "/kanal/dosya" -> (içerik, değişiklik zamanı)
+        self.segments = {}  # kanal adı -> segment yolları (eskiden yeniye)
+        self.lock = threading.Lock()
+
+    def _channel_of(self, path):
+        return path.lstrip("/").split("/", 1)[0]
+
+    def put(self, path, data):
+        with self.lock:
+            self.files[path] = (data, time.time())
+            if not path.endswith(".ts"):
+                return
+
+            channel_segments = self.segments.setdefault(self._channel_of(path), deque())
+            if path in channel_segments:
+                channel_segments.remove(path)
+            channel_segments.append(path)
+
+            # Pencerenin dışında kalan eski segmentleri at
+            while len(channel_segments) > self.window:
+                self.files.pop(channel_segments.popleft(), None)
+
+    def get(self, path):
+        with self.lock:
+            return self.files.get(path)
+
+    def delete(self, path):
+        with self.lock:
+            channel_segments = self.segments.get(self._channel_of(path))
+            if channel_segments and path in channel_segments:
+                channel_segments.remove(path)
+            return self.files.pop(path, None) is not None
+
+    def clear_channel(self, channel_name):
+        """Kanala ait tüm dosyaları bellekten sil"""
+        prefix = f"/{channel_name}/"
+        with self.lock:
+            for path in [p for p in self.files if p.startswith(prefix)]:
+                del self.files[path]
+            self.segments.pop(channel_name, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "files": len(self.files),
+                "bytes": sum(len(data) for data, _ in self.files.values())
+            }
+
+class SegmentCache:
+    """Sık istenen HLS dosyalarını bellekte tutan, bayt sınırlı LRU önbellek
+
+    Kayıtlar dosyanın değişiklik zamanı ve boyutuyla eşlenir; FFmpeg dosyayı yeniden yazınca
+    kayıt geçersiz olur. Oynatma listeleri kısa bir süre (playlist_ttl) diske bakılmadan sunulur.
+    Aynı dosyayı aynı anda isteyen izleyiciler tek bir disk okumasını bekler. Önbellekten sunulan
+    dosyalar bellekten yazılır, sendfile kullanılmaz; max_entry_bytes'tan büyük dosyalar önbelleğe
+    alınmaz, diskten sendfile ile sunulur.
+    """
+    CACHEABLE = (".m3u8", ".ts")
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, playlist_ttl=1.0):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max(1, max_bytes // 8)  # Tek dosya önbelleğin tamamını boşaltmasın
+        self.playlist_ttl = playlist_ttl
+        self.entries = OrderedDict()  # yol -> (içerik, mtime, sürüm, son kontrol zamanı)
+        self.loading = {}  # yol -> okuma bitince işaretlenen Event
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def cacheable(self, path):
+        return path.endswith(self.CACHEABLE)
+
+    def get(self, path):
+        """Dosyayı (içerik, değişiklik zamanı) olarak döndür; dosya yoksa OSError fırlatır
+
+        Dosya önbelleğe alınamayacak kadar büyükse None döner, çağıran diskten sunmalıdır.
+        """
+        with self.lock:
+            entry = self.entries.get(path)
+            if (entry is not None and path.endswith(".m3u8")
+                    and time.monotonic() - entry[3] < self.playlist_ttl):
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[0], entry[1]
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            raise
+        if st.st_size > self.max_entry_bytes:
+            self.invalidate(path)
+            return None
+        version = (st.st_mtime_ns, st.st_size)
+
+        while True:
+            with self.lock:
+                entry = self.entries.get(path)
+                if entry is not None and entry[2] == version:
+                    self.entries[path] = (entry[0], entry[1], version, time.monotonic())
+                    self.entries.move_to_end(path)
+                    self.hits += 1
+                    return entry[0], entry[1]
+                event = self.loading.get(path)
+                if event is None:
+                    event = self.loading[path] = threading.Event()
+                    self.misses += 1
+                    break
+            # Başka bir iş parçacığı dosyayı okuyor, onu bekle
+            event.wait()
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            self._put(path, data, st.st_mtime, version)
+            return data, st.st_mtime
+        finally:
+            with self.lock:
+                self.loading.pop(path, None)
+            event.set()
+
+    def _put(self, path, data, mtime, version):
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.size -= len(old[0])
+            if len(data) > self.max_entry_bytes:
+                return
+            self.entries[path] = (data, mtime, version, time.monotonic())
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (evicted, _, _, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def invalidate(self, path):
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.size -= len(old[0])
+
+    def stats(self):
+        with self.lock:
+            requests_total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests_total if requests_total else 0.0
+            }
+
+class ViewerSessions:
+    """İstemci adresi ve kanal bazında izleyici oturumları
+
+    Kanalın oynatma listesini veya segmentlerini isteyen her istemci bir oturum açar; 'timeout'
+    süresince yeni istek gelmezse oturum kapanır. Kanal başına dakikalık en yüksek eşzamanlı
+    izleyici sayısı geçmişi tutulur.
+    """
+    def __init__(self, timeout=30, history_minutes=24 * 60, track_activity=False):
+        self.timeout = timeout
+        self.sessions = {}  # (kanal, istemci) -> [başlangıç, son istek, bayt]
+        self.activity = {} if track_activity else None  # Son raporlamadan beri (kanal, istemci) -> bayt
+        self.counts = {}    # kanal -> açık oturum sayısı
+        self.peaks = {}     # kanal -> tüm zamanların en yüksek eşzamanlı izleyici sayısı
+        self.history = {}   # kanal -> deque([dakika başlangıcı, en yüksek izleyici])
+        self.history_minutes = history_minutes
+        self.last_sweep = 0
+        self.lock = threading.Lock()
+
+    def touch(self, channel_name, client, sent_bytes=0):
+        """Kanal isteğini oturuma işle (HTTP işleyicisinden her istekte çağrılır)"""
+        now = time.time()
+        key = (channel_name, client)
+        with self.lock:
+            if self.activity is not None:
+                self.activity[key] = self.activity.get(key, 0) + sent_bytes
+            session = self.sessions.get(key)
+            if session is None:
+                self.sessions[key] = [now, now, sent_bytes]
+                count = self.counts[channel_name] = self.counts.get(channel_name, 0) + 1
+                self.peaks[channel_name] = max(self.peaks.get(channel_name, 0), count)
+                self._record(channel_name, count, now)
+                METRICS.inc("iptv_viewer_sessions_total", channel=channel_name)
+            else:
+                session[1] = now
+                session[2] += sent_bytes
+            if now - self.last_sweep >= 1:
+                self._sweep(now)
+
+    def _record(self, channel_name, count, now):
+        minute = int(now // 60) * 60
+        history = self.history.get(channel_name)
+        if history is None:
+            history = self.history[channel_name] = deque(maxlen=self.history_minutes)
+        if history and history[-1][0] == minute:
+            history[-1][1] = max(history[-1][1], count)
+        else:
+            history.append([minute, count])
+
+    def _sweep(self, now):
+        """Zaman aşımına uğrayan oturumları kapat"""
+        self.last_sweep = now
+        for key, session in list(self.sessions.items()):
+            if now - session[1] > self.timeout:
+                del self.sessions[key]
+                self.counts[key[0]] -= 1
+        for channel_name, count in self.counts.items():
+            self._record(channel_name, count, now)
+
+    def drain_activity(self):
+        """Son çağrıdan beri istek yapan istemcileri [kanal, istemci, bayt] listesi olarak döndür"""
+        with self.lock:
+            activity, self.activity = self.activity or {}, {}
+        return [[channel_name, client, sent_bytes] for (channel_name, client), sent_bytes in activity.items()]
+
+    def counts_snapshot(self):
+        """Kanal başına açık oturum sayısı"""
+        with self.lock:
+            self._sweep(time.time())
+            return dict(self.counts)
+
+    def snapshot(self, history=True):
+        """Kanal başına anlık izleyici, en yüksek değerler ve dakikalık geçmiş"""
+        with self.lock:
+            now = time.time()
+            self._sweep(now)
+            result = {}
+            for channel_name, count in self.counts.items():
+                channel_history = list(self.history.get(channel_name, ()))
+                result[channel_name] = {
+                    "viewers": count,
+                    "peak_1h": max([peak for minute, peak in channel_history if now - minute < 3600] or [count]),
+                    "peak_24h": max([peak for minute, peak in channel_history if now - minute < 86400] or [count]),
+                    "peak": self.peaks.get(channel_name, count),
+                    "bytes": sum(session[2] for key, session in self.sessions.items() if key[0] == channel_name)
+                }
+                if history:
+                    result[channel_name]["history"] = [list(item) for item in channel_history]
+            return result
+
+class ChannelCatalog:
+    """Kanal listesinden /playlist.m3u, EPG dosyasından /epg.xml yanıtlarını üretir
+
+    Üretilen içerik yapılandırma ya da EPG değişene kadar bellekte tutulur. Adres isteğin Host
+    başlığından alınır; böylece aynı uç nokta her ağ arayüzünde çalışır.
+    """
+    def __init__(self, channels_provider, worker_url=None, epg_path=""):
+        self.channels_provider = channels_provider  # Güncel kanal listesini döndüren fonksiyon
+        self.worker_url = worker_url  # Kanal bir çalışandaysa onun adresini döndüren fonksiyon
+        self.epg_path = epg_path
+        self.updated = time.time()
+        self.playlists = {}  # (adres, EPG zamanı) -> içerik
+        self.epg = None      # (EPG zamanı, içerik)
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        """Kanal yapılandırması değişti, oynatma listesi yeniden üretilsin"""
+        with self.lock:
+            self.playlists.clear()
+            self.updated = time.time()
+
+    def set_epg_file(self, path):
+        with self.lock:
+            self.epg_path = path
+            self.epg = None
+            self.playlists.clear()
+            self.updated = time.time()
+
+    def epg_xml(self):
+        """EPG içeriğini (içerik, değişiklik zamanı) olarak döndür; EPG yoksa None"""
+        try:
+            mtime = os.path.getmtime(self.epg_path)
+        except (OSError, TypeError):
+            return None
+        with self.lock:
+            if self.epg is not None and self.epg[0] == mtime:
+                return self.epg[1], mtime
+        with open(self.epg_path, "rb") as f:
+            data = f.read()
+        with self.lock:
+            self.epg = (mtime, data)
+        return data, mtime
+
+    def playlist_m3u(self, base_url):
+        """Tüm kanalları içeren M3U listesini (içerik, değişiklik zamanı) olarak döndür"""
+        epg = self.epg_xml()
+        epg_mtime = epg[1] if epg else None
+        key = (base_url, epg_mtime)
+        with self.lock:
+            data = self.playlists.get(key)
+            mtime = max(self.updated, epg_mtime or 0)
+        if data is not None:
+            return data, mtime
+
+        lines = [f'#EXTM3U url-tvg="{base_url}/epg.xml"' if epg else "#EXTM3U"]
+        for channel in list(self.channels_provider()):
+            # Logo ve EPG bilgilerini al
+            logo = channel.get("logo", "")
+            epg_url = channel.get("epg_url", "")
+            epg_id = channel.get("epg_id", "")
+
+            # EXTINF satırını oluştur - logo ve EPG varsa ekle
+            extinf_line = f'#EXTINF:-1 tvg-id="{epg_id if epg_id else channel["name"]}" tvg-name="{channel["name"]}" group-title="Yerel"'
+            if logo:
+                extinf_line += f' tvg-logo="{logo}"'
+            if epg_url:
+                extinf_line += f' tvg-epg="{epg_url}"'
+            lines.append(f'{extinf_line},{channel["name"]}')
+
+            # Kanal bir çalışana yerleştirildiyse o çalışanın adresini kullan
+            channel_base_url = (self.worker_url(channel) if self.worker_url else None) or base_url
+            lines.append(f'{channel_base_url}/{quote(channel["name"])}/{quote(channel["name"])}.m3u8')
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        with self.lock:
+            # Sahte Host başlıklarıyla önbellek şişmesin
+            if len(self.playlists) >= 32:
+                self.playlists.clear()
+            self.playlists[key] = data
+        return data, mtime
+
+class TokenBucket:
+    """Bağlantı başına bant genişliği sınırlamak için jeton kovası (bayt/sn)
+
+    Tek bir bağlantının iş parçacığı tarafından kullanıldığı için kilit gerektirmez.
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def consume(self, amount):
+        """'amount' bayt gönderilebilene kadar bekle"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens < 0:
+            time.sleep(-self.tokens / self.rate)
+
+class HLSHTTPServer(socketserver.TCPServer):
+    """Sınırlı boyutlu iş parçacığı havuzuyla çalışan HLS sunucusu
+
+    Her bağlantı havuzdaki bir iş parçacığında işlenir; yavaş bir istemci diğer izleyicilerin
+    oynatma listesi yenilemesini bekletmez. Kabul döngüsü hiç beklemez: havuz doluysa istek
+    arasında boşta bekleyen bir keep-alive bağlantısı kapatılıp yeri yeni bağlantıya verilir, boşta
+    bağlantı yoksa 503 döndürülür (yerel istemciler havuz kuyruğunda bekler).
+
+    max_connections aşılırsa 503, bir istemcinin max_connections_per_ip sınırı aşılırsa 429 yanıtı
+    verilip bağlantı kapatılır. rate_limit_kbps her bağlantının gönderim hızını sınırlar. Yerel
+    makineden gelen bağlantılar (FFmpeg, yönetici) sınırlara takılmaz.
+    """
+    allow_reuse_address = True  # Yeniden başlatmada TIME_WAIT yüzünden port meşgul hatası alınmasın
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler, max_workers=256, keepalive_timeout=10,
+                 max_connections=0, max_connections_per_ip=0, rate_limit_kbps=0, reuse_port=False):
+        self.reuse_port = reuse_port  # Aynı portu birden çok süreç paylaşır (SO_REUSEPORT)
+        self.aggregate_dir = None     # Çok süreçli modda birleştirilmiş metrik dosyalarının dizini
+        self.max_workers = max(1, max_workers)
+        self.keepalive_timeout = keepalive_timeout
+        self.max_connections = max_connections  # 0 = sınırsız
+        self.max_connections_per_ip = max_connections_per_ip  # 0 = sınırsız
+        self.rate_limit = rate_limit_kbps * 1000 // 8  # bayt/sn, 0 = sınırsız
+        self.connections = 0
+        self.connections_by_ip = {}
+        self.connections_lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http")
+        self.open_requests = {}  # soket -> [durum, Future]; durum: busy, idle, closing
+        self.active = 0   # havuza verilmiş, henüz bitmemiş bağlantılar
+        self.closing = 0  # yer açmak için kapatılan, iş parçacığı henüz bitmemiş bağlantılar
+        self.sessions = None  # ViewerSessions (ChannelRunner atar)
+        self.control = None   # /api/ denetim uç noktalarını uygulayan nesne (uygulama ya da başsız servis)
+        self.api_token = ""   # Boşsa denetim API'si yalnızca yerel istemcilere açıktır
+        super().__init__(server_address, handler)
+        METRICS.add_collector(self.collect_metrics)
+
+    def collect_metrics(self):
+        """İzleyici ve önbellek metrikleri"""
+        if self.sessions is not None:
+            for channel_name, count in self.sessions.counts_snapshot().items():
+                yield "iptv_active_viewers", {"channel": channel_name}, count
+
+        yield "iptv_http_open_connections", {}, self.connections
+
+        cache = getattr(self, "segment_cache", None)
+        if cache is not None:
+            stats = cache.stats()
+            yield "iptv_segment_cache_bytes", {}, stats["bytes"]
+            yield "iptv_segment_cache_hits_total", {}, stats["hits"]
+            yield "iptv_segment_cache_misses_total", {}, stats["misses"]
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    @staticmethod
+    def is_local_address(address):
+        return address in ("127.0.0.1", "::1", "::ffff:127.0.0.1")
+
+    def _admit(self, client):
+        """Bağlantı kabul edilecekse None, reddedilecekse HTTP durum kodu döndür"""
+        with self.connections_lock:
+            if not self.is_local_address(client):
+                if self.max_connections and self.connections >= self.max_connections:
+                    return 503
+                if self.max_connections_per_ip and self.connections_by_ip.get(client, 0) >= self.max_connections_per_ip:
+                    return 429
+            self.connections += 1
+            self.connections_by_ip[client] = self.connections_by_ip.get(client, 0) + 1
+        return None
+
+    def _release_connection(self, client):
+        with self.connections_lock:
+            self.connections -= 1
+            remaining = self.connections_by_ip.get(client, 1) - 1
+            if remaining > 0:
+                self.connections_by_ip[client] = remaining
+            else:
+                self.connections_by_ip.pop(client, None)
+
+    def _reject(self, request, code):
+        """Sınır aşıldığında kısa bir hata yanıtı gönderip bağlantıyı kapat (kabul iş parçacığında)"""
+        reason = "Service Unavailable" if code == 503 else "Too Many Requests"
+        METRICS.inc("iptv_http_rejected_total", code=str(code))
+        try:
+            request.settimeout(1)
+            request.sendall(f"HTTP/1.1 {code} {reason}\r\nRetry-After: 2\r\nContent-Length: 0\r\n"
+                            f"Connection: close\r\n\r\n".encode("ascii"))
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        code = self._admit(client_address[0])
+        if code:
+            self._reject(request, code)
+            return
+
+        idle = None
+        full = False
+        with self.connections_lock:
+            if self.active - self.closing >= self.max_workers:
+                # Havuz dolu: istekler arasında boşta bekleyen bir keep-alive bağlantısını bırak
+                idle = next((sock for sock, entry in self.open_requests.items() if entry[0] == "idle"), None)
+                if idle is not None:
+                    self.open_requests[idle][0] = "closing"
+                    self.closing += 1
+                else:
+                    # FFmpeg ve yönetici reddedilmez, havuz kuyruğunda bekler
+                    full = not self.is_local_address(client_address[0])
+            if not full:
+                self.active += 1
+                self.open_requests[request] = ["busy", None]
+        if idle is not None:
+            self._shutdown_socket(idle)
+        if full:
+            self._release_connection(client_address[0])
+            self._reject(request, 503)
+            return
+
+        try:
+            future = self.pool.submit(self._process_in_pool, request, client_address)
+        except RuntimeError:
+            # Havuz kapatıldı
+            self._finish(request, client_address)
+            self.shutdown_request(request)
+            return
+        with self.connections_lock:
+            if request in self.open_requests:
+                self.open_requests[request][1] = future
+
+    def mark_request(self, request, state):
+        """İşleyici bağlantının bir istek işlediğini (busy) ya da sonrakini beklediğini (idle) bildirir"""
+        with self.connections_lock:
+            entry = self.open_requests.get(request)
+            if entry is not None and entry[0] != "closing":
+                entry[0] = state
+
+    @staticmethod
+    def _shutdown_socket(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _finish(self, request, client_address):
+        with self.connections_lock:
+            entry = self.open_requests.pop(request, None)
+            if entry is not None:
+                self.active -= 1
+                if entry[0] == "closing":
+                    self.closing -= 1
+        self._release_connection(client_address[0])
+
+    def _process_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except ConnectionError:
+            pass  # İstemci ayrıldı ya da bağlantı yer açmak/kapanış için kesildi
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._finish(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        # Açık bağlantıları kapat: okumada bekleyen iş parçacıkları uyanır, kuyrukta iptal edilenlerin
+        # soketleri burada kapatılır
+        with self.connections_lock:
+            entries = list(self.open_requests.items())
+        for sock, (state, future) in entries:
+            self._shutdown_socket(sock)
+            if future is not None and future.cancelled():
+                sock.close()
+        METRICS.remove_collector(self.collect_metrics)
+
+class HLSRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """HLS çıktısını sunan HTTP/1.1 işleyicisi
+
+    Bağlantılar keep-alive ile açık tutulur, boşta kalan bağlantı sunucunun keepalive_timeout
+    süresi sonunda kapanır. Bellek deposu etkinse dosyalar önce bellekten sunulur. FFmpeg'in
+    PUT/DELETE istekleri yalnızca yerel makineden kabul edilir.
+
+    Diskteki dosyalar sendfile ile (kullanıcı alanına kopyalamadan) gönderilir, tek aralıklı
+    Range istekleri 206 Partial Content ile yanıtlanır. Sunucuda segment önbelleği varsa HLS
+    dosyaları önbellekten (bellekten, sendfile olmadan) sunulur; önbelleğe sığmayan dosyalar
+    yine diskten sendfile ile gönderilir.
+
+    Canlı oynatma listeleri kısa süreli, segmentler ise değişmez olarak önbelleğe alınabilir;
+    ETag ve Last-Modified ile koşullu isteklere 304 döndürülür.
+    """
+    protocol_version = "HTTP/1.1"
+    use_sendfile = True
+    playlist_max_age = 1  # Canlı oynatma listesinin istemci/proxy önbelleğinde kalma süresi (sn)
+    segment_max_age = 365 * 24 * 3600
+    extensions_map = dict(http.server.SimpleHTTPRequestHandler.extensions_map, **{
+        ".m3u8": "application/vnd.apple.mpegurl",
+        ".m3u": "audio/x-mpegurl",
+        ".ts": "video/mp2t",
+        ".m4s": "video/iso.segment",
+        ".xml": "application/xml"
+    })
+
+    def setup(self):
+        self.timeout = getattr(self.server, "keepalive_timeout", None)
+        super().setup()
+        # Bağlantı başına bant genişliği sınırı (keep-alive istekleri aynı kovayı paylaşır)
+        rate = getattr(self.server, "rate_limit", 0)
+        self.bucket = TokenBucket(rate) if rate and not self._is_local_client() else None
+
+    def handle_one_request(self):
+        # Keep-alive bağlantısında önceki isteğin bilgileri kalmasın
+        self.command = None
+        self._status = None
+        self._sent_bytes = 0
+        # Sonraki istek beklenirken bağlantı boşta sayılır; havuz dolarsa sunucu onu kapatabilir
+        mark_request = getattr(self.server, "mark_request", None)
+        if mark_request:
+            mark_request(self.request, "idle")
+        super().handle_one_request()
+        if self.command is None or self._status is None:
+            return
+
+        route = self._route()
+        METRICS.inc("iptv_http_requests_total", route=route, code=str(self._status))
+        METRICS.observe("iptv_http_request_duration_seconds", time.perf_counter() - self._started, route=route)
+        if route in ("hls_playlist", "hls_segment") and self._status < 400:
+            channel_name = self._request_path().lstrip("/").split("/", 1)[0]
+            if self._sent_bytes:
+                METRICS.inc("iptv_http_sent_bytes_total", self._sent_bytes, channel=channel_name)
+            sessions = getattr(self.server, "sessions", None)
+            if sessions is not None:
+                sessions.touch(channel_name, self.client_address[0], self._sent_bytes)
+
+    def parse_request(self):
+        # Süre ölçümü istek satırı okunduktan sonra başlar (keep-alive bekleme süresi sayılmaz)
+        self._started = time.perf_counter()
+        mark_request = getattr(self.server, "mark_request", None)
+        if mark_request:
+            mark_request(self.request, "busy")
+        return super().parse_request()
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def _route(self):
+        """Metrikler için istek rotası"""
+        path = self._request_path()
+        if self.command in ("PUT", "POST", "DELETE") and not path.startswith(("/_worker/", "/api/")):
+            return "ingest"
+        if path == "/metrics":
+            return "metrics"
+        if path.startswith("/api/"):
+            return "api"
+        if path in ("/playlist.m3u", "/epg.xml"):
+            return path.lstrip("/").replace(".", "_")
+        if path.startswith("/_worker/"):
+            return "worker_api"
+        if path.endswith(".m3u8"):
+            return "hls_playlist"
+        if path.endswith((".ts", ".m4s")):
+            return "hls_segment"
+        return "other"
+
+    def _store(self):
+        return getattr(self.server, "segment_store", None)
+
+    def _send_json(self, code, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self._request_path()
+        if path == "/api/viewers":
+            aggregate = self._aggregate_file("viewers.json")
+            if aggregate is not None:
+                self._send_json(200, json.loads(aggregate))
+                return
+            sessions = getattr(self.server, "sessions", None)
+            self._send_json(200, sessions.snapshot() if sessions is not None else {})
+            return
+        if path.startswith("/api/"):
+            self._handle_api()
+            return
+        super().do_GET()
+
+    def _api_authorized(self):
+        token = getattr(self.server, "api_token", "")
+        if not token:
+            return self._is_local_client()
+        import hmac
+        supplied = self.headers.get("X-API-Token", "")
+        authorization = self.headers.get("Authorization", "")
+        if not supplied and authorization.startswith("Bearer "):
+            supplied = authorization[7:].strip()
+        return hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8"))
+
+    def _handle_api(self):
+        """Kanal, EPG ve iş denetim API'si (/api/...)
+
+        Uzun işlemler (başlat/durdur/yeniden başlat, EPG) 202 ile iş kimliği döndürür; ilerleme
+        GET /api/jobs/<kimlik> ile izlenir.
+        """
+        control = getattr(self.server, "control", None)
+        if control is None:
+            self._send_json(503, {"error": "Denetim API'si bu sunucuda kullanılamıyor"})
+            return
+        if not self._api_authorized():
+            self._send_json(401, {"error": "Yetkisiz istek (X-API-Token gerekli)"})
+            return
+
+        parts = [part for part in self._request_path().split("/") if part][1:]
+        try:
+            data = None
+            if self.command in ("POST", "PUT"):
+                data = json.loads(self._read_body().decode("utf-8") or "{}")
+                if not isinstance(data, dict):
+                    raise ValueError("İstek gövdesi JSON nesnesi olmalı")
+            code, result = self._api_dispatch(control, parts, data)
+        except KeyError as e:
+            code, result = 404, {"error": f"Bulunamadı: {e.args[0] if e.args else ''}"}
+        except ValueError as e:
+            code, result = 400, {"error": str(e)}
+        except Exception as e:
+            logger.error(f"Denetim API hatası ({self.command} {self.path}): {str(e)}", exc_info=True)
+            code, result = 500, {"error": str(e)}
+        self._send_json(code, result)
+
+    def _api_dispatch(self, control, parts, data):
+        """(durum kodu, yanıt) döndür"""
+        method = self.command
+        if parts == ["status"] and method == "GET":
+            return 200, control.api_status()
+        if parts == ["channels"]:
+            if method == "GET":
+                return 200, control.api_channels()
+            if method == "POST":
+                return 201, control.api_save_channel(None, data)
+        if parts == ["channels", "actions"] and method == "POST":
+            # Toplu işlem: {"action": "start", "channels": [...]} (kanal listesi yoksa tümü)
+            return 202, self._api_channel_job(control, data.get("action"), data.get("channels"))
+        if len(parts) == 2 and parts[0] == "channels":
+            if method == "GET":
+                channel = next((ch for ch in control.api_channels() if ch["name"] == parts[1]), None)
+                if channel is None:
+                    raise KeyError(parts[1])
+                return 200, channel
+            if method == "PUT":
+                return 200, control.api_save_channel(parts[1], data)
+            if method == "DELETE":
+                return 200, control.api_delete_channel(parts[1])
+        if len(parts) == 3 and parts[0] == "channels" and method == "POST":
+            return 202, self._api_channel_job(control, parts[2], [parts[1]])
+        if parts == ["epg"] and method == "POST":
+            days = data.get("days")
+            if days is not None and (not isinstance(days, int) or days < 1):
+                raise ValueError("days pozitif bir tam sayı olmalı")
+            return 202, control.jobs.submit("epg", control.api_generate_epg, data.get("folders"), days,
+                                            data.get("output"))
+        if parts == ["logs"] and method == "GET":
+            # Süzme sunucuda yapılır: ?level=WARNING&channel=...&before=<ofset>|after=<ofset>&limit=<bayt>
+            query = dict(parse_qsl(urlsplit(self.path).query))
+            offsets = {}
+            for key in ("before", "after", "limit"):
+                if key in query:
+                    if not query[key].isdigit():
+                        raise ValueError(f"{key} negatif olmayan bir tam sayı olmalı")
+                    offsets[key] = int(query[key])
+            offsets["limit"] = min(max(offsets.get("limit", 64 * 1024), 1), 1024 * 1024)
+            level = query.get("level", "").upper() or None
+            if level and level not in LOG_LEVELS:
+                raise ValueError(f"Geçersiz seviye: {level} (geçerli: {', '.join(LOG_LEVELS)})")
+            if not os.path.exists(log_file):
+                raise KeyError("günlük dosyası")
+            return 200, read_log_window(log_file, level=level, channel=query.get("channel"), **offsets)
+        if parts == ["jobs"] and method == "GET":
+            return 200, control.jobs.list()
+        if len(parts) == 2 and parts[0] == "jobs" and method == "GET":
+            return 200, control.jobs.get(parts[1])
+        return 404, {"error": "Bilinmeyen uç nokta"}
+
+    def _api_channel_job(self, control, action, names):
+        if action not in CHANNEL_ACTIONS:
+            raise ValueError(f"Geçersiz işlem: {action} (geçerli: {', '.join(CHANNEL_ACTIONS)})")
+        if names is not None and (not isinstance(names, list) or not all(isinstance(n, str) for n in names)):
+            raise ValueError("channels kanal adlarından oluşan bir liste olmalı")
+        return control.jobs.submit(f"channels.{action}", control.api_channel_action, action, names)
+
+    def _aggregate_file(self, name):
+        """Çok süreçli modda yöneticinin yazdığı birleştirilmiş dosyayı oku (yoksa None)"""
+        aggregate_dir = getattr(self.server, "aggregate_dir", None)
+        if not aggregate_dir:
+            return None
+        try:
+            with open(os.path.join(aggregate_dir, name), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _request_path(self):
+        return unquote(urlsplit(self.path).path)
+
+    def _is_local_client(self):
+        return HLSHTTPServer.is_local_address(self.client_address[0])
+
+    def send_head(self):
+        self._byte_range = None
+        store = self._store()
+        if store is not None:
+            entry = store.get(self._request_path())
+            if entry is not None:
+                data, mtime = entry
+                if not self._send_file_headers(self._request_path(), len(data), mtime):
+                    return None
+                return io.BytesIO(data)
+
+        if self._request_path() == "/metrics":
+            data = self._aggregate_file("metrics.prom") or METRICS.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            return io.BytesIO(data)
+
+        catalog = getattr(self.server, "catalog", None)
+        if catalog is not None and self._request_path() in ("/playlist.m3u", "/epg.xml"):
+            return self._send_catalog(catalog)
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) or path.endswith("/"):
+            # Dizin listesi ve yönlendirmeler standart işleyicide kalsın
+            return super().send_head()
+
+        # Önbellekteki veri bellekten yazılır, sendfile yolu atlanır; büyük dosyalar diskten sunulur
+        cache = getattr(self.server, "segment_cache", None)
+        if cache is not None and cache.cacheable(path):
+            try:
+                cached = cache.get(path)
+            except OSError:
+                self.send_error(404, "File not found")
+                return None
+            if cached is not None:
+                data, mtime = cached
+                if not self._send_file_headers(path, len(data), mtime):
+                    return None
+                return io.BytesIO(data)
+
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        try:
+            fs = os.fstat(f.fileno())
+            if not self._send_file_headers(path, fs.st_size, fs.st_mtime):
+                f.close()
+                return None
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def _base_url(self):
+        """İstemcinin bağlandığı adres (Host başlığı, yoksa soketin yerel adresi)"""
+        host = self.headers.get("Host", "")
+        if not host or not re.fullmatch(r"[A-Za-z0-9.\-]+(:\d+)?|\[[0-9A-Fa-f:.]+\](:\d+)?", host):
+            address, port = self.connection.getsockname()[:2]
+            host = f"[{address}]:{port}" if ":" in address else f"{address}:{port}"
+        return f"http://{host}"
+
+    def _send_catalog(self, catalog):
+        path = self._request_path()
+        entry = catalog.playlist_m3u(self._base_url()) if path == "/playlist.m3u" else catalog.epg_xml()
+        if entry is None:
+            self.send_error(404, "File not found", "EPG henüz oluşturulmadı")
+            return None
+        data, mtime = entry
+        if not self._send_file_headers(path, len(data), mtime):
+            return None
+        return io.BytesIO(data)
+
+    def _parse_range(self, size):
+        """Range başlığını çözümle: None (tam yanıt), (başlangıç, bitiş) veya "invalid" döndür"""
+        header = self.headers.get("Range")
+        if not header or not header.startswith("bytes="):
+            return None
+
+        # If-Range eşleşmiyorsa dosya değişmiş demektir, tamamını gönder
+        if_range = self.headers.get("If-Range")
+        if if_range and if_range not in (self._etag, self._last_modified):
+            return None
+
+        spec = header[len("bytes="):].strip()
+        if "," in spec:
+            # Çoklu aralık desteklenmiyor
+            return None
+        start_text, _, end_text = spec.partition("-")
+        try:
+            if not start_text:
+                # Son N bayt
+                length = int(end_text)
+                if length <= 0:
+                    return "invalid"
+                return max(0, size - length), size - 1
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        except ValueError:
+            return None
+        if start >= size or end < start:
+            return "invalid"
+        return start, min(end, size - 1)
+
+    def _cache_control(self, path):
+        """Dosya türüne göre önbellek politikası"""
+        if path.endswith(".m3u8"):
+            return f"public, max-age={self.playlist_max_age}"
+        if path.endswith((".ts", ".m4s")):
+            # Segment adları her yayın başlangıcında değişir, içerikleri hiç değişmez
+            return f"public, max-age={self.segment_max_age}, immutable"
+        return "no-cache"
+
+    def _not_modified(self, mtime):
+        """İstemcideki kopya güncelse True (If-None-Match, yoksa If-Modified-Since)"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or self._etag in tags or f"W/{self._etag}" in tags
+
+        if "If-Modified-Since" in self.headers:
+            try:
+                since = email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"])
+                return since.tzinfo is not None and int(mtime) <= since.timestamp()
+            except (TypeError, IndexError, OverflowError, ValueError):
+                pass
+        return False
+
+    def _send_validators(self, path):
+        self.send_header("ETag", self._etag)
+        self.send_header("Last-Modified", self._last_modified)
+        self.send_header("Cache-Control", self._cache_control(path))
+
+    def _send_file_headers(self, path, size, mtime):
+        """Dosya yanıtının başlıklarını gönder; gövde gönderilmeyecekse False döndür"""
+        self._last_modified = self.date_time_string(mtime)
+        self._etag = f'"{int(mtime * 1000000):x}-{size:x}"'
+
+        if self._not_modified(mtime):
+            self.send_response(304)
+            self._send_validators(path)
+            self.end_headers()
+            return False
+
+        byte_range = self._parse_range(size)
+        if byte_range == "invalid":
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return False
+
+        if byte_range:
+            start, end = byte_range
+            self._byte_range = (start, end - start + 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.send_header("Content-Length", str(end - start + 1))
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", str(size))
+        self.send_header("Content-type", self.guess_type(path))
+        self._send_validators(path)
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        return True
+
+    def copyfile(self, source, outputfile):
+        start, length = self._byte_range or (0, None)
+
+        if self.bucket is not None:
+            self._copy_shaped(source, outputfile, start, length)
+            return
+
+        if isinstance(source, io.BytesIO):
+            # getvalue paylaşılan bytes nesnesini kopyalamadan döndürür
+            data = memoryview(source.getvalue())
+            data = data[start:start + length] if length is not None else data[start:]
+            outputfile.write(data)
+            self._sent_bytes = len(data)
+            return
+
+        if self.use_sendfile:
+            # Çekirdek dosyayı doğrudan sokete kopyalar (sendfile yoksa socket.sendfile send'e döner)
+            self._sent_bytes = self.connection.sendfile(source, start, length)
+            return
+
+        source.seek(start)
+        if length is None:
+            shutil.copyfileobj(source, outputfile)
+            self._sent_bytes = source.tell() - start
+            return
+        remaining = length
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+        self._sent_bytes = length - remaining
+
+    def _copy_shaped(self, source, outputfile, start, length):
+        """Jeton kovasına göre parça parça gönder"""
+        chunk_size = int(max(1024, min(64 * 1024, self.bucket.capacity)))
+        if isinstance(source, io.BytesIO):
+            data = memoryview(source.getvalue())
+            end = start + length if length is not None else len(data)
+            for offset in range(start, end, chunk_size):
+                chunk = data[offset:min(offset + chunk_size, end)]
+                self.bucket.consume(len(chunk))
+                outputfile.write(chunk)
+                self._sent_bytes += len(chunk)
+            return
+
+        if length is None:
+            length = os.fstat(source.fileno()).st_size - start
+        offset, end = start, start + length
+        while offset < end:
+            count = min(chunk_size, end - offset)
+            self.bucket.consume(count)
+            if self.use_sendfile:
+                sent = self.connection.sendfile(source, offset, count)
+            else:
+                source.seek(offset)
+                chunk = source.read(count)
+                outputfile.write(chunk)
+                sent = len(chunk)
+            if not sent:
+                break
+            offset += sent
+            self._sent_bytes += sent
+
+    def _read_body(self):
+        """İstek gövdesini oku (FFmpeg varsayılan olarak chunked gönderir)"""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while True:
+                size_line = self.rfile.readline()
+                if not size_line:
+                    break
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Son boş satırı (ve varsa trailer başlıklarını) tüket
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length > 0 else b""
+
+    def do_PUT(self):
+        if self._request_path().startswith("/api/"):
+            self._handle_api()
+            return
+        store = self._store()
+        if store is None or not self._is_local_client():
+            self.send_error(403, "PUT desteklenmiyor")
+            return
+
+        store.put(self._request_path(), self._read_body())
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.do_PUT()
+
+    def do_DELETE(self):
+        if self._request_path().startswith("/api/"):
+            self._handle_api()
+            return
+        store = self._store()
+        if store is None or not self._is_local_client():
+            self.send_error(403, "DELETE desteklenmiyor")
+            return
+
+        store.delete(self._request_path())
+        self.send_response(204)
+        self.end_headers()
+
+def is_safe_channel_name(name):
+    """Kanal adı çıktı dizininde tek bir klasör adı olarak kullanılabilir mi (yol ayırıcı, '..', denetim karakteri yok)"""
+    if not isinstance(name, str) or not name.strip() or name in (".", ".."):
+        return False
+    if "/" in name or "\\" in name or os.path.isabs(name) or os.path.splitdrive(name)[0]:
+        return False
+    return not any(ord(char) < 32 or ord(char) == 127 for char in name)
+
+class ChannelRunner:
+    """Kanalların FFmpeg işlemlerini ve HLS çıktısını yöneten, arayüzden bağımsız çekirdek
+
+    Hem masaüstü uygulaması hem de başsız çalışan (worker) süreç tarafından kullanılır.
+    """
+    def __init__(self, output_dir, http_port, scheduler, telemetry,
+                 segment_store_mode="disk", ram_dir="", segment_window=12, cache_mb=64, session_timeout=30):
+        self.output_dir = output_dir
+        self.http_port = http_port
+        self.scheduler = scheduler
+        self.telemetry = telemetry
+        self.segment_store_mode = segment_store_mode
+        self.ram_dir = ram_dir
+        self.segment_window = segment_window
+        self.segment_store = None
+        self.ffmpeg_processes = {}  # kanal adı -> Popen
+        self.launch_counts = {}     # kanal adı -> başlatılma sayısı
+        self.viewer_sessions = ViewerSessions(session_timeout)
+        self.setup_segment_store()
+        METRICS.add_collector(self.collect_metrics)
+
+        # Bellek deposu zaten RAM'den sunar, diğer modlarda sık istenen dosyaları önbellekte tut
+        self.segment_cache = None
+        if cache_mb > 0 and self.segment_store is None:
+            self.segment_cache = SegmentCache(int(cache_mb * 1024 * 1024))
+
+    def setup_segment_store(self):
+        """Segment depolama moduna göre çıktı dizinini veya bellek deposunu hazırla"""
+        if self.segment_store_mode not in SEGMENT_STORE_MODES:
+            logger.warning(f"Bilinmeyen segment depolama modu: {self.segment_store_mode}, disk kullanılacak")
+            self.segment_store_mode = "disk"
+
+        if self.segment_store_mode == "tmpfs":
+            ram_dir = self.ram_dir
+            if not ram_dir and os.path.isdir("/dev/shm"):
+                ram_dir = os.path.join("/dev/shm", "iptv_hls")
+            if ram_dir:
+                self.output_dir = ram_dir
+                logger.info(f"HLS segmentleri RAM dizinine yazılacak: {ram_dir}")
+            else:
+                logger.warning("RAM dizini bulunamadı (ram_dir ayarlayın), segmentler diske yazılacak")
+                self.segment_store_mode = "disk"
+        elif self.segment_store_mode == "memory":
+            self.segment_store = MemorySegmentStore(self.segment_window)
+            logger.info(f"HLS segmentleri bellekte tutulacak (pencere: {self.segment_store.window} segment)")
+
+    def hls_output_args(self, channel_name, channel_dir):
+        """FFmpeg HLS çıktı parametrelerini depolama moduna göre oluştur"""
+        # Her başlatmada farklı segment adı: numaralandırma baştan başlasa da eski adlar
+        # yeniden kullanılmaz, böylece segmentler değişmez olarak önbelleğe alınabilir
+        segment_name = f"segment_{datetime.now().strftime('%Y%m%d%H%M%S')}_%03d.ts"
+        if self.segment_store_mode == "disk":
+            return [
+                "-hls_playlist_type", "event",
+                "-hls_flags", "append_list+omit_endlist",
+                "-hls_segment_filename", os.path.join(channel_dir, segment_name),
+                os.path.join(channel_dir, f"{channel_name}.m3u8")
+            ]
+
+        # RAM modlarında kayan pencere kullan, eski segmentler FFmpeg tarafından silinir
+        window_args = [
+            "-hls_list_size", str(max(3, self.segment_window - 2)),
+            "-hls_flags", "delete_segments+omit_endlist"
+        ]
+        if self.segment_store_mode == "tmpfs":
+            return window_args + [
+                "-hls_segment_filename", os.path.join(channel_dir, segment_name),
+                os.path.join(channel_dir, f"{channel_name}.m3u8")
+            ]
+
+        base_url = f"http://127.0.0.1:{self.http_port}/{quote(channel_name)}"
+        return window_args + [
+            "-method", "PUT",
+            "-hls_segment_filename", f"{base_url}/{segment_name}",
+            f"{base_url}/{quote(channel_name)}.m3u8"
+        ]
+
+    def prepare(self, channel):
+        """Kanal dizinini ve FFmpeg oynatma listesini hazırla
+
+        Arka plan iş parçacıklarından da çağrılabilir. Video bulunamazsa None döner.
+        """
+        channel_name = channel["name"]
+        if not is_safe_channel_name(channel_name):
+            raise ValueError(f"Geçersiz kanal adı: {channel_name!r}")
+        
+        # Kanal dizini ve oynatma listesi oluştur
+        channel_dir = os.path.join(self.output_dir, channel_name)
+        os.makedirs(channel_dir, exist_ok=True)
+        
+        # Oynatma listesi oluştur
+        playlist_file = os.path.join(channel_dir, "playlist.txt")
+        video_files = []
+        
+        # Tüm klasörleri tara (alt klasörler dahil)
+        paths = channel.get("paths", [])
+        for path in paths:
+            if os.path.exists(path):
+                # MP4 dosyalarını bul
+                for root, _, _ in os.walk(path):
+                    mp4_files = glob.glob(os.path.join(root, "*.mp4"))
+                    mkv_files = glob.glob(os.path.join(root, "*.mkv"))
+                    video_files.extend(mp4_files + mkv_files)
+        
+        if not video_files:
+            return None
+        
+        with open(playlist_file, "w", encoding="utf-8") as f:
+            for video in video_files:
+                f.write(f"file '{video}'\n")
+        
+        priority = self.scheduler.normalize_priority(channel.get("priority", DEFAULT_PRIORITY))
+        return {"channel_dir": channel_dir, "playlist_file": playlist_file, "priority": priority}
+
+    def launch(self, channel_name, context):
+        """Hazırlanan kanal için FFmpeg işlemini başlat (arka plan iş parçacıklarından da çağrılabilir)"""
+        # Bellek deposundaki eski segmentleri temizle, numaralandırma baştan başlar
+        if self.segment_store is not None:
+            self.segment_store.clear_channel(channel_name)
+        
+        priority = context["priority"]
+        ffmpeg_cmd = ["ffmpeg"] + self.telemetry.ffmpeg_args() + [
+            "-re", "-f", "concat", "-safe", "0", "-i", context["playlist_file"],
+            "-c", "copy", "-f", "hls", "-hls_time", "4"
+        ] + self.hls_output_args(channel_name, context["channel_dir"])
+        
+        logger.info(f"FFmpeg komutu: {' '.join(ffmpeg_cmd)} (öncelik: {priority})")
+        # Çıktılar konsola akmasın, telemetri okuyucuları tüketsin
+        process = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   **self.scheduler.popen_kwargs(priority))
+        self.telemetry.attach(channel_name, process)
+        self.scheduler.apply_priority(process, priority)
+        self.ffmpeg_processes[channel_name] = process
+        self.count_launch(channel_name)
+        return process
+
+    def count_launch(self, channel_name):
+        self.launch_counts[channel_name] = self.launch_counts.get(channel_name, 0) + 1
+        if self.launch_counts[channel_name] > 1:
+            METRICS.inc("iptv_ffmpeg_restarts_total", channel=channel_name)
+
+    def collect_metrics(self):
+        """Başlatılmış her kanal için FFmpeg çalışma durumu"""
+        for channel_name in list(self.launch_counts):
+            process = self.ffmpeg_processes.get(channel_name)
+            yield "iptv_ffmpeg_up", {"channel": channel_name}, int(process is not None and process.poll() is None)
+
+    def stop(self, channel_name, timeout=5):
+        """Kanalın FFmpeg işlemini durdur; süre aşılırsa zorla sonlandır"""
+        process = self.ffmpeg_processes.get(channel_name)
+        if process is None:
+            return False
+        
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"'{channel_name}' kanalı {timeout} sn içinde kapanmadı, zorla sonlandırılıyor")
+            process.kill()
+            process.wait(timeout=timeout)
+        
+        self.forget(channel_name)
+        return True
+
+    def forget(self, channel_name):
+        """Sonlanan kanalın işlemini ve bellekteki segmentlerini bırak"""
+        self.ffmpeg_processes.pop(channel_name, None)
+        if self.segment_store is not None:
+            self.segment_store.clear_channel(channel_name)
+
+    def create_http_server(self, handler=None, host="", max_workers=256, keepalive_timeout=10, **limits):
+        """HLS çıktısını sunan HTTP sunucusunu oluştur (belge kökü sabit, çalışma dizini değişmez)
+
+        limits: max_connections, max_connections_per_ip, rate_limit_kbps (bkz. HLSHTTPServer)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        handler = functools.partial(handler or HLSRequestHandler, directory=self.output_dir)
+        httpd = HLSHTTPServer((host, self.http_port), handler, max_workers, keepalive_timeout, **limits)
+        httpd.segment_store = self.segment_store
+        httpd.segment_cache = self.segment_cache
+        httpd.sessions = self.viewer_sessions
+        return httpd
+
+class PreforkSupervisor:
+    """HLS sunucusunu aynı portu SO_REUSEPORT ile paylaşan birden çok süreçte çalıştırır
+
+    Çekirdek gelen bağlantıları süreçlere dağıtır; böylece segment gönderimi GIL ile tek çekirdeğe
+    sınırlanmaz. Süreçler bu modülün 'http-child' komutuyla başlatılır (Tk süreci çatallanmaz),
+    ölenler yeniden başlatılır. Süreçler metrik ve izleyici etkinliklerini stdout üzerinden
+    yöneticiye bildirir; yönetici bunları birleştirip tüm süreçlerin sunduğu dosyalara yazar.
+    """
+    # Bu metrikleri yönetici birleştirilmiş izleyici oturumlarından kendisi üretir
+    MANAGER_METRICS = ("iptv_active_viewers", "iptv_viewer_sessions_total")
+
+    def __init__(self, runner, processes, child_args, report_interval=2):
+        self.runner = runner
+        self.processes = max(1, processes)
+        self.child_args = child_args
+        self.report_interval = report_interval
+        self.children = [None] * self.processes
+        self.child_metrics = {}  # süreç yuvası -> son metrik anlık görüntüsü
+        self.retired = {}        # ölen süreçlerin sayaç toplamları (yeniden başlatmada sıfırlanmasın)
+        self.aggregate_dir = None
+        self.running = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def supported():
+        return hasattr(socket, "SO_REUSEPORT") and os.name == "posix"
+
+    def start(self):
+        import tempfile
+        self.aggregate_dir = tempfile.mkdtemp(prefix="iptv_http_")
+        self.running = True
+        for slot in range(self.processes):
+            self._spawn(slot)
+        METRICS.add_collector(self.collect_metrics)
+        threading.Thread(target=self._supervise, daemon=True).start()
+        logger.info(f"HTTP sunucusu {self.processes} süreçle başlatıldı")
+
+    def _spawn(self, slot):
+        cmd = [sys.executable, os.path.abspath(__file__), "http-child",
+               "--log-name", f"iptv_http_{slot}",
+               "--aggregate-dir", self.aggregate_dir,
+               "--report-interval", str(self.report_interval)] + self.child_args
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   text=True, encoding="utf-8")
+        self.children[slot] = process
+        threading.Thread(target=self._read_reports, args=(slot, process), daemon=True).start()
+
+    def _read_reports(self, slot, process):
+        """Alt sürecin periyodik raporlarını oku"""
+        for line in process.stdout:
+            try:
+                report = json.loads(line)
+            except ValueError:
+                continue
+            with self.lock:
+                if self.children[slot] is process:
+                    self.child_metrics[slot] = report.get("metrics", [])
+            for channel_name, client, sent_bytes in report.get("sessions", []):
+                self.runner.viewer_sessions.touch(channel_name, client, sent_bytes)
+
+    def _retire(self, slot):
+        """Ölen sürecin sayaçlarını sakla (anlık değerler hariç)"""
+        with self.lock:
+            snapshot = self.child_metrics.pop(slot, None) or []
+            gauges = [name for name, (kind, _, _) in METRICS.meta.items() if kind == "gauge"]
+            METRICS.merge_snapshot(self.retired, snapshot, skip=gauges)
+
+    def _supervise(self):
+        while self.running:
+            time.sleep(self.report_interval)
+            if not self.running:
+                break
+            for slot, process in enumerate(self.children):
+                if process.poll() is None:
+                    continue
+                logger.warning(f"HTTP alt süreci sonlandı (çıkış kodu: {process.returncode}), yeniden başlatılıyor")
+                METRICS.inc("iptv_http_process_restarts_total")
+                self._retire(slot)
+                try:
+                    self._spawn(slot)
+                except Exception as e:
+                    logger.error(f"HTTP alt süreci başlatılamadı: {str(e)}")
+            try:
+                self._write_aggregates()
+            except Exception as e:
+                logger.error(f"Birleştirilmiş metrikler yazılamadı: {str(e)}")
+
+    def _write_aggregates(self):
+        """Birleştirilmiş /metrics ve /api/viewers içeriğini alt süreçlerin okuyacağı dosyalara yaz"""
+        with self.lock:
+            snapshots = list(self.child_metrics.values())
+            snapshots.append([[name, [list(label) for label in labels], value]
+                              for (name, labels), value in self.retired.items()])
+        files = {
+            "metrics.prom": METRICS.render(snapshots, skip=self.MANAGER_METRICS).encode("utf-8"),
+            "viewers.json": json.dumps(self.runner.viewer_sessions.snapshot(), ensure_ascii=False).encode("utf-8")
+        }
+        for name, data in files.items():
+            path = os.path.join(self.aggregate_dir, name)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+
+    def collect_metrics(self):
+        yield "iptv_http_processes", {}, sum(1 for process in self.children if process and process.poll() is None)
+        for channel_name, count in self.runner.viewer_sessions.counts_snapshot().items():
+            yield "iptv_active_viewers", {"channel": channel_name}, count
+
+    def stop(self, timeout=5):
+        self.running = False
+        METRICS.remove_collector(self.collect_metrics)
+        for process in self.children:
+            if process and process.poll() is None:
+                process.terminate()
+        for process in self.children:
+            if not process:
+                continue
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(self.aggregate_dir, ignore_errors=True)
+        logger.info("HTTP alt süreçleri durduruldu")
+
+class WorkerRequestHandler(HLSRequestHandler):
+    """Çalışan (worker) sürecinin HTTP işleyicisi: HLS dosyalarının yanında /_worker/ denetim API'sini sunar"""
+    def _check_token(self):
+        # Anahtar tanımlı değilse denetim API'si yalnızca yerel makineden kullanılabilir
+        token = self.server.agent.token
+        if not token:
+            authorized = self._is_local_client()
+        else:
+            import hmac
+            authorized = hmac.compare_digest(self.headers.get("X-Worker-Token", "").encode("utf-8"),
+                                             token.encode("utf-8"))
+        if not authorized:
+            self._send_json(401, {"error": "Geçersiz çalışan anahtarı"})
+            return False
+        return True
+
+    def _read_json(self):
+        try:
+            return json.loads(self._read_body().decode("utf-8") or "{}")
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        path = self._request_path()
+        if not path.startswith("/_worker/"):
+            return super().do_GET()
+        if not self._check_token():
+            return
+        if path == "/_worker/status":
+            self._send_json(200, self.server.agent.status())
+        else:
+            self._send_json(404, {"error": "Bilinmeyen uç nokta"})
+
+    def do_POST(self):
+        path = self._request_path()
+        if not path.startswith("/_worker/"):
+            return super().do_POST()
+        if not self._check_token():
+            return
+
+        data = self._read_json()
+        if not isinstance(data, dict) or not data.get("name"):
+            self._send_json(400, {"error": "Geçersiz istek: kanal adı gerekli"})
+            return
+        if not is_safe_channel_name(data["name"]):
+            self._send_json(400, {"error": "Geçersiz kanal adı: yol ayırıcı, '..' veya denetim karakteri içeremez"})
+            return
+
+        agent = self.server.agent
+        try:
+            if path == "/_worker/channels/start":
+                self._send_json(200, {"name": data["name"], "status": agent.start_channel(data)})
+            elif path == "/_worker/channels/stop":
+                self._send_json(200, {"name": data["name"], "status": agent.stop_channel(data["name"])})
+            elif path == "/_worker/channels/restart":
+                self._send_json(200, {"name": data["name"], "status": agent.restart_channel(data)})
+            else:
+                self._send_json(404, {"error": "Bilinmeyen uç nokta"})
+        except Exception as e:
+            logger.error(f"Çalışan API hatası ({path}): {str(e)}", exc_info=True)
+            self._send_json(500, {"error": str(e)})
+
+class WorkerAgent:
+    """Arayüzsüz çalışan süreç: kanalları yerel FFmpeg işlemleriyle yayınlar ve HTTP üzerinden denetlenir
+
+    Yönetici (IPTVManagerApp) kanalları yüke göre çalışanlara dağıtır. Video klasörlerinin
+    çalışan makinede aynı yolla erişilebilir olması gerekir (paylaşımlı depolama).
+    """
+    def __init__(self, port=9100, host="", output_dir=None, token="", max_encoders=0,
+                 segment_store_mode="disk", ram_dir="", segment_window=12, http_workers=256, cache_mb=64,
+                 viewer_timeout=30, http_limits=None):
+        self.host = host
+        self.http_workers = http_workers
+        self.http_limits = http_limits or {}
+        self.port = port
+        self.token = token
+        self.scheduler = ChannelScheduler(max_encoders)
+        self.telemetry = FFmpegTelemetry()
+        output_dir = output_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), f"hls_worker_{port}")
+        self.runner = ChannelRunner(output_dir, port, self.scheduler, self.telemetry,
+                                    segment_store_mode, ram_dir, segment_window, cache_mb, viewer_timeout)
+        self.channels = {}  # kanal adı -> kanal bilgisi
+        self.lock = threading.RLock()
+        self.httpd = None
+        self.catalog = None  # /playlist.m3u ve /epg.xml (başsız serviste atanır)
+        self.control = None  # /api/ denetim API'si (başsız serviste atanır)
+
+    def channel_state(self, channel_name):
+        if channel_name in self.runner.ffmpeg_processes:
+            return "running"
+        if self.scheduler.is_queued(channel_name):
+            return "queued"
+        return "stopped"
+
+    def start_channel(self, channel):
+        """Kanalı başlat veya kodlayıcı sınırı doluysa kuyruğa al"""
+        channel_name = channel["name"]
+        with self.lock:
+            self.channels[channel_name] = channel
+            if channel_name in self.runner.ffmpeg_processes:
+                return "running"
+
+            priority = self.scheduler.normalize_priority(channel.get("priority", DEFAULT_PRIORITY))
+            decision, victim = self.scheduler.request(channel_name, priority)
+            if decision == "queued":
+                return "queued"
+            if victim:
+                self.runner.stop(victim)
+
+            try:
+                context = self.runner.prepare(channel)
+                if context is None:
+                    raise ValueError(f"'{channel_name}' kanalı için video dosyası bulunamadı")
+                self.runner.launch(channel_name, context)
+            except Exception:
+                self._release(channel_name)
+                raise
+            return "running"
+
+    def stop_channel(self, channel_name):
+        with self.lock:
+            if self.scheduler.cancel(channel_name):
+                return "stopped"
+            if self.runner.stop(channel_name):
+                self._release(channel_name)
+            return "stopped"
+
+    def restart_channel(self, channel):
+        """Çalışan kanalın kodlayıcısını yeni ayarlarla yeniden başlat (yuva korunur)"""
+        channel_name = channel["name"]
+        with self.lock:
+            self.channels[channel_name] = channel
+            if channel_name not in self.runner.ffmpeg_processes:
+                return self.channel_state(channel_name)
+            self.runner.stop(channel_name)
+            try:
+                context = self.runner.prepare(channel)
+                if context is None:
+                    raise ValueError(f"'{channel_name}' kanalı için video dosyası bulunamadı")
+                self.runner.launch(channel_name, context)
+            except Exception:
+                self._release(channel_name)
+                raise
+            return "running"
+
+    def update_channel(self, channel):
+        """Kodlayıcıyı etkilemeyen değişiklikleri uygula; öncelik çalışan işleme anında yansır
+
+        Çalışan işleme uygulanamayan öncelik ayarlarının listesini döndürür (bkz. apply_priority).
+        """
+        channel_name = channel["name"]
+        with self.lock:
+            if channel_name not in self.channels:
+                return []
+            self.channels[channel_name] = channel
+            priority = self.scheduler.normalize_priority(channel.get("priority", DEFAULT_PRIORITY))
+            self.scheduler.set_priority(channel_name, priority)
+            process = self.runner.ffmpeg_processes.get(channel_name)
+            if process is not None:
+                return self.scheduler.apply_priority(process, priority)
+            return []
+
+    def forget_channel(self, channel_name):
+        """Yapılandırmadan silinen kanalı durdur ve unut"""
+        with self.lock:
+            self.stop_channel(channel_name)
+            self.channels.pop(channel_name, None)
+
+    def _release(self, channel_name):
+        """Yuvayı bırak ve kuyruktaki bir sonraki kanalı başlat"""
+        next_channel = self.scheduler.release(channel_name)
+        if next_channel and next_channel in self.channels:
+            try:
+                self.start_channel(self.channels[next_channel])
+            except Exception as e:
+                logger.error(f"Kuyruktaki '{next_channel}' kanalı başlatılamadı: {str(e)}")
+
+    def status(self):
+        with self.lock:
+            channels = {}
+            viewers = self.runner.viewer_sessions.counts_snapshot()
+            for channel_name, channel in self.channels.items():
+                channels[channel_name] = {
+                    "viewers": viewers.get(channel_name, 0),
+                    "status": self.channel_state(channel_name),
+                    "priority": self.scheduler.normalize_priority(channel.get("priority", DEFAULT_PRIORITY)),
+                    "telemetry": self.telemetry.get(channel_name).latest() if self.telemetry.get(channel_name) else None
+                }
+            worker = {
+                "active": len(self.runner.ffmpeg_processes),
+                "queued": len(self.scheduler.queue),
+                "capacity": self.scheduler.max_active,
+                "cpu_count": os.cpu_count() or 1,
+                "load": os.getloadavg()[0] if hasattr(os, "getloadavg") else None
+            }
+            if self.runner.segment_store is not None:
+                worker["segment_store"] = self.runner.segment_store.stats()
+            if self.runner.segment_cache is not None:
+                worker["segment_cache"] = self.runner.segment_cache.stats()
+            worker["viewer_stats"] = self.runner.viewer_sessions.snapshot(history=False)
+            return {"worker": worker, "channels": channels}
+
+    def _watch_processes(self):
+        """Kendiliğinden sonlanan FFmpeg işlemlerinin yuvalarını serbest bırak"""
+        while True:
+            time.sleep(2)
+            with self.lock:
+                for channel_name, process in list(self.runner.ffmpeg_processes.items()):
+                    if process.poll() is None:
+                        continue
+                    logger.warning(f"'{channel_name}' kanalının FFmpeg işlemi sonlandı (çıkış kodu: {process.returncode})")
+                    METRICS.inc("iptv_ffmpeg_exits_total", channel=channel_name)
+                    self.runner.forget(channel_name)
+                    self._release(channel_name)
+
+    def serve_forever(self):
+        self.httpd = self.runner.create_http_server(WorkerRequestHandler, self.host, self.http_workers,
+                                                    **self.http_limits)
+        self.httpd.agent = self
+        self.httpd.catalog = self.catalog
+        self.httpd.control = self.control
+        self.httpd.api_token = self.token
+        threading.Thread(target=self._watch_processes, daemon=True).start()
+        logger.info(f"Çalışan süreç port {self.port} üzerinde dinliyor (çıktı: {self.runner.output_dir})")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            # Dinleme soketi, açık keep-alive bağlantıları ve iş parçacığı havuzu kapatılır
+            self.httpd.server_close()
+            with self.lock:
+                for channel_name in list(self.runner.ffmpeg_processes):
+                    self.runner.stop(channel_name)
+
+    def shutdown(self):
+        """Sunucuyu durdur; serve_forever çalışan kanalları kapatarak döner"""
+        if self.httpd:
+            self.httpd.shutdown()
+
+class WorkerClient:
+    """Uzak çalışanın denetim API'si için istemci"""
+    def __init__(self, url, token="", public_url="", timeout=10):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.public_url = (public_url or url).rstrip("/")  # M3U'da kullanılacak adres
+        self.timeout = timeout
+        self.last_status = None
+        self.last_refresh = 0.0
+        self.pending = 0  # son durum sorgusundan beri bu çalışana yerleştirilen kanal sayısı
+
+    def _headers(self):
+        return {"X-Worker-Token": self.token} if self.token else {}
+
+    def _post(self, endpoint, data):
+        import requests
+        response = requests.post(f"{self.url}{endpoint}", json=data, headers=self._headers(), timeout=self.timeout)
+        result = response.json()
+        if response.status_code != 200:
+            raise RuntimeError(result.get("error", f"HTTP {response.status_code}"))
+        return result
+
+    def refresh(self):
+        """Çalışanın durumunu sorgula; erişilemezse None döndür"""
+        import requests
+        try:
+            response = requests.get(f"{self.url}/_worker/status", headers=self._headers(), timeout=self.timeout)
+            response.raise_for_status()
+            self.last_status = response.json()
+            self.pending = 0
+        except Exception as e:
+            logger.warning(f"Çalışana erişilemedi ({self.url}): {str(e)}")
+            self.last_status = None
+        self.last_refresh = time.time()
+        return self.last_status
+
+    def load_score(self):
+        """Düşük puan daha boş çalışan demektir"""
+        worker = self.last_status["worker"]
+        # Kodlayıcı sınırı olmayan çalışanda (capacity 0) yük çekirdek sayısına göre ölçülür
+        capacity = max(1, worker.get("capacity") or worker.get("cpu_count") or 1)
+        score = (worker.get("active", 0) + worker.get("queued", 0) + self.pending) / capacity
+        if worker.get("load") is not None:
+            score += worker["load"] / max(1, worker.get("cpu_count") or 1) * 0.5
+        return score
+
+    def channel_state(self, channel_name):
+        if not self.last_status:
+            return None
+        channel = self.last_status.get("channels", {}).get(channel_name)
+        return channel["status"] if channel else None
+
+    def start_channel(self, channel):
+        return self._post("/_worker/channels/start", channel)["status"]
+
+    def stop_channel(self, channel_name):
+        return self._post("/_worker/channels/stop", {"name": channel_name})["status"]
+
+    def restart_channel(self, channel):
+        return self._post("/_worker/channels/restart", channel)["status"]
+
+class WorkerPool:
+    """Uzak çalışanları izler ve kanalları yüke göre yerleştirir"""
+    def __init__(self, workers, refresh_interval=3):
+        self.workers = [WorkerClient(w["url"], w.get("token", ""), w.get("public_url", "")) for w in workers]
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            for worker in self.workers:
+                worker.refresh()
+            time.sleep(self.refresh_interval)
+
+    def get(self, url):
+        for worker in self.workers:
+            if worker.url == url.rstrip("/"):
+                return worker
+        return None
+
+    def pick(self):
+        """En az yüklü erişilebilir çalışanı seç"""
+        with self.lock:
+            candidates = [w for w in self.workers if w.last_status or w.refresh()]
+            if not candidates:
+                raise RuntimeError("Erişilebilir çalışan bulunamadı")
+            worker = min(candidates, key=lambda w: w.load_score())
+            worker.pending += 1
+            return worker
+
+class RemoteChannelProcess:
+    """Uzak çalışandaki kanal için subprocess.Popen benzeri vekil
+
+    Durum, WorkerPool'un periyodik sorgularından okunur; böylece poll() ağ isteği yapmaz.
+    """
+    def __init__(self, worker, channel_name):
+        self.worker = worker
+        self.channel_name = channel_name
+        self.pid = None
+        self.returncode = None
+        self.started_at = time.time()
+
+    def poll(self):
+        if self.returncode is None and self.worker.last_refresh > self.started_at:
+            if self.worker.last_status and self.worker.channel_state(self.channel_name) in (None, "stopped"):
+                self.returncode = -1
+        return self.returncode
+
+    def terminate(self):
+        self.worker.stop_channel(self.channel_name)
+        self.returncode = 0
+
+    def kill(self):
+        self.terminate()
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+def run_worker(argv):
+    """Başsız çalışan süreci başlat: python iptv_manager.py worker --port 9101"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="iptv_manager.py worker", description="IPTV çalışan süreci")
+    parser.add_argument("--host", default="", help="Dinlenecek adres (varsayılan: tüm arayüzler)")
+    parser.add_argument("--port", type=int, default=9100, help="HLS ve denetim API portu")
+    parser.add_argument("--output-dir", default=None, help="HLS çıktı dizini")
+    parser.add_argument("--token", default="", help="Denetim API'si için paylaşılan anahtar (boşsa API yalnızca yerel makineden kullanılabilir)")
+    parser.add_argument("--max-encoders", type=int, default=0, help="Eşzamanlı kodlayıcı sınırı (isteğe bağlı, 0 = sınırsız)")
+    parser.add_argument("--segment-store", choices=SEGMENT_STORE_MODES, default="disk")
+    parser.add_argument("--ram-dir", default="")
+    parser.add_argument("--segment-window", type=int, default=12)
+    parser.add_argument("--http-workers", type=int, default=256, help="HTTP sunucusu iş parçacığı sayısı")
+    parser.add_argument("--cache-mb", type=float, default=64, help="HLS dosya önbelleği boyutu (MB, 0 = kapalı)")
+    parser.add_argument("--viewer-timeout", type=float, default=30, help="İzleyici oturumu zaman aşımı (sn)")
+    parser.add_argument("--max-connections", type=int, default=0, help="Toplam bağlantı sınırı, aşılırsa 503 (0 = sınırsız)")
+    parser.add_argument("--max-connections-per-ip", type=int, default=0, help="İstemci başına bağlantı sınırı (0 = sınırsız)")
+    parser.add_argument("--rate-limit-kbps", type=int, default=0, help="Bağlantı başına hız sınırı, kbit/s (0 = sınırsız)")
+    args = parser.parse_args(argv)
+
+    agent = WorkerAgent(args.port, args.host, args.output_dir, args.token, args.max_encoders,
+                        args.segment_store, args.ram_dir, args.segment_window, args.http_workers, args.cache_mb,
+                        args.viewer_timeout, {
+                            "max_connections": args.max_connections,
+                            "max_connections_per_ip": args.max_connections_per_ip,
+                            "rate_limit_kbps": args.rate_limit_kbps
+                        })
+
+    # systemd gibi servis yöneticilerinden gelen SIGTERM ile kanalları düzgünce kapat
+    import signal
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=agent.shutdown, daemon=True).start())
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Çalışan süreç durduruluyor")
+
+def run_http_child(argv):
+    """Çok süreçli HLS sunucusunun alt süreci (PreforkSupervisor tarafından başlatılır)"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="iptv_manager.py http-child")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--config", default="", help="Kanal listesinin okunacağı yapılandırma dosyası")
+    parser.add_argument("--aggregate-dir", default="")
+    parser.add_argument("--log-name", default="iptv_http", help="Günlük dosyasının adı (main okur)")
+    parser.add_argument("--report-interval", type=float, default=2)
+    parser.add_argument("--http-workers", type=int, default=256)
+    parser.add_argument("--keepalive-timeout", type=float, default=10)
+    parser.add_argument("--cache-mb", type=float, default=64)
+    parser.add_argument("--viewer-timeout", type=float, default=30)
+    parser.add_argument("--max-connections", type=int, default=0)
+    parser.add_argument("--max-connections-per-ip", type=int, default=0)
+    parser.add_argument("--rate-limit-kbps", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    runner = ChannelRunner(args.output_dir, args.port, ChannelScheduler(1), FFmpegTelemetry(),
+                           cache_mb=args.cache_mb, session_timeout=args.viewer_timeout)
+    runner.viewer_sessions = ViewerSessions(args.viewer_timeout, track_activity=True)
+    httpd = runner.create_http_server(host=args.host, max_workers=args.http_workers,
+                                      keepalive_timeout=args.keepalive_timeout,
+                                      max_connections=args.max_connections,
+                                      max_connections_per_ip=args.max_connections_per_ip,
+                                      rate_limit_kbps=args.rate_limit_kbps, reuse_port=True)
+    httpd.aggregate_dir = args.aggregate_dir or None
+
+    # /playlist.m3u ve /epg.xml için kanal listesi yapılandırma dosyasından okunur
+    state = {"mtime": None, "channels": [], "workers": {}}
+    httpd.catalog = ChannelCatalog(lambda: state["channels"],
+                                   lambda channel: state["workers"].get((channel.get("worker") or "").rstrip("/")))
+
+    def reload_config():
+        try:
+            mtime = os.path.getmtime(args.config)
+            if mtime == state["mtime"]:
+                return
+            with open(args.config, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return
+        state["mtime"] = mtime
+        state["channels"] = config.get("channels", [])
+        state["workers"] = {w["url"].rstrip("/"): (w.get("public_url") or w["url"]).rstrip("/")
+                            for w in config.get("workers", [])}
+        httpd.catalog.set_epg_file(config.get("epg_file", ""))
+
+    def report_loop():
+        while True:
+            reload_config()
+            report = {"metrics": METRICS.snapshot(), "sessions": runner.viewer_sessions.drain_activity()}
+            try:
+                sys.stdout.write(json.dumps(report) + "\n")
+                sys.stdout.flush()
+            except (BrokenPipeError, ValueError):
+                # Yönetici süreç kapandı
+                os._exit(0)
+            time.sleep(args.report_interval)
+
+    reload_config()
+    threading.Thread(target=report_loop, daemon=True).start()
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "channels_config.json")
+
+def load_config_file(path):
+    """Yapılandırma dosyasını oku; dosya yoksa boş sözlük döndür"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def write_file_atomic(path, data):
+    """Dosyayı geçici dosya + fsync + yeniden adlandırma ile yaz; yarıda kalan yazma eski içeriği bozmaz"""
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    # Yeniden adlandırmanın kendisi de diske işlensin (Windows'ta dizin açılamaz)
+    if os.name == "posix":
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+class ConfigStore:
+    """Yapılandırma dosyası için arkadan yazan (write-behind) depo
+
+    delay saniye içinde gelen kayıt istekleri tek yazmada birleştirilir; 50 kanalı başlatmak
+    dosyaya 50 kez değil bir kez yazar. Yazma write_file_atomic ile yapılır.
+    """
+    def __init__(self, path, delay=0.5, on_error=None):
+        self.path = path
+        self.delay = delay
+        self.on_error = on_error  # Arka planda yazma başarısız olursa çağrılır
+        self.pending = None
+        self.timer = None
+        self.writes = 0
+        self.mtime = None  # Son okunan/yazılan dosyanın mtime'ı (dış değişiklikleri ayırt etmek için)
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def load(self):
+        # Bozuk dosya her yoklamada yeniden denenmesin diye mtime okumadan önce alınır
+        with self.write_lock:
+            self.mtime = self._stat_mtime()
+        return load_config_file(self.path)
+
+    def changed_on_disk(self):
+        """Dosya bu depo dışında (elle ya da başka bir süreçle) değiştirildi mi"""
+        with self.write_lock:
+            if self.pending is not None:
+                return False
+            return self._stat_mtime() != self.mtime
+
+    def save(self, config):
+        """Yapılandırmayı yazılmak üzere sıraya al"""
+        # Hemen serileştir: çağıran sözlüğü yazmadan önce değiştirebilir
+        data = json.dumps(config, indent=4)
+        with self.lock:
+            self.pending = data
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Bekleyen yapılandırmayı hemen yaz (çıkışta çağrılır)"""
+        with self.write_lock:
+            with self.lock:
+                data, self.pending = self.pending, None
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+            if data is None:
+                return
+            try:
+                write_file_atomic(self.path, data)
+                self.mtime = self._stat_mtime()
+                self.writes += 1
+            except OSError as e:
+                logger.error(f"Yapılandırma kaydedilemedi: {str(e)}")
+                if self.on_error:
+                    self.on_error(e)
+
+class RuntimeRegistry:
+    """Kanalların kalıcı olmayan çalışma durumu; yapılandırma dosyasına yazılmaz"""
+    def __init__(self, default_status="Durduruldu"):
+        self.default_status = default_status
+        self.states = {}  # kanal adı -> durum metni
+        self.lock = threading.Lock()
+
+    def status(self, channel_name):
+        with self.lock:
+            return self.states.get(channel_name, self.default_status)
+
+    def set_status(self, channel_name, status):
+        with self.lock:
+            self.states[channel_name] = status
+
+    def rename(self, old_name, new_name):
+        with self.lock:
+            if old_name in self.states:
+                self.states[new_name] = self.states.pop(old_name)
+
+    def forget(self, channel_name):
+        with self.lock:
+            self.states.pop(channel_name, None)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.states)
+
+class ChannelRegistry:
+    """Sıralı kanal listesi ve ad/port dizinleri; arama, ekleme ve boş port bulma kanal sayısından bağımsızdır
+
+    Kayıtlar yapılandırma dosyasındaki kanal sözlükleridir (katalog, API ve çalışanlar da bu biçimi
+    kullanır); kayıt liste gibi gezilir ve sırayla dizinlenir. Bir kanalın adı ya da portu yerinde
+    değiştirilirse reindex() çağrılmalıdır.
+    """
+    def __init__(self, channels=()):
+        self.replace(channels)
+
+    def replace(self, channels):
+        self.items = list(channels)
+        self.reindex()
+
+    def reindex(self):
+        self.positions = {channel["name"]: index for index, channel in enumerate(self.items)}
+        self.ports = {}  # port -> bu portu kullanan kanal sayısı
+        for channel in self.items:
+            self._count_port(channel.get("port"), 1)
+        self.port_hint = (0, 0)  # (başlangıç, bitiş): aradaki portların hepsi kullanımda
+
+    def _count_port(self, port, delta):
+        count = self.ports.get(port, 0) + delta
+        if count > 0:
+            self.ports[port] = count
+        else:
+            self.ports.pop(port, None)
+            start, end = self.port_hint
+            if isinstance(port, int) and start <= port < end:
+                self.port_hint = (start, port)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def names(self):
+        return list(self.positions)
+
+    def get(self, channel_name):
+        index = self.positions.get(channel_name)
+        return None if index is None else self.items[index]
+
+    def index(self, channel_name):
+        """Kanalın sıradaki yeri, yoksa -1"""
+        return self.positions.get(channel_name, -1)
+
+    def port_in_use(self, port):
+        return port in self.ports
+
+    def free_port(self, start=8081):
+        """start'tan itibaren ilk boş port (tarama önceki aramanın bıraktığı yerden sürer)"""
+        hint_start, hint_end = self.port_hint
+        if hint_start <= start <= hint_end:
+            port = hint_end
+        else:
+            hint_start = port = start
+        while port in self.ports:
+            port += 1
+        self.port_hint = (hint_start, port)
+        return port
+
+    def append(self, channel):
+        if channel["name"] in self.positions:
+            raise ValueError(f"'{channel['name']}' adında bir kanal zaten var")
+        self.positions[channel["name"]] = len(self.items)
+        self.items.append(channel)
+        self._count_port(channel.get("port"), 1)
+
+    def remove(self, channel_name):
+        index = self.positions.pop(channel_name)
+        channel = self.items.pop(index)
+        # Yalnızca silinen kanaldan sonrakilerin sırası değişir
+        for position in range(index, len(self.items)):
+            self.positions[self.items[position]["name"]] = position
+        self._count_port(channel.get("port"), -1)
+        return channel
+
+# Bu alanlar değişirse kanalın kodlayıcısı yeniden başlatılmalıdır; diğerleri (port, logo, EPG)
+# yalnızca oynatma listesini etkiler, öncelik ise çalışan işleme anında uygulanır
+CHANNEL_RESTART_KEYS = ("paths",)
+CHANNEL_RUNTIME_KEYS = ("name", "status", "worker")
+CHANNEL_READONLY_KEYS = ("status", "viewers")  # GET /api/channels çıktısına eklenir, kaydedilmez
+CHANNEL_PLACEMENT_KEYS = ("worker",)  # Kanalın yerleştirildiği çalışan; doğrulamada korunur
+
+def diff_channels(old_channels, new_channels, renames=None):
+    """İki kanal listesi arasındaki farkı kodlayıcıya etkisine göre sınıflandır
+
+    renames: {eski ad: yeni ad} - arayüzde yeniden adlandırılan kanallar. Dönen sözlük:
+    added, removed, restart, reprioritize, updated (ad listeleri), renamed ({eski: yeni}) ve
+    priority_failed ({ad: hatalar}; değişiklikler uygulanırken önceliği çalışan işleme yansıtılamayanlar).
+    """
+    renames = renames or {}
+    old = {channel["name"]: channel for channel in old_channels}
+    previous_names = {new_name: old_name for old_name, new_name in renames.items() if old_name in old}
+    diff = {"added": [], "removed": [], "restart": [], "reprioritize": [], "updated": [], "renamed": {},
+            "priority_failed": {}}
+
+    for channel in new_channels:
+        name = channel["name"]
+        old_name = previous_names.get(name, name)
+        previous = old.get(old_name)
+        if previous is None:
+            diff["added"].append(name)
+            continue
+        if old_name != name:
+            diff["renamed"][old_name] = name
+            continue
+        keys = (set(previous) | set(channel)) - set(CHANNEL_RUNTIME_KEYS)
+        changed = {key for key in keys if previous.get(key) != channel.get(key)}
+        if changed & set(CHANNEL_RESTART_KEYS):
+            diff["restart"].append(name)
+        elif "priority" in changed:
+            diff["reprioritize"].append(name)
+        elif changed:
+            diff["updated"].append(name)
+
+    new_names = {channel["name"] for channel in new_channels}
+    diff["removed"] = [name for name in old if name not in new_names and name not in diff["renamed"]]
+    return diff
+
+def describe_channel_diff(diff):
+    """Kanal farkının kısa Türkçe özeti"""
+    parts = []
+    for key, label in (("restart", "yeniden başlatıldı"), ("reprioritize", "önceliği değişti"),
+                       ("added", "eklendi"), ("removed", "silindi"), ("renamed", "yeniden adlandırıldı"),
+                       ("updated", "bilgileri güncellendi"), ("priority_failed", "önceliği uygulanamadı")):
+        if diff.get(key):
+            parts.append(f"{len(diff[key])} kanal {label}")
+    return ", ".join(parts) if parts else "değişiklik yok"
+
+CHANNEL_ACTIONS = ("start", "stop", "restart")
+CHANNEL_FIELDS = ("name", "paths", "port", "logo", "epg_url", "epg_id", "priority")
+
+def validate_channel(data, existing_names=()):
+    """API'den gelen kanal bilgisini doğrula ve yapılandırma biçimine çevir (hatada ValueError)"""
+    # GET ile alınan nesne düzenlenip geri gönderilebilsin: salt okunur alanlar yok sayılır
+    unknown = set(data) - set(CHANNEL_FIELDS) - set(CHANNEL_RUNTIME_KEYS) - set(CHANNEL_READONLY_KEYS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen alanlar: {', '.join(sorted(unknown))}")
+    name = str(data.get("name") or "").strip()
+    if not is_safe_channel_name(name):
+        raise ValueError("Geçerli bir kanal adı gerekli ('.', '..', '/', '\\' ve denetim karakterleri kullanılamaz)")
+    if name in existing_names:
+        raise ValueError(f"'{name}' adında başka bir kanal zaten var")
+    paths = data.get("paths")
+    if not isinstance(paths, list) or not paths or not all(isinstance(path, str) and path for path in paths):
+        raise ValueError("En az bir klasör yolu (paths) gerekli")
+    try:
+        port = int(data.get("port"))
+    except (TypeError, ValueError):
+        raise ValueError("Port numarası geçerli bir sayı olmalı")
+    priority = data.get("priority") or DEFAULT_PRIORITY
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Geçersiz öncelik: {priority} (geçerli: {', '.join(PRIORITY_CLASSES)})")
+
+    channel = {
+        "name": name,
+        "paths": list(paths),
+        "port": port,
+        "logo": data.get("logo") or "",
+        "epg_url": data.get("epg_url") or "",
+        "epg_id": data.get("epg_id") or "",
+        "priority": priority
+    }
+    for key in CHANNEL_PLACEMENT_KEYS:
+        if isinstance(data.get(key), str) and data[key]:
+            channel[key] = data[key]
+    return channel
+
+class JobManager:
+    """API'den başlatılan uzun işlemleri arka planda yürütür; durumları iş kimliğiyle sorgulanır
+
+    İş fonksiyonu son argüman olarak bir ilerleme fonksiyonu alır. Son 'history' iş bellekte tutulur.
+    """
+    def __init__(self, max_workers=4, history=100):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="is")
+        self.history = history
+        self.jobs = OrderedDict()  # iş kimliği -> iş
+        self.lock = threading.Lock()
+
+    def submit(self, kind, fn, *args):
+        job = {"id": os.urandom(6).hex(), "kind": kind, "state": "queued", "created": time.time(),
+               "started": None, "finished": None, "progress": deque(maxlen=50), "result": None, "error": None}
+        with self.lock:
+            self.jobs[job["id"]] = job
+            while len(self.jobs) > self.history:
+                oldest = next(iter(self.jobs.values()))
+                if oldest["state"] in ("queued", "running"):
+                    break
+                self.jobs.popitem(last=False)
+        self.executor.submit(self._run, job, fn, args)
+        return self._snapshot(job)
+
+    def _run(self, job, fn, args):
+        job["state"] = "running"
+        job["started"] = time.time()
+        try:
+            job["result"] = run_with_log_context(fn, *args, job["progress"].append, job=job["id"])
+            job["state"] = "done"
+        except Exception as e:
+            logger.error(f"'{job['kind']}' işi başarısız ({job['id']}): {str(e)}", extra={"job": job["id"]})
+            job["error"] = str(e)
+            job["state"] = "failed"
+        job["finished"] = time.time()
+
+    def _snapshot(self, job):
+        snapshot = dict(job)
+        snapshot["progress"] = list(job["progress"])
+        return snapshot
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return self._snapshot(job)
+
+    def list(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [self._snapshot(job) for job in reversed(jobs)]
+
+class HeadlessService:
+    """Arayüzsüz servis: HTTP sunucusu, kanal denetimi ve zamanlanmış EPG üretimi
+
+    Masaüstü uygulamasıyla aynı yapılandırma dosyasını ve HLS dizinini kullanır; kanallar süreç
+    içindeki çalışan (worker) ajanıyla yönetilir. Masaüstü uygulamasında bir çalışana yerleştirilmiş
+    kanallar ("worker" alanı, çalışan "workers" listesinde tanımlıysa) o çalışanda başlatılıp
+    durdurulur ve M3U'da çalışanın adresiyle listelenir; yeni kanallar yerel olarak çalışır.
+    control_token tanımlı değilse /api ve /_worker/ denetim API'leri yalnızca yerel makineden
+    kullanılabilir. systemd gibi servis yöneticileri
+    altında çalıştırmak için: python iptv_manager.py serve
+    """
+    def __init__(self, config_file=CONFIG_FILE, host="", autostart=None):
+        self.config_file = config_file
+        self.config_store = ConfigStore(config_file)
+        config = self.config_store.load()
+        self.config = config
+        self.channels = config.get("channels", [])
+        self.autostart = config.get("autostart", False) if autostart is None else autostart
+        self.launch_stagger = config.get("launch_stagger", 0.5)
+        self.epg_file = config.get("epg_file") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "video_epg.xml")
+        self.epg_folders = config.get("epg_folders", [])
+        self.epg_days = config.get("epg_days", 7)
+        self.epg_interval = config.get("epg_interval_hours", 0) * 3600  # 0 = zamanlanmış EPG kapalı
+        self.stopped = threading.Event()
+        self.lock = threading.RLock()  # Kanal listesi değişiklikleri (API ve dosya izleyici)
+        self.jobs = JobManager()
+
+        self.agent = WorkerAgent(config.get("http_port", 8080), host,
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), "hls"),
+                                 config.get("control_token", ""), config.get("max_encoders", 0),
+                                 config.get("segment_store", "disk"), config.get("ram_dir", ""),
+                                 config.get("segment_window", 12), config.get("http_workers", 256),
+                                 config.get("http_cache_mb", 64), config.get("viewer_timeout", 30), {
+                                     "keepalive_timeout": config.get("keepalive_timeout", 10),
+                                     "max_connections": config.get("max_connections", 0),
+                                     "max_connections_per_ip": config.get("max_connections_per_ip", 0),
+                                     "rate_limit_kbps": config.get("rate_limit_kbps", 0)
+                                 })
+        # Uzak çalışanlar (masaüstü uygulamasıyla aynı "workers" ayarı)
+        self.workers = {}
+        for worker in config.get("workers", []):
+            client = WorkerClient(worker["url"], worker.get("token", ""), worker.get("public_url", ""))
+            self.workers[client.url] = client
+        self.agent.catalog = ChannelCatalog(lambda: self.channels, self.channel_worker_url, epg_path=self.epg_file)
+        self.agent.control = self
+
+    def channel_worker(self, channel):
+        """Kanalın yerleştirildiği uzak çalışan; yerel kanal ya da tanımsız çalışan için None"""
+        if not channel or not channel.get("worker"):
+            return None
+        return self.workers.get(channel["worker"].rstrip("/"))
+
+    def channel_worker_url(self, channel):
+        """Kanal bir çalışana yerleştirildiyse çalışanın yayın adresi, değilse None"""
+        worker = self.channel_worker(channel)
+        return worker.public_url if worker else None
+
+    def start_channel(self, channel):
+        worker = self.channel_worker(channel)
+        return worker.start_channel(channel) if worker else self.agent.start_channel(channel)
+
+    def stop_channel(self, channel):
+        worker = self.channel_worker(channel)
+        return worker.stop_channel(channel["name"]) if worker else self.agent.stop_channel(channel["name"])
+
+    def restart_channel(self, channel):
+        worker = self.channel_worker(channel)
+        return worker.restart_channel(channel) if worker else self.agent.restart_channel(channel)
+
+    def channel_state(self, channel):
+        """Kanalın durumu: running, queued, stopped; uzak çalışana erişilemiyorsa unknown"""
+        worker = self.channel_worker(channel)
+        if worker is None:
+            return self.agent.channel_state(channel["name"])
+        if time.time() - worker.last_refresh > 3:
+            worker.refresh()
+        if not worker.last_status:
+            return "unknown"
+        return worker.channel_state(channel["name"]) or "stopped"
+
+    def forget_channel(self, channel):
+        """Yapılandırmadan çıkan kanalı durdur (uzak çalışandaysa orada)"""
+        worker = self.channel_worker(channel)
+        if worker is None:
+            self.agent.forget_channel(channel["name"])
+            return
         try:
-            url = f"{self.TMDB_BASE_URL}/{media_type}/{tmdb_id}"
-            
-            # Önce Türkçe dene
-            params = {
-                'api_key': self.TMDB_API_KEY,
-                'language': 'tr-TR'
-            }
-            
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                tr_data = response.json()
-                
-                # Türkçe açıklama varsa kullan, yoksa İngilizce al
-                if not tr_data.get('overview'):
-                    params['language'] = 'en-US'
-                    en_response = requests.get(url, params=params)
-                    if en_response.status_code == 200:
-                        en_data = en_response.json()
-                        tr_data['overview'] = en_data.get('overview', 'Açıklama bulunamadı.')
-                
-                return tr_data
-            return None
+            worker.stop_channel(channel["name"])
         except Exception as e:
-            print(f"TMDB details error: {e}")
-            return None
-    
-    def generate_epg_from_videos(self, video_files_by_folder, days=7):
-        """Video dosyalarından EPG oluştur"""
-        root = ET.Element('tv', generator_name="TMDB Video EPG Generator")
-        
-        # Kanalları ekle
-        for folder_name, channel_info in self.channels.items():
-            channel_elem = ET.SubElement(root, 'channel', id=folder_name)
-            display_name = ET.SubElement(channel_elem, 'display-name')
-            display_name.text = channel_info['display_name']
-            
-            # Kanal açıklaması
-            desc = ET.SubElement(channel_elem, 'desc')
-            desc.text = f"Video klasörü: {channel_info['display_name']}"
-        
-        # Her klasör için programları ekle
-        for folder_name, video_files in video_files_by_folder.items():
-            if folder_name not in self.channels:
+            logger.error(f"'{channel['name']}' kanalı {worker.url} çalışanında durdurulamadı: {str(e)}")
+
+    def apply_channels(self, channels, renames=None):
+        """Yeni kanal listesini etkinleştir; yalnızca değişen kanalların kodlayıcılarına dokun"""
+        with self.lock:
+            diff = diff_channels(self.channels, channels, renames)
+            old_by_name = {channel["name"]: channel for channel in self.channels}
+            self.channels = channels
+            by_name = {channel["name"]: channel for channel in channels}
+            for channel_name in diff["removed"]:
+                self.forget_channel(old_by_name[channel_name])
+            for old_name, new_name in diff["renamed"].items():
+                was_active = self.channel_state(old_by_name[old_name]) in ("running", "queued")
+                self.forget_channel(old_by_name[old_name])
+                if was_active:
+                    self.start_channel(by_name[new_name])
+            # Başka çalışana taşınan kanal eski yerinde durdurulup yenisinde başlatılır
+            for channel_name, channel in by_name.items():
+                previous = old_by_name.get(channel_name)
+                if previous is None or self.channel_worker(previous) is self.channel_worker(channel):
+                    continue
+                if self.channel_state(previous) in ("running", "queued"):
+                    self.forget_channel(previous)
+                    try:
+                        self.start_channel(channel)
+                    except Exception as e:
+                        logger.error(f"'{channel_name}' kanalı yeni yerinde başlatılamadı: {str(e)}")
+            for channel_name in diff["restart"]:
+                try:
+                    self.restart_channel(by_name[channel_name])
+                except Exception as e:
+                    logger.error(f"'{channel_name}' kanalı yeniden başlatılamadı: {str(e)}")
+            for channel_name in diff["reprioritize"] + diff["updated"]:
+                # Uzak çalışandaki kanalın önceliği çalışanın kendi ayarlarıyla yönetilir
+                if self.channel_worker(by_name[channel_name]):
+                    continue
+                failures = self.agent.update_channel(by_name[channel_name])
+                if failures:
+                    diff["priority_failed"][channel_name] = failures
+            self.agent.catalog.invalidate()
+        if any(diff.values()):
+            logger.info(f"Kanal değişiklikleri uygulandı: {describe_channel_diff(diff)}")
+        return diff
+
+    def save_config(self):
+        with self.lock:
+            self.config["channels"] = self.channels
+            self.config_store.save(self.config)
+
+    def reload_config(self):
+        """Yapılandırma dosyasını yeniden oku; yalnızca değişen kanalları yeniden başlat"""
+        config = self.config_store.load()
+        diff = self.apply_channels(config.get("channels", []))
+        self.config = config
+        epg_file = config.get("epg_file") or self.epg_file
+        if epg_file != self.epg_file:
+            self.epg_file = epg_file
+            self.agent.catalog.set_epg_file(epg_file)
+        return diff
+
+    def watch_config(self, interval=2):
+        """Yapılandırma dosyası dışarıdan değiştiğinde farkı çalışan kanallara uygula"""
+        while not self.stopped.wait(interval):
+            if not self.config_store.changed_on_disk():
                 continue
-                
-            current_time = datetime.now().replace(hour=6, minute=0, second=0, microsecond=0)
-            
-            for day in range(days):
-                day_start = current_time + timedelta(days=day)
-                time_cursor = day_start
-                
-                # O gün için video dosyalarını sırayla yerleştir
-                for video_info in video_files:
-                    # Gün sona erdiyse sonraki güne geç
-                    next_day = day_start + timedelta(days=1)
-                    if time_cursor >= next_day:
-                        break
-                    
-                    # Program süresi
-                    duration = max(1800, min(video_info['duration'], 14400))
-                    
-                    programme = ET.SubElement(root, 'programme',
-                                            channel=folder_name,
-                                            start=time_cursor.strftime('%Y%m%d%H%M%S +0000'),
-                                            stop=(time_cursor + timedelta(seconds=duration)).strftime('%Y%m%d%H%M%S +0000'))
-                    
-                    # Başlık
-                    title = ET.SubElement(programme, 'title', lang='tr')
-                    title.text = video_info['title']
-                    
-                    # Açıklama
-                    desc = ET.SubElement(programme, 'desc', lang='tr')
-                    desc.text = video_info['description']
-                    
-                    # Kategori
-                    category = ET.SubElement(programme, 'category', lang='tr')
-                    if video_info.get('genres'):
-                        category.text = video_info['genres'][0]
-                    else:
-                        category.text = 'Film' if video_info.get('media_type') == 'movie' else 'Dizi'
-                    
-                    # Süre
-                    length = ET.SubElement(programme, 'length', units='seconds')
-                    length.text = str(duration)
-                    
-                    # Rating varsa ekle
-                    if video_info.get('rating', 0) > 0:
-                        rating = ET.SubElement(programme, 'star-rating')
-                        value = ET.SubElement(rating, 'value')
-                        value.text = f"{video_info['rating']:.1f}/10"
-                    
-                    # Poster varsa ekle
-                    if video_info.get('poster_url'):
-                        icon = ET.SubElement(programme, 'icon', src=video_info['poster_url'])
-                    
-                    # Credits (TMDB kaynak bilgisi)
-                    if video_info.get('tmdb_found'):
-                        credits = ET.SubElement(programme, 'credits')
-                        adapter = ET.SubElement(credits, 'adapter')
-                        adapter.text = "TMDB (The Movie Database)"
-                    
-                    # Bir sonraki programın başlangıç zamanı
-                    time_cursor += timedelta(seconds=duration)
-                    
-                    # Programlar arası 5 dakika reklam/tanıtım
-                    time_cursor += timedelta(minutes=5)
-        
-        return ET.tostring(root, encoding='unicode')
-    
-    def save_epg(self, filename, content):
-        """EPG'yi dosyaya kaydet"""
-        directory = os.path.dirname(filename)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(content)
+            try:
+                self.reload_config()
+            except (OSError, ValueError) as e:
+                logger.error(f"Yapılandırma yeniden yüklenemedi: {str(e)}")
+
+    # Denetim API'si (/api/...) - HLSRequestHandler._handle_api tarafından çağrılır
+    def api_status(self):
+        status = self.agent.status()
+        status["epg"] = {"file": self.epg_file, "exists": os.path.exists(self.epg_file)}
+        return status
+
+    def api_channels(self):
+        viewers = self.agent.runner.viewer_sessions.counts_snapshot()
+        with self.lock:
+            return [dict(channel, status=self.channel_state(channel),
+                         viewers=viewers.get(channel["name"], 0)) for channel in self.channels]
+
+    def api_save_channel(self, channel_name, data):
+        """Kanal ekle (channel_name None ise) ya da güncelle; verilmeyen alanlar korunur"""
+        with self.lock:
+            channels = list(self.channels)
+            names = {channel["name"] for channel in channels}
+            renames = None
+            if channel_name is None:
+                channel = validate_channel(data, names)
+                channels.append(channel)
+            else:
+                index = next((i for i, ch in enumerate(channels) if ch["name"] == channel_name), None)
+                if index is None:
+                    raise KeyError(channel_name)
+                channel = validate_channel(dict(channels[index], **data), names - {channel_name})
+                channels[index] = channel
+                if channel["name"] != channel_name:
+                    renames = {channel_name: channel["name"]}
+            diff = self.apply_channels(channels, renames)
+            self.save_config()
+        return {"channel": channel, "changes": diff}
+
+    def api_delete_channel(self, channel_name):
+        with self.lock:
+            if not any(channel["name"] == channel_name for channel in self.channels):
+                raise KeyError(channel_name)
+            diff = self.apply_channels([ch for ch in self.channels if ch["name"] != channel_name])
+            self.save_config()
+        return {"deleted": channel_name, "changes": diff}
+
+    def api_channel_action(self, action, channel_names, progress):
+        """Kanalları başlat/durdur/yeniden başlat (iş olarak çalışır); kanal başına durum döndürür"""
+        with self.lock:
+            by_name = {channel["name"]: channel for channel in self.channels}
+        results = {}
+        for channel_name in by_name if channel_names is None else channel_names:
+            channel = by_name.get(channel_name)
+            try:
+                if channel is None:
+                    raise KeyError(channel_name)
+                if action == "start":
+                    state = self.start_channel(channel)
+                elif action == "stop":
+                    state = self.stop_channel(channel)
+                elif self.channel_state(channel) == "running":
+                    state = self.restart_channel(channel)
+                else:
+                    state = self.start_channel(channel)
+            except KeyError:
+                state = "unknown"
+            except Exception as e:
+                state = f"error: {str(e)}"
+            results[channel_name] = state
+            progress(f"'{channel_name}': {state}")
+        return results
+
+    def api_generate_epg(self, folders, days, output, progress):
+        result = generate_epg_file(folders or self.epg_folders, output or self.epg_file,
+                                   days or self.epg_days, progress=progress)
+        if os.path.abspath(result["path"]) == os.path.abspath(self.epg_file):
+            self.agent.catalog.set_epg_file(self.epg_file)
+        return result
+
+    def start_all_channels(self):
+        for channel in self.channels:
+            if self.stopped.wait(self.launch_stagger):
+                return
+            try:
+                state = self.start_channel(channel)
+                logger.info(f"'{channel['name']}' kanalı: {state}")
+            except Exception as e:
+                logger.error(f"'{channel['name']}' kanalı başlatılamadı: {str(e)}")
+
+    def epg_loop(self):
+        """EPG dosyasını belirlenen aralıklarla yeniden üret"""
+        while not self.stopped.is_set():
+            try:
+                age = time.time() - os.path.getmtime(self.epg_file)
+            except OSError:
+                age = self.epg_interval
+            if age >= self.epg_interval:
+                try:
+                    generate_epg_file(self.epg_folders, self.epg_file, self.epg_days)
+                    self.agent.catalog.set_epg_file(self.epg_file)
+                    logger.info(f"Zamanlanmış EPG oluşturuldu: {self.epg_file}")
+                    age = 0
+                except Exception as e:
+                    logger.error(f"Zamanlanmış EPG oluşturma hatası: {str(e)}")
+                    age = self.epg_interval - 600  # 10 dakika sonra tekrar dene
+            self.stopped.wait(max(60, self.epg_interval - age))
+
+    def serve_forever(self):
+        if self.autostart:
+            threading.Thread(target=self.start_all_channels, daemon=True).start()
+        if self.epg_interval > 0 and self.epg_folders:
+            threading.Thread(target=self.epg_loop, daemon=True).start()
+        threading.Thread(target=self.watch_config, daemon=True).start()
+        if not self.agent.token:
+            logger.warning("control_token tanımlı değil: /api ve /_worker/ yalnızca yerel makineden kullanılabilir")
+        try:
+            self.agent.serve_forever()
+        finally:
+            self.stopped.set()
+            self.config_store.flush()
+
+    def shutdown(self):
+        self.stopped.set()
+        self.agent.shutdown()
+
+def run_cli(argv):
+    """Arayüzsüz komutlar; sonuçlar stdout'a JSON olarak yazılır (loglar stderr'e gider)"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="iptv_manager.py", description="IPTV Kanal Yönetim Sistemi (arayüzsüz)")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Yapılandırma dosyası")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="HTTP sunucusunu, kanalları ve zamanlanmış EPG'yi çalıştır")
+    serve.add_argument("--host", default="", help="Dinlenecek adres (varsayılan: tüm arayüzler)")
+    serve.add_argument("--autostart", action="store_true", default=None, help="Tüm kanalları başlat")
+    serve.add_argument("--no-autostart", action="store_false", dest="autostart", help="Kanalları başlatma")
+
+    for name, help_text in (("start-channel", "Çalışan servisteki kanalı başlat"),
+                            ("stop-channel", "Çalışan servisteki kanalı durdur"),
+                            ("status", "Çalışan servisin durumunu göster")):
+        command = commands.add_parser(name, help=help_text)
+        if name != "status":
+            command.add_argument("name", help="Kanal adı")
+        command.add_argument("--url", default="", help="Servis adresi (varsayılan: http://127.0.0.1:<http_port>)")
+
+    epg = commands.add_parser("generate-epg", help="Video klasörlerinden EPG oluştur")
+    epg.add_argument("--folder", action="append", default=[], help="Video klasörü (birden çok verilebilir)")
+    epg.add_argument("--days", type=int, default=None, help="Gün sayısı")
+    epg.add_argument("--output", default="", help="EPG dosyası (varsayılan: yapılandırmadaki epg_file)")
+
+    m3u = commands.add_parser("export-m3u", help="Tüm kanallar için M3U oynatma listesi yaz")
+    m3u.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "TumKanallar.m3u"))
+    m3u.add_argument("--base-url", default="", help="Yayın adresi (varsayılan: http://<yerel IP>:<http_port>)")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if not check_requirements(gui=False):
+            return 1
+        service = HeadlessService(args.config, args.host, args.autostart)
+        import signal
+        if hasattr(signal, "SIGTERM"):
+            signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=service.shutdown, daemon=True).start())
+        try:
+            service.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Servis durduruluyor")
+        return 0
+
+    try:
+        config = load_config_file(args.config)
+        channels = {channel["name"]: channel for channel in config.get("channels", [])}
+        port = config.get("http_port", 8080)
+
+        if args.command in ("start-channel", "stop-channel", "status"):
+            client = WorkerClient(args.url or f"http://127.0.0.1:{port}", config.get("control_token", ""))
+            if args.command == "status":
+                result = client.refresh()
+                if result is None:
+                    raise RuntimeError(f"Servise erişilemedi: {client.url}")
+            elif args.command == "start-channel":
+                if args.name not in channels:
+                    raise ValueError(f"'{args.name}' adında kanal yok")
+                result = {"name": args.name, "status": client.start_channel(channels[args.name])}
+            else:
+                result = {"name": args.name, "status": client.stop_channel(args.name)}
+        elif args.command == "generate-epg":
+            folders = args.folder or config.get("epg_folders") or []
+            if not folders:
+                raise ValueError("EPG için video klasörü verilmedi (--folder veya epg_folders)")
+            output = args.output or config.get("epg_file") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "video_epg.xml")
+            result = generate_epg_file(folders, output, args.days or config.get("epg_days", 7))
+        else:
+            base_url = (args.base_url or f"http://{socket.gethostbyname(socket.gethostname())}:{port}").rstrip("/")
+            catalog = ChannelCatalog(lambda: channels.values(), epg_path=config.get("epg_file", ""))
+            data, _ = catalog.playlist_m3u(base_url)
+            with open(args.output, "wb") as f:
+                f.write(data)
+            result = {"path": args.output, "channels": len(channels), "url": f"{base_url}/playlist.m3u"}
+    except Exception as e:
+        logger.error(f"Komut hatası ({args.command}): {str(e)}")
+        print(json.dumps({"error": str(e)}, ensure_ascii=False))
+        return 1
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+class ProgressLogQueue:
+    """İş parçacıklarından gelen ilerleme mesajlarını arayüze toplu aktaran kuyruk
+
+    put() her iş parçacığından çağrılabilir ve yalnızca kuyruğa ekler; arayüz iş parçacığı drain()
+    ile bekleyenleri tek seferde alır. Art arda gelen aynı mesajlar tek satırda sayılır, kuyruk
+    dolarsa en eski mesajlar atılır.
+    """
+    def __init__(self, max_pending=5000):
+        self.max_pending = max_pending
+        self.pending = deque()  # [zaman, mesaj, tekrar sayısı]
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def put(self, message):
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        with self.lock:
+            if self.pending and self.pending[-1][1] == message:
+                self.pending[-1][0] = timestamp
+                self.pending[-1][2] += 1
+                return
+            self.pending.append([timestamp, message, 1])
+            if len(self.pending) > self.max_pending:
+                self.pending.popleft()
+                self.dropped += 1
+
+    def drain(self):
+        """Bekleyen mesajları metin olarak döndür (yoksa boş dize)"""
+        with self.lock:
+            entries, self.pending = self.pending, deque()
+            dropped, self.dropped = self.dropped, 0
+        lines = [f"[{datetime.now().strftime('%H:%M:%S')}] ... {dropped} mesaj atlandı"] if dropped else []
+        for timestamp, message, count in entries:
+            lines.append(f"[{timestamp}] {message}" + (f" (x{count})" if count > 1 else ""))
+        return "\n".join(lines) + "\n" if lines else ""
 
 class IPTVManagerApp:
     def __init__(self, root):
@@ -672,29 +4304,93 @@ class IPTVManagerApp:
         if os.path.exists(icon_path):
             self.root.iconbitmap(icon_path)
         
-        self.config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "channels_config.json")
+        self.config_file = CONFIG_FILE
+        self.config_store = ConfigStore(self.config_file, on_error=lambda e: self.root.after(
+            0, lambda: messagebox.showerror("Hata", f"Yapılandırma kaydedilemedi: {str(e)}")))
+        self.runtime = RuntimeRegistry()  # Kanal durumları (yalnızca bellekte)
         self.output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hls")
         self.http_port = 8080
         self.http_server_thread = None
         self.ffmpeg_processes = {}
         
         # Varsayılan ayarlar
-        self.channels = []
+        self.channels = ChannelRegistry()
         self.temp_folders = []  # Geçici klasör listesi
         self.editing_index = -1  # Düzenlenen kanal indeksi
+        self.channel_rows = {}  # kanal adı -> listede gösterilen değerler (satır kimliği kanal adıdır)
+        self.watched_rows = set()  # izleyici sütunu sıfırdan farklı olan kanallar
         self.autostart = False   # Otomatik başlatma ayarı
-        
+        self.max_encoders = 0    # Eşzamanlı kodlayıcı sınırı (isteğe bağlı, 0 = sınırsız)
+        self.priority_affinity = {}  # Öncelik sınıfı -> CPU listesi
+        self.segment_store_mode = "disk"  # Segment depolama modu: disk, tmpfs veya memory
+        self.ram_dir = ""        # tmpfs modu için RAM dizini (boşsa otomatik seçilir)
+        self.segment_window = 12  # RAM modlarında kanal başına tutulan segment sayısı
+        self.launch_stagger = 0.5  # Toplu başlatmada FFmpeg işlemleri arası bekleme (sn)
+        self.workers = []        # Uzak çalışanlar: [{"url": ..., "token": ..., "public_url": ...}]
+        self.http_workers = 256  # HTTP sunucusu iş parçacığı sayısı
+        self.keepalive_timeout = 10  # Boşta kalan keep-alive bağlantılarının kapanma süresi (sn)
+        self.http_cache_mb = 64  # HLS dosya önbelleği boyutu (MB, 0 = kapalı)
+        self.viewer_timeout = 30  # İstek gelmeyen izleyici oturumunun kapanma süresi (sn)
+        self.max_connections = 0  # Toplam HTTP bağlantı sınırı, aşılırsa 503 (0 = sınırsız)
+        self.max_connections_per_ip = 0  # İstemci başına bağlantı sınırı (0 = sınırsız)
+        self.rate_limit_kbps = 0  # Bağlantı başına gönderim hızı sınırı (kbit/s, 0 = sınırsız)
+        self.http_processes = 1  # HTTP sunucusu süreç sayısı (>1: SO_REUSEPORT ile çok süreçli)
+        self.control_token = ""  # Denetim API'si anahtarı (boşsa API yalnızca yerel istemcilere açık)
+        self.prefork = None
+        self.epg_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "video_epg.xml")  # /epg.xml kaynağı
+        self.segment_store = None
+
         # HTTP sunucusunu başlatma kontrolü - widget'lardan önce tanımlanmalı
         self.server_running = False
+        self.server_stopping = False  # Sunucu arka planda durduruluyor
         
         # TMDB EPG Generator instance
         self.epg_generator = TMDBVideoEPGGenerator()
         self.epg_folders = []  # EPG için seçilen klasörler
         self.progress_text = None  # İlerleme durumu için metin alanı
+        self.progress_queue = ProgressLogQueue()  # EPG iş parçacığından gelen mesajlar
+        self.progress_scrollback = 2000  # Metin alanında tutulan en fazla satır
+        self.log_viewer_lines = 5000  # Günlük penceresinde takip sırasında tutulan en fazla satır
         
         # Yapılandırma dosyasını yükle
         self.load_config()
-        
+
+        # Kodlayıcı zamanlayıcısı - uzak çalışanlar varsa kodlayıcı sınırını çalışanlar uygular
+        self.scheduler = ChannelScheduler(0 if self.workers else self.max_encoders,
+                                          self.priority_affinity)
+
+        # Uzak çalışan havuzu
+        self.worker_pool = WorkerPool(self.workers) if self.workers else None
+
+        # FFmpeg ilerleme telemetrisi
+        self.telemetry = FFmpegTelemetry()
+
+        # FFmpeg işlemlerini ve HLS çıktısını yöneten çekirdek
+        self.runner = ChannelRunner(self.output_dir, self.http_port, self.scheduler, self.telemetry,
+                                    self.segment_store_mode, self.ram_dir, self.segment_window,
+                                    self.http_cache_mb, self.viewer_timeout)
+        self.output_dir = self.runner.output_dir
+        self.segment_store = self.runner.segment_store
+        self.ffmpeg_processes = self.runner.ffmpeg_processes
+
+        # /playlist.m3u ve /epg.xml uç noktaları
+        self.catalog = ChannelCatalog(lambda: self.channels, self.channel_worker_url, self.epg_file)
+
+        # Denetim API'sinden (/api/...) başlatılan uzun işlemler
+        self.jobs = JobManager()
+
+        # Uzun süren işler (kanal başlatma/durdurma, EPG) arka planda yürütülür, sonuçları
+        # arayüz iş parçacığında işlenir
+        ui_call = lambda fn, *args: self.root.after(0, fn, *args)
+        self.tasks = TaskExecutor(ui_call)
+        self.channel_tasks = {}  # kanal adı -> ("start"/"stop", Future) süren kanal görevi
+        self.cancelled_starts = set()  # başlatılırken durdurulması istenen kanallar
+        self.closing_event = threading.Event()  # uygulama kapanıyor, yeni FFmpeg başlatılmaz
+        self.launch_lock = threading.Lock()  # kapanış, süren bir başlatmanın işlemini kaydetmesini bekler
+
+        # Toplu kanal işlemleri için orkestratör
+        self.orchestrator = ChannelOrchestrator(ui_call, stagger=self.launch_stagger, executor=self.tasks.executor)
+
         # Menü oluştur
         self.create_menu()
         
@@ -707,6 +4403,11 @@ class IPTVManagerApp:
         # Otomatik başlatma özelliği
         if self.autostart:
             self.root.after(1000, self.auto_start_server)
+
+        # Sonlanan FFmpeg işlemlerini ve yapılandırma dosyasındaki dış değişiklikleri izle
+        self.root.after(2000, self.watch_channel_processes)
+        self.root.after(2000, self.watch_config_file)
+        self.root.after(200, self.flush_progress)
     
     def create_menu(self):
         """Menü çubuğu oluştur"""
@@ -717,6 +4418,7 @@ class IPTVManagerApp:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Dosya", menu=file_menu)
         file_menu.add_command(label="M3U Listesi Oluştur", command=self.create_m3u_playlist)
+        file_menu.add_command(label="Yapılandırmayı Yeniden Yükle", command=self.reload_config)
         file_menu.add_command(label="Hata Günlüğünü Görüntüle", command=self.show_error_log)
         file_menu.add_separator()
         file_menu.add_command(label="Çıkış", command=self.root.quit)
@@ -729,6 +4431,9 @@ class IPTVManagerApp:
         server_menu.add_separator()
         server_menu.add_command(label="Tüm Kanalları Başlat", command=self.start_all_channels)
         server_menu.add_command(label="Tüm Kanalları Durdur", command=self.stop_all_channels)
+        server_menu.add_separator()
+        server_menu.add_command(label="Kodlayıcı İstatistikleri", command=self.show_encoder_stats)
+        server_menu.add_command(label="İzleyici İstatistikleri", command=self.show_viewer_stats)
         
         # Ayarlar menüsü
         settings_menu = tk.Menu(menubar, tearoff=0)
@@ -828,16 +4533,18 @@ class IPTVManagerApp:
         control_frame.pack(fill="both", expand=False, padx=10, pady=5)
         
         # Kanal listesi için treeview
-        self.channel_tree = ttk.Treeview(channel_frame, columns=("name", "folder_count", "port", "status"), show="headings")
+        self.channel_tree = ttk.Treeview(channel_frame, columns=("name", "folder_count", "port", "status", "viewers"), show="headings")
         self.channel_tree.heading("name", text="Kanal Adı")
         self.channel_tree.heading("folder_count", text="Klasör Sayısı")
         self.channel_tree.heading("port", text="Port")
         self.channel_tree.heading("status", text="Durum")
+        self.channel_tree.heading("viewers", text="İzleyici")
         
         self.channel_tree.column("name", width=150)
         self.channel_tree.column("folder_count", width=80)
         self.channel_tree.column("port", width=80)
         self.channel_tree.column("status", width=100)
+        self.channel_tree.column("viewers", width=60)
         
         # Scrollbar ekle
         scrollbar = ttk.Scrollbar(channel_frame, orient="vertical", command=self.channel_tree.yview)
@@ -909,7 +4616,14 @@ class IPTVManagerApp:
         ttk.Label(edit_frame, text="EPG ID:").grid(row=4, column=0, sticky="w", padx=5, pady=5)
         self.epg_id_entry = ttk.Entry(edit_frame, width=30)
         self.epg_id_entry.grid(row=4, column=1, columnspan=2, sticky="ew", padx=5, pady=5)
-        
+
+        # Öncelik sınıfı
+        ttk.Label(edit_frame, text="Öncelik:").grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        self.priority_var = tk.StringVar(value=PRIORITY_CLASSES[DEFAULT_PRIORITY]["label"])
+        self.priority_combo = ttk.Combobox(edit_frame, textvariable=self.priority_var, state="readonly", width=18,
+                                           values=[c["label"] for c in PRIORITY_CLASSES.values()])
+        self.priority_combo.grid(row=5, column=1, sticky="w", padx=5, pady=5)
+
         # Klasör listesi çerçevesi
         folder_frame = ttk.LabelFrame(control_frame, text="Klasör Listesi")
         folder_frame.pack(fill="both", expand=True, padx=10, pady=5)
@@ -1040,6 +4754,8 @@ class IPTVManagerApp:
         
         self.epg_folder_tree.pack(side="left", fill="both", expand=True)
         epg_folder_scrollbar.pack(side="right", fill="y")
+        for folder_path in self.epg_folders:
+            self.epg_folder_tree.insert("", "end", values=(folder_path, "Hazır"))
         
         # Klasör işlem butonları
         epg_folder_btn_frame = ttk.Frame(video_frame)
@@ -1096,6 +4812,7 @@ class IPTVManagerApp:
             
             # Treeview'a ekle
             self.epg_folder_tree.insert("", "end", values=(folder_path, "Hazır"))
+            self.save_config()
             
             # Kullanıcıya bildir
             self.log_progress(f"Video klasörü eklendi: {folder_path}")
@@ -1113,23 +4830,31 @@ class IPTVManagerApp:
             if path in self.epg_folders:
                 self.epg_folders.remove(path)
             self.epg_folder_tree.delete(item)
+        self.save_config()
         
         self.log_progress(f"Klasör listeden kaldırıldı")
     
     def log_progress(self, message):
-        """İlerleme durumunu log kaydet ve göster"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        log_entry = f"[{timestamp}] {message}\n"
-        
-        # Metin alanına ekle
-        if self.progress_text:
-            self.progress_text.insert(tk.END, log_entry)
-            self.progress_text.see(tk.END)  # Otomatik kaydır
-            self.progress_text.update()  # UI güncelle
-        
-        # Konsola ve log dosyasına da yaz
+        """İlerleme mesajını kaydet; metin alanına arayüz iş parçacığında toplu eklenir"""
+        self.progress_queue.put(message)
         logger.info(message)
     
+    def flush_progress(self):
+        """Bekleyen ilerleme mesajlarını metin alanına tek seferde ekle (arayüz zamanlayıcısı)"""
+        try:
+            text = self.progress_queue.drain()
+            if text and self.progress_text:
+                self.progress_text.insert(tk.END, text)
+                # Satır sınırını aşan en eski satırları sil
+                lines = int(self.progress_text.index("end-1c").split(".")[0])
+                if lines > self.progress_scrollback:
+                    self.progress_text.delete("1.0", f"{lines - self.progress_scrollback + 1}.0")
+                self.progress_text.see(tk.END)
+        except Exception as e:
+            logger.error(f"İlerleme günlüğü güncellenemedi: {str(e)}")
+        finally:
+            self.root.after(200, self.flush_progress)
+    
     def generate_epg(self):
         """EPG oluşturma işlemi"""
         if not self.epg_folders:
@@ -1153,35 +4878,41 @@ class IPTVManagerApp:
             days = 7
             self.epg_days_var.set(days)
         
-        # EPG oluşturma işlemini başka bir thread'de çalıştır
+        # Kullanıcıdan manuel bilgi girişi yapılsın mı sorusu
+        ask_user_input = messagebox.askyesno(
+            "Manuel Bilgi Girişi", 
+            "Video bilgilerini otomatik çekmeden önce size sorulsun mu?\n\n"
+            "Evet: Her klasör için TMDB ID'sini girebilirsiniz.\n"
+            "Hayır: Tüm bilgiler otomatik olarak çekilecektir."
+        )
+        
+        # EPG oluşturma işlemini arka planda çalıştır
         self.log_progress(f"EPG oluşturma işlemi başlatılıyor... ({len(self.epg_folders)} klasör, {days} gün)")
         self.generate_epg_btn.config(state="disabled")
         
-        thread = threading.Thread(target=self._generate_epg_thread, args=(epg_filename, days), daemon=True)
-        thread.start()
+        self.tasks.submit(self._generate_epg_task, list(self.epg_folders), epg_filename, days, ask_user_input,
+                          on_done=self._on_epg_generation_complete)
+    
+    def ask_string(self, title, prompt):
+        """Arka plan iş parçacığından kullanıcıya soru sor; iletişim kutusu arayüz iş parçacığında açılır"""
+        from tkinter import simpledialog
+        return self.ui_call(lambda: simpledialog.askstring(title, prompt, parent=self.root), timeout=None)
     
-    def _generate_epg_thread(self, epg_filename, days):
-        """EPG oluşturma işlemi (Thread içinde) - İyileştirilmiş ve interaktif sürüm"""
+    def _generate_epg_task(self, epg_folders, epg_filename, days, ask_user_input):
+        """EPG oluşturma işlemi (arka planda) - oluşturulan dosyanın yolunu, başarısızsa None döndürür"""
         try:
             # İlerleme durumu
             self.log_progress("EPG için video klasörleri taranıyor...")
             
-            # Kullanıcıdan manuel bilgi girişi yapılsın mı sorusu
-            ask_user_input = messagebox.askyesno(
-                "Manuel Bilgi Girişi", 
-                "Video bilgilerini otomatik çekmeden önce size sorulsun mu?\n\n"
-                "Evet: Her klasör için TMDB ID'sini girebilirsiniz.\n"
-                "Hayır: Tüm bilgiler otomatik olarak çekilecektir."
-            )
-            
             # İşlemi başlat
             epg_generator = self.epg_generator
             epg_generator.channels = {}  # Önceki kanalları temizle
             
             # Her klasör için
             video_files_by_folder = {}
+            stage_times = {"scan": 0.0, "metadata": 0.0}  # Aşama süreleri (metrikler için)
             
-            for folder_path in self.epg_folders:
+            for folder_path in epg_folders:
                 try:
                     self.log_progress(f"Klasör taranıyor: {folder_path}")
                     folder_name = os.path.basename(folder_path)
@@ -1190,17 +4921,9 @@ class IPTVManagerApp:
                     channel_id = epg_generator.add_channel_from_folder(folder_name)
                     
                     # Video dosyalarını bul
-                    video_files = []
-                    for ext in [".mp4", ".mkv", ".avi", ".mov", ".wmv"]:
-                        try:
-                            video_files.extend(glob.glob(os.path.join(folder_path, "*" + ext)))
-                            # Alt klasörleri de tara
-                            video_files.extend(glob.glob(os.path.join(folder_path, "**", "*" + ext), recursive=True))
-                        except Exception as e:
-                            self.log_progress(f"Uzantı tarama hatası {ext}: {str(e)}")
-                    
-                    # Dosyaları sırala (alfabetik)
-                    video_files.sort()
+                    scan_start = time.perf_counter()
+                    video_files = find_video_files(folder_path, self.log_progress)
+                    stage_times["scan"] += time.perf_counter() - scan_start
                     
                     self.log_progress(f"'{folder_name}' klasöründe {len(video_files)} video dosyası bulundu")
                     
@@ -1210,29 +4933,25 @@ class IPTVManagerApp:
                     
                     if ask_user_input and video_files:
                         try:
-                            from tkinter import simpledialog
-                            
                             # Öncelikle TMDB ID'sini sor
-                            tmdb_id_input = simpledialog.askstring(
+                            tmdb_id_input = self.ask_string(
                                 "Klasör TMDB ID",
                                 f"'{folder_name}' klasörü için TMDB ID'sini girin:\n\n"
                                 f"Bu ID'yi themoviedb.org sitesinden bulabilirsiniz.\n"
-                                f"Boş bırakırsanız medya türü sorulacaktır.",
-                                parent=self.root
+                                f"Boş bırakırsanız medya türü sorulacaktır."
                             )
                             
                             if tmdb_id_input and tmdb_id_input.strip().isdigit():
                                 folder_tmdb_id = int(tmdb_id_input.strip())
                                 
                                 # TMDB ID verildiğinde medya türünü sor
-                                media_type_choice = simpledialog.askstring(
+                                media_type_choice = self.ask_string(
                                     "Klasör Medya Türü",
                                     f"TMDB ID: {folder_tmdb_id}\n"
                                     f"Bu ID hangi türde medyaya ait?\n"
                                     "1. Film\n"
                                     "2. TV Dizisi\n"
-                                    "Seçiminizi yapın (1/2):",
-                                    parent=self.root
+                                    "Seçiminizi yapın (1/2):"
                                 )
                                 
                                 if media_type_choice == "1":
@@ -1246,13 +4965,12 @@ class IPTVManagerApp:
                                 self.log_progress(f"'{folder_name}' için TMDB ID: {folder_tmdb_id} ({folder_media_type})")
                             else:
                                 # TMDB ID verilmediyse medya türünü sor
-                                media_type_choice = simpledialog.askstring(
+                                media_type_choice = self.ask_string(
                                     "Klasör İçerik Türü",
                                     f"'{folder_name}' klasöründeki içeriklerin türünü seçin:\n"
                                     "1. Film\n"
                                     "2. TV Dizisi\n"
-                                    "Seçiminizi yapın (1/2) veya boş bırakın (otomatik):",
-                                    parent=self.root
+                                    "Seçiminizi yapın (1/2) veya boş bırakın (otomatik):"
                                 )
                                 
                                 if media_type_choice == "1":
@@ -1265,76 +4983,88 @@ class IPTVManagerApp:
                             self.log_progress(f"Kullanıcı girişi alınırken hata: {str(e)}")
                             # Hatada varsayılan değerleri kullan
 
-                # Her video için TMDB bilgisi çıkar
-                folder_videos = []
-                for i, video_file in enumerate(video_files):
-                    try:
-                        filename = os.path.basename(video_file)
-                        self.log_progress(f"İşleniyor ({i+1}/{len(video_files)}): {filename}")
+                    # Her video için TMDB bilgisi çıkar
+                    metadata_start = time.perf_counter()
+                    folder_videos = []
+                    for i, video_file in enumerate(video_files):
+                        try:
+                            filename = os.path.basename(video_file)
+                            self.log_progress(f"İşleniyor ({i+1}/{len(video_files)}): {filename}")
                         
-                        # Eğer kullanıcı her dosya için giriş yapmak istiyorsa
-                        video_tmdb_id = folder_tmdb_id
-                        video_media_type = folder_media_type
-                        video_ask_user = False
+                            # Eğer kullanıcı her dosya için giriş yapmak istiyorsa
+                            video_tmdb_id = folder_tmdb_id
+                            video_media_type = folder_media_type
+                            video_ask_user = False
                         
-                        # Klasör düzeyinde TMDB ID verilmediyse ve kullanıcı istiyorsa her dosya için sor
-                        if ask_user_input and not folder_tmdb_id and not folder_media_type:
-                            video_ask_user = True
+                            # Klasör düzeyinde TMDB ID verilmediyse ve kullanıcı istiyorsa her dosya için sor
+                            if ask_user_input and not folder_tmdb_id and not folder_media_type:
+                                video_ask_user = True
                             
-                        video_info = epg_generator.extract_video_info_with_tmdb(
-                            video_file, 
-                            progress_callback=self.log_progress,
-                            ask_user=video_ask_user,  # Sadece kullanıcı istiyorsa ve klasör için ID belirlenmemişse sor
-                            parent_window=self.root,
-                            default_media_type=video_media_type,  # Klasör için seçilen medya tipini kullan
-                            default_tmdb_id=video_tmdb_id  # Klasör için seçilen TMDB ID'sini kullan
-                        )
-                        folder_videos.append(video_info)
-                    except Exception as e:
-                        self.log_progress(f"Dosya işleme hatası: {str(e)}")
+                            video_info = epg_generator.extract_video_info_with_tmdb(
+                                video_file, 
+                                progress_callback=self.log_progress,
+                                ask_user=video_ask_user,  # Sadece kullanıcı istiyorsa ve klasör için ID belirlenmemişse sor
+                                ask_string=self.ask_string,
+                                default_media_type=video_media_type,  # Klasör için seçilen medya tipini kullan
+                                default_tmdb_id=video_tmdb_id  # Klasör için seçilen TMDB ID'sini kullan
+                            )
+                            folder_videos.append(video_info)
+                        except Exception as e:
+                            self.log_progress(f"Dosya işleme hatası: {str(e)}")
+                    stage_times["metadata"] += time.perf_counter() - metadata_start
                 
-                # Klasör videolarını ekle
-                if folder_videos:  # Boş değilse ekle
-                    video_files_by_folder[folder_name] = folder_videos
-                else:
-                    self.log_progress(f"⚠️ '{folder_name}' klasöründe işlenebilecek video bulunamadı")
-            except Exception as e:
-                self.log_progress(f"❌ Klasör işleme hatası: {str(e)}")
-        
-        if not video_files_by_folder:
-            self.log_progress("❌ EPG oluşturulamıyor: İşlenebilir video bulunamadı!")
-            self.root.after(0, lambda: self.generate_epg_btn.config(state="normal"))
-            return
-        
-        # EPG oluştur
-        self.log_progress(f"EPG dosyası oluşturuluyor: {epg_filename} ({days} gün)")
-        epg_content = epg_generator.generate_epg_from_videos(video_files_by_folder, days)
-        
-        # EPG dosyasını kaydet
-        epg_output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), epg_filename)
-        epg_generator.save_epg(epg_output_path, epg_content)
-        
-        # Tamamlandı
-        self.log_progress(f"✅ EPG dosyası başarıyla oluşturuldu: {epg_output_path}")
-        
-        # UI'yi güncelle - thread güvenli olması için
-        self.root.after(0, lambda: self._on_epg_generation_complete(epg_output_path))
+                    # Klasör videolarını ekle
+                    if folder_videos:  # Boş değilse ekle
+                        video_files_by_folder[folder_name] = folder_videos
+                    else:
+                        self.log_progress(f"⚠️ '{folder_name}' klasöründe işlenebilecek video bulunamadı")
+                except Exception as e:
+                    self.log_progress(f"❌ Klasör işleme hatası: {str(e)}")
         
-    except Exception as e:
-        error_msg = f"EPG oluşturma hatası: {str(e)}"
-        self.log_progress(f"❌ {error_msg}")
-        logger.error(error_msg, exc_info=True)
+            for stage, duration in stage_times.items():
+                METRICS.observe("iptv_epg_stage_duration_seconds", duration, stage=stage)
+            
+            if not video_files_by_folder:
+                METRICS.inc("iptv_epg_generations_total", result="empty")
+                self.log_progress("❌ EPG oluşturulamıyor: İşlenebilir video bulunamadı!")
+                return None
+        
+            # EPG oluştur
+            self.log_progress(f"EPG dosyası oluşturuluyor: {epg_filename} ({days} gün)")
+            with METRICS.timer("iptv_epg_stage_duration_seconds", stage="render"):
+                epg_content = epg_generator.generate_epg_from_videos(video_files_by_folder, days)
+        
+            # EPG dosyasını kaydet
+            epg_output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), epg_filename)
+            with METRICS.timer("iptv_epg_stage_duration_seconds", stage="save"):
+                epg_generator.save_epg(epg_output_path, epg_content)
+            METRICS.inc("iptv_epg_generations_total", result="success")
+        
+            # Tamamlandı
+            self.log_progress(f"✅ EPG dosyası başarıyla oluşturuldu: {epg_output_path}")
+            return epg_output_path
         
-        # UI'yi güncelle - thread güvenli olması için
-        self.root.after(0, lambda: self.generate_epg_btn.config(state="normal"))
+        except Exception as e:
+            METRICS.inc("iptv_epg_generations_total", result="error")
+            error_msg = f"EPG oluşturma hatası: {str(e)}"
+            self.log_progress(f"❌ {error_msg}")
+            logger.error(error_msg, exc_info=True)
+            return None
     
     def _on_epg_generation_complete(self, epg_file_path):
-        """EPG oluşturma tamamlandığında çağrılır"""
+        """EPG oluşturma tamamlandığında çağrılır (arayüz iş parçacığında)"""
         self.generate_epg_btn.config(state="normal")
+        if not epg_file_path:
+            return
         
+        self.epg_file = epg_file_path
+        self.catalog.set_epg_file(epg_file_path)
+        self.save_config()
+
         # Tamamlandı mesajı göster
         messagebox.showinfo("Başarılı", 
                           f"EPG dosyası başarıyla oluşturuldu:\n{epg_file_path}\n\n"
+                          f"HTTP sunucusu üzerinden de yayınlanır: http://<sunucu>:{self.http_port}/epg.xml\n\n"
                           "Bu EPG dosyasını kanallarınıza bağlamak için:\n"
                           "1. Kanal sekmesine geçin\n"
                           "2. Kanalı seçin\n"
@@ -1376,18 +5106,8 @@ class IPTVManagerApp:
     def toggle_autostart(self):
         """Otomatik başlatma özelliğini aç/kapa"""
         self.autostart = self.autostart_var.get()
-        # Ayarları kaydet
-        config = {
-            "channels": self.channels,
-            "http_port": self.http_port,
-            "autostart": self.autostart
-        }
-        try:
-            with open(self.config_file, "w") as f:
-                json.dump(config, f, indent=4)
-            self.status_var.set("Otomatik başlatma ayarı kaydedildi")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Yapılandırma kaydedilemedi: {str(e)}")
+        self.save_config()
+        self.status_var.set("Otomatik başlatma ayarı kaydedildi")
     
     def auto_start_server(self):
         """Otomatik başlatma için HTTP sunucusunu ve kanalları başlat"""
@@ -1434,10 +5154,17 @@ IPTV Kanal Yönetim Sistemi - Kullanım Adımları
 4. IPTV LİSTESİ OLUŞTURMA
    a) 'M3U Listesi Oluştur' butonuna tıklayarak IPTV oynatıcılar için liste oluşturun
    b) Oluşturulan liste 'TumKanallar.m3u' dosyasına kaydedilecektir
+   c) HTTP sunucusu çalışırken liste http://<sunucu>:<port>/playlist.m3u, EPG ise
+      http://<sunucu>:<port>/epg.xml adresinden her zaman güncel olarak alınabilir
 
 5. OTOMATİK BAŞLATMA
    a) Her program başlatıldığında sunucunun ve kanalların otomatik başlamasını istiyorsanız
       'Ayarlar' menüsünden 'Otomatik Başlat' seçeneğini işaretleyin
+
+6. BİRDEN FAZLA MAKİNE (ÇALIŞANLAR)
+   a) Diğer makinelerde çalışan süreci başlatın: python iptv_manager.py worker --port 9101
+   b) channels_config.json içindeki "workers" listesine çalışan adreslerini ekleyin
+   c) Kanallar en az yüklü çalışana yerleştirilir, M3U listesi çalışan adreslerini kullanır
 """
         steps_text.insert(tk.END, steps_content)
         steps_text.config(state=tk.DISABLED)
@@ -1487,49 +5214,88 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
     def load_config(self):
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, "r") as f:
-                    config = json.load(f)
-                    self.channels = config.get("channels", [])
-                    self.http_port = config.get("http_port", 8080)
-                    self.autostart = config.get("autostart", False)
+                config = self.config_store.load()
+                self.channels = ChannelRegistry(config.get("channels", []))
+                # Eski sürümler çalışma durumunu da dosyaya yazıyordu
+                for channel in self.channels:
+                    channel.pop("status", None)
+                self.http_port = config.get("http_port", 8080)
+                self.autostart = config.get("autostart", False)
+                self.max_encoders = config.get("max_encoders", 0)
+                self.priority_affinity = config.get("priority_affinity", {})
+                self.segment_store_mode = config.get("segment_store", "disk")
+                self.ram_dir = config.get("ram_dir", "")
+                self.segment_window = config.get("segment_window", 12)
+                self.launch_stagger = config.get("launch_stagger", 0.5)
+                self.workers = config.get("workers", [])
+                self.http_workers = config.get("http_workers", 256)
+                self.keepalive_timeout = config.get("keepalive_timeout", 10)
+                self.http_cache_mb = config.get("http_cache_mb", 64)
+                self.epg_file = config.get("epg_file", self.epg_file)
+                self.viewer_timeout = config.get("viewer_timeout", 30)
+                self.max_connections = config.get("max_connections", 0)
+                self.max_connections_per_ip = config.get("max_connections_per_ip", 0)
+                self.rate_limit_kbps = config.get("rate_limit_kbps", 0)
+                self.http_processes = config.get("http_processes", 1)
+                self.epg_folders = config.get("epg_folders", [])
+                self.control_token = config.get("control_token", "")
             except Exception as e:
                 messagebox.showerror("Hata", f"Yapılandırma dosyası yüklenemedi: {str(e)}")
         else:
             # Varsayılan yapılandırma
-            self.channels = [
-                {"name": "Diziler", "paths": ["D:\\Diziler", "D:\\Eski Diziler"], "port": 8081, "status": "Durduruldu"},
-                {"name": "Filmler", "paths": ["D:\\Filmler"], "port": 8082, "status": "Durduruldu"}
-            ]
+            self.channels = ChannelRegistry([
+                {"name": "Diziler", "paths": ["D:\\Diziler", "D:\\Eski Diziler"], "port": 8081},
+                {"name": "Filmler", "paths": ["D:\\Filmler"], "port": 8082}
+            ])
             self.save_config()
 
     def save_config(self):
+        """Kalıcı ayarları kaydet (yazma gecikmeli ve atomiktir)"""
+        # Kanal bilgileri değişmiş olabilir, /playlist.m3u yeniden üretilsin
+        if hasattr(self, "catalog"):
+            self.catalog.invalidate()
         config = {
-            "channels": self.channels,
+            "channels": list(self.channels),
             "http_port": self.http_port,
-            "autostart": self.autostart
+            "autostart": self.autostart,
+            "max_encoders": self.max_encoders,
+            "priority_affinity": self.priority_affinity,
+            "segment_store": self.segment_store_mode,
+            "ram_dir": self.ram_dir,
+            "segment_window": self.segment_window,
+            "launch_stagger": self.launch_stagger,
+            "workers": self.workers,
+            "http_workers": self.http_workers,
+            "keepalive_timeout": self.keepalive_timeout,
+            "http_cache_mb": self.http_cache_mb,
+            "epg_file": self.epg_file,
+            "viewer_timeout": self.viewer_timeout,
+            "max_connections": self.max_connections,
+            "max_connections_per_ip": self.max_connections_per_ip,
+            "rate_limit_kbps": self.rate_limit_kbps,
+            "http_processes": self.http_processes,
+            "epg_folders": self.epg_folders,
+            "control_token": self.control_token
         }
-        try:
-            with open(self.config_file, "w") as f:
-                json.dump(config, f, indent=4)
-        except Exception as e:
-            messagebox.showerror("Hata", f"Yapılandırma kaydedilemedi: {str(e)}")
+        # Kanal durumları RuntimeRegistry'de tutulur; dosyaya yazma birleştirilip arka planda yapılır
+        self.config_store.save(config)
     
     def refresh_channel_list(self):
-        # Önce mevcut listeyi temizle
-        for item in self.channel_tree.get_children():
-            self.channel_tree.delete(item)
-        
-        # Kanalları listeye ekle
+        """Kanal listesini ağaçla eşitle; yalnızca eklenen, silinen ve değişen satırlara dokunulur"""
+        for channel_name in [name for name in self.channel_rows if self.channels.get(name) is None]:
+            self.remove_channel_row(channel_name)
         for channel in self.channels:
-            paths = channel.get("paths", [])
-            folder_count = len(paths)
-            
-            self.channel_tree.insert("", "end", values=(
-                channel["name"],
-                folder_count,
-                channel["port"],
-                channel.get("status", "Durduruldu")
-            ))
+            self.update_channel_row(channel["name"])
+        
+        # Sıra değiştiyse (yapılandırma yeniden yüklendi) satırları yeniden diz
+        names = self.channels.names()
+        if [str(item) for item in self.channel_tree.get_children()] != names:
+            for index, channel_name in enumerate(names):
+                self.channel_tree.move(channel_name, "", index)
+    
+    def remove_channel_row(self, channel_name):
+        if self.channel_rows.pop(channel_name, None) is not None:
+            self.channel_tree.delete(channel_name)
     
     def refresh_folder_list(self):
         # Önce mevcut listeyi temizle
@@ -1542,15 +5308,8 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
 
     def auto_assign_port(self):
         """Otomatik boş port numarası ata"""
-        # Kullanılan portları topla
-        used_ports = set()
-        for channel in self.channels:
-            used_ports.add(channel["port"])
-        
-        # 8081'den başlayarak boş port bul
-        new_port = 8081
-        while new_port in used_ports:
-            new_port += 1
+        # 8081'den başlayarak boş port bul (kullanılan portlar kayıtta dizinlidir)
+        new_port = self.channels.free_port(8081)
         
         # Port alanını güncelle
         self.port_entry.delete(0, tk.END)
@@ -1590,18 +5349,17 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
             return
         
         # Aynı isimde kanal var mı kontrol et
-        for channel in self.channels:
-            if channel["name"] == name:
-                logger.warning(f"Aynı isimde kanal zaten var: {name}")
-                messagebox.showerror("Hata", f"'{name}' adında bir kanal zaten var!")
-                self.name_entry.focus_set()  # Dikkat odağını buraya getir
-                return
-              # Aynı port numarası var mı kontrol et
-            if channel["port"] == port:
-                logger.warning(f"Port zaten kullanımda: {port}")
-                messagebox.showerror("Hata", f"Port {port} zaten kullanımda!")
-                self.port_entry.focus_set()  # Dikkat odağını buraya getir
-                return
+        if self.channels.get(name):
+            logger.warning(f"Aynı isimde kanal zaten var: {name}")
+            messagebox.showerror("Hata", f"'{name}' adında bir kanal zaten var!")
+            self.name_entry.focus_set()  # Dikkat odağını buraya getir
+            return
+        # Aynı port numarası var mı kontrol et
+        if self.channels.port_in_use(port):
+            logger.warning(f"Port zaten kullanımda: {port}")
+            messagebox.showerror("Hata", f"Port {port} zaten kullanımda!")
+            self.port_entry.focus_set()  # Dikkat odağını buraya getir
+            return
         
         try:
             # Yeni kanalı ekle
@@ -1621,7 +5379,7 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
                 "logo": logo if logo else "",  # Logo bilgisini ekle
                 "epg_url": epg_url if epg_url else "",  # EPG URL bilgisini ekle
                 "epg_id": epg_id if epg_id else "",  # EPG ID bilgisini ekle
-                "status": "Durduruldu"
+                "priority": self.get_selected_priority()  # Öncelik sınıfı
             }
             
             # Listeye ekle
@@ -1633,8 +5391,8 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
             # Yapılandırmayı kaydet 
             self.save_config()
             
-            # Listeyi güncelle - bu adımda kanal görünmezse debug edelim
-            self.refresh_channel_list()
+            # Listeye yalnızca yeni satırı ekle
+            self.update_channel_row(name)
             
             # Kanal sayısını kontrol et ve log'a yaz
             logger.info(f"Kanal ekleme sonrası toplam kanal sayısı: {len(self.channels)}")
@@ -1688,13 +5446,11 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
             return
         
         # Diğer kanallarda aynı isim var mı kontrol et
-        for i, channel in enumerate(self.channels):
-            if i != self.editing_index and channel["name"] == name:
-                messagebox.showerror("Hata", f"'{name}' adında başka bir kanal zaten var!")
-                return
+        if self.channels.index(name) not in (-1, self.editing_index):
+            messagebox.showerror("Hata", f"'{name}' adında başka bir kanal zaten var!")
+            return
           # Kanalı güncelle
         old_name = self.channels[self.editing_index]["name"]
-        status = self.channels[self.editing_index].get("status", "Durduruldu")
           # Logo bilgisini al
         logo = self.logo_entry.get().strip()
         
@@ -1702,40 +5458,50 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
         epg_url = self.epg_url_entry.get().strip()
         epg_id = self.epg_id_entry.get().strip()
         
-        self.channels[self.editing_index] = {
+        channels = list(self.channels)
+        channels[self.editing_index] = {
             "name": name,
             "paths": self.temp_folders.copy(),
             "port": port,
             "logo": logo if logo else "",  # Logo bilgisini ekle
             "epg_url": epg_url if epg_url else "",  # EPG URL bilgisini ekle
             "epg_id": epg_id if epg_id else "",  # EPG ID bilgisini ekle
-            "status": status
+            "priority": self.get_selected_priority()  # Öncelik sınıfı
         }
+        # Kanalın yerleştirildiği çalışan korunur
+        for key in CHANNEL_PLACEMENT_KEYS:
+            if self.channels[self.editing_index].get(key):
+                channels[self.editing_index][key] = self.channels[self.editing_index][key]
         
-        # Yapılandırmayı kaydet ve listeyi güncelle
+        # Yalnızca kodlayıcıyı etkileyen değişikliklerde kanal yeniden başlatılır
+        diff = self.apply_channel_changes(channels, {old_name: name} if old_name != name else None)
         self.save_config()
-        self.refresh_channel_list()
         
         # Alanları temizle
         self.clear_form()
         
-        self.status_var.set(f"'{old_name}' kanalı güncellendi")
+        self.status_var.set(f"'{old_name}' kanalı güncellendi ({describe_channel_diff(diff)})")
+        if diff["priority_failed"]:
+            details = "\n".join(f"{channel_name}: {', '.join(failures)}"
+                                 for channel_name, failures in diff["priority_failed"].items())
+            messagebox.showwarning("Uyarı", f"Öncelik çalışan kanala uygulanamadı (yetki gerekebilir):\n{details}")
     def delete_channel(self):
         if self.editing_index < 0:
             return
             
         channel_name = self.channels[self.editing_index]["name"]
         
-        # Kanal çalışıyorsa durdur
-        if self.channels[self.editing_index].get("status") == "Çalışıyor" and channel_name in self.ffmpeg_processes:
+        # Kanal çalışıyorsa ya da başlatılıyorsa durdur
+        if channel_name in self.ffmpeg_processes or channel_name in self.channel_tasks:
             self.stop_channel(channel_name)
         
         # Kanalı sil
-        self.channels.pop(self.editing_index)
+        self.channels.remove(channel_name)
+        self.runtime.forget(channel_name)
         
-        # Yapılandırmayı kaydet ve listeyi güncelle
+        # Yapılandırmayı kaydet ve satırı listeden kaldır
         self.save_config()
-        self.refresh_channel_list()
+        self.remove_channel_row(channel_name)
         
         # Alanları temizle
         self.clear_form()
@@ -1747,8 +5513,9 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
         if not selected:
             return
         
-        index = self.channel_tree.index(selected[0])
-        if index < 0 or index >= len(self.channels):
+        # Satır kimliği kanal adıdır
+        index = self.channels.index(str(selected[0]))
+        if index < 0:
             return
         
         channel = self.channels[index]
@@ -1775,16 +5542,21 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
         epg_id = channel.get("epg_id", "")
         if epg_id:
             self.epg_id_entry.insert(0, epg_id)
+
+        # Öncelik sınıfını doldur
+        priority = self.scheduler.normalize_priority(channel.get("priority", DEFAULT_PRIORITY))
+        self.priority_var.set(PRIORITY_CLASSES[priority]["label"])
         
         # Klasör listesini doldur
         self.temp_folders = channel.get("paths", []).copy()
         self.refresh_folder_list()
         
-        # Butonları etkinleştir        self.update_btn.config(state="normal")
+        # Butonları etkinleştir
+        self.update_btn.config(state="normal")
         self.delete_btn.config(state="normal")
         self.start_channel_btn.config(state="normal")
         self.stop_channel_btn.config(state="normal")
-        status = channel.get("status", "Durduruldu")
+        status = self.runtime.status(channel["name"])
         if status == "Çalışıyor":
             self.start_channel_btn.config(state="disabled")
             self.stop_channel_btn.config(state="normal")
@@ -1799,6 +5571,7 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
         self.logo_entry.delete(0, tk.END)  # Logo alanını da temizle
         self.epg_url_entry.delete(0, tk.END)  # EPG URL alanını da temizle
         self.epg_id_entry.delete(0, tk.END)  # EPG ID alanını da temizle
+        self.priority_var.set(PRIORITY_CLASSES[DEFAULT_PRIORITY]["label"])
         self.temp_folders = []
         self.refresh_folder_list()
         self.editing_index = -1
@@ -1818,6 +5591,14 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
         if hasattr(self, 'add_btn'):
             self.add_btn.config(text="KANAL EKLE", width=30, style="Action.TButton")
 
+    def get_selected_priority(self):
+        """Formda seçili öncelik etiketini öncelik sınıfı anahtarına çevir"""
+        label = self.priority_var.get()
+        for key, priority_class in PRIORITY_CLASSES.items():
+            if priority_class["label"] == label:
+                return key
+        return DEFAULT_PRIORITY
+
     def toggle_http_server(self):
         if not self.server_running:
             # HTTP sunucusunu başlat
@@ -1837,9 +5618,24 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
             if not os.path.exists(self.output_dir):
                 os.makedirs(self.output_dir)
             
-            # HTTP sunucusunu ayrı bir thread'də başlat
-            self.server_thread = threading.Thread(target=self._run_http_server, daemon=True)
-            self.server_thread.start()
+            if self.use_prefork():
+                self.prefork = PreforkSupervisor(self.runner, self.http_processes, [
+                    "--port", str(self.http_port),
+                    "--output-dir", self.output_dir,
+                    "--config", self.config_file,
+                    "--http-workers", str(self.http_workers),
+                    "--keepalive-timeout", str(self.keepalive_timeout),
+                    "--cache-mb", str(self.http_cache_mb),
+                    "--viewer-timeout", str(self.viewer_timeout),
+                    "--max-connections", str(self.max_connections),
+                    "--max-connections-per-ip", str(self.max_connections_per_ip),
+                    "--rate-limit-kbps", str(self.rate_limit_kbps)
+                ])
+                self.prefork.start()
+            else:
+                # HTTP sunucusunu ayrı bir thread'də başlat
+                self.server_thread = threading.Thread(target=self._run_http_server, daemon=True)
+                self.server_thread.start()
             
             self.server_running = True
             self.status_var.set(f"HTTP sunucusu port {self.http_port} üzerinde başlatıldı")
@@ -1850,46 +5646,309 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
             logger.error(f"HTTP sunucusu başlatılırken hata: {str(e)}")
             messagebox.showerror("Hata", f"HTTP sunucusu başlatılamadı: {str(e)}")
     
+    def use_prefork(self):
+        """Çok süreçli HTTP sunucusu kullanılabilir mi"""
+        if self.http_processes <= 1:
+            return False
+        if not PreforkSupervisor.supported():
+            logger.warning("Bu sistemde SO_REUSEPORT yok, HTTP sunucusu tek süreçte çalışacak")
+            return False
+        if self.segment_store is not None:
+            # FFmpeg'in PUT istekleri tek bir sürecin belleğine düşer, diğerleri segmenti göremez
+            logger.warning("Bellek segment deposu çok süreçli sunucuyla kullanılamaz, tek süreç kullanılacak")
+            return False
+        return True
+
     def _run_http_server(self):
         try:
-            os.chdir(self.output_dir)
-            handler = http.server.SimpleHTTPRequestHandler
-            self.httpd = socketserver.TCPServer(("", self.http_port), handler)
-            self.httpd.serve_forever()
+            httpd = self.httpd = self.runner.create_http_server(max_workers=self.http_workers,
+                                                                keepalive_timeout=self.keepalive_timeout,
+                                                                max_connections=self.max_connections,
+                                                                max_connections_per_ip=self.max_connections_per_ip,
+                                                                rate_limit_kbps=self.rate_limit_kbps)
+        except Exception as e:
+            logger.error(f"HTTP sunucu hatası: {str(e)}")
+            print(f"HTTP sunucu hatası: {str(e)}")
+            return
+        try:
+            httpd.catalog = self.catalog
+            httpd.control = self
+            httpd.api_token = self.control_token
+            httpd.serve_forever()
         except Exception as e:
             logger.error(f"HTTP sunucu hatası: {str(e)}")
             print(f"HTTP sunucu hatası: {str(e)}")
+        finally:
+            # Dinleme soketi, açık keep-alive bağlantıları ve iş parçacığı havuzu kapatılır;
+            # port hemen yeniden kullanılabilir
+            httpd.server_close()
     
     def stop_http_server(self):
-        if not self.server_running:
+        if not self.server_running or self.server_stopping:
             return
         
-        try:
-            self.httpd.shutdown()
-            self.server_running = False
-            self.status_var.set("HTTP sunucusu durduruldu")
-            
-            # Butonları güncelle
-            self.update_server_buttons()
-        except Exception as e:
-            logger.error(f"HTTP sunucusu durdurulurken hata: {str(e)}")
-            messagebox.showerror("Hata", f"HTTP sunucusu durdurulamadı: {str(e)}")
+        # Alt süreçlerin ve sunucu döngüsünün kapanması beklenirken pencere donmasın
+        prefork, httpd = self.prefork, self.httpd
+        self.prefork = None
+        self.server_stopping = True
+        self.stop_server_btn.config(state="disabled")
+        self.status_var.set("HTTP sunucusu durduruluyor...")
+        self.tasks.submit(prefork.stop if prefork else functools.partial(self._shutdown_http_server, httpd,
+                                                                                         self.server_thread),
+                          on_done=lambda result: self._on_http_server_stopped(),
+                          on_error=lambda e: self._on_http_server_stop_failed(prefork, e))
+    
+    @staticmethod
+    def _shutdown_http_server(httpd, thread):
+        """Sunucu döngüsünü durdur ve server_close bitene kadar bekle (arka planda)"""
+        if httpd is not None:
+            httpd.shutdown()
+        if thread is not None:
+            thread.join(timeout=10)
+    
+    def _on_http_server_stopped(self):
+        self.server_running = False
+        self.server_stopping = False
+        self.status_var.set("HTTP sunucusu durduruldu")
+        
+        # Butonları güncelle
+        self.update_server_buttons()
+    
+    def _on_http_server_stop_failed(self, prefork, error):
+        logger.error(f"HTTP sunucusu durdurulurken hata: {str(error)}")
+        self.prefork = prefork
+        self.server_stopping = False
+        self.update_server_buttons()
+        messagebox.showerror("Hata", f"HTTP sunucusu durdurulamadı: {str(error)}")
     
     def start_all_channels(self):
         if not self.server_running:
             messagebox.showwarning("Uyarı", "Önce HTTP sunucusunu başlatın!")
             return
         
-        for channel in self.channels:
+        if self.orchestrator.busy:
+            messagebox.showwarning("Uyarı", "Devam eden bir toplu kanal işlemi var, lütfen bitmesini bekleyin.")
+            return
+        
+        # Yüksek öncelikli kanallar kodlayıcı yuvalarını önce alsın
+        channels = sorted(self.channels, key=lambda ch: PRIORITY_CLASSES[
+            self.scheduler.normalize_priority(ch.get("priority", DEFAULT_PRIORITY))]["rank"])
+        
+        to_start = []
+        for channel in channels:
             channel_name = channel["name"]
-            if channel.get("status") != "Çalışıyor":
-                self.start_channel(channel_name)
+            if channel_name in self.channel_tasks:
+                continue
+            if self.runtime.status(channel_name) in ("Çalışıyor", "Sırada") and (
+                    channel_name in self.ffmpeg_processes or self.scheduler.is_queued(channel_name)):
+                continue
+            
+            priority = self.scheduler.normalize_priority(channel.get("priority", DEFAULT_PRIORITY))
+            decision, victim = self.scheduler.request(channel_name, priority)
+            if decision == "queued":
+                self.runtime.set_status(channel_name, "Sırada")
+                continue
+            if victim:
+                self.stop_channel(victim)
+            
+            self.runtime.set_status(channel_name, "Hazırlanıyor")
+            to_start.append(channel_name)
+        
+        self.refresh_channel_list()
+        if not to_start:
+            return
+        
+        self.status_var.set(f"{len(to_start)} kanal başlatılıyor...")
+        self.orchestrator.start_batch(to_start, self.prepare_channel, self.launch_channel_process,
+                                      self.on_channel_batch_progress, self.on_start_batch_done)
     
     def stop_all_channels(self):
+        if self.orchestrator.busy:
+            messagebox.showwarning("Uyarı", "Devam eden bir toplu kanal işlemi var, lütfen bitmesini bekleyin.")
+            return
+        
+        # Önce kuyruktakileri iptal et, yoksa durdurulan kanalların yerine başlatılırlar
+        for channel in self.channels:
+            if self.scheduler.cancel(channel["name"]):
+                self.runtime.set_status(channel["name"], "Durduruldu")
+        
+        processes = {}
         for channel in self.channels:
             channel_name = channel["name"]
-            if channel.get("status") == "Çalışıyor":
+            if channel_name in self.channel_tasks:
+                # Süren başlatma görevi bitince kanal durdurulur
                 self.stop_channel(channel_name)
+                continue
+            if channel_name in self.ffmpeg_processes:
+                processes[channel_name] = self.ffmpeg_processes[channel_name]
+                self.runtime.set_status(channel_name, "Durduruluyor")
+        
+        self.refresh_channel_list()
+        
+        if not processes:
+            return
+        
+        self.status_var.set(f"{len(processes)} kanal durduruluyor...")
+        self.orchestrator.stop_batch(processes, self.on_channel_batch_progress, self.on_stop_batch_done)
+    
+    def close_channels(self, on_done):
+        """Uygulama kapanırken tüm kanalları arka planda durdur, bitince on_done'ı arayüz iş parçacığında çağır
+
+        Kuyruktaki kanal görevleri iptal edilir, süren başlatmalar FFmpeg'i başlatmadan vazgeçer.
+        Arayüz iş parçacığı hiçbir görevi beklemez; durdurmanın bitişi zamanlayıcıyla yoklanır.
+        """
+        self.closing_event.set()
+        self.tasks.shutdown()
+        for channel in self.channels:
+            self.scheduler.cancel(channel["name"])
+        
+        finished = threading.Event()
+        
+        def stop_all():
+            try:
+                # Süren bir başlatma varsa işlemini kaydetmesi beklenir, sonrakiler başlatılmaz
+                with self.launch_lock:
+                    channel_names = list(self.ffmpeg_processes)
+                if channel_names:
+                    with ThreadPoolExecutor(max_workers=min(len(channel_names), 16),
+                                            thread_name_prefix="kapanis") as pool:
+                        list(pool.map(self._stop_on_close, channel_names))
+                if self.prefork:
+                    self.prefork.stop()
+            finally:
+                finished.set()
+        
+        def poll():
+            if finished.is_set():
+                on_done()
+            else:
+                self.root.after(100, poll)
+        
+        threading.Thread(target=stop_all, name="kapanis", daemon=True).start()
+        poll()
+    
+    def _stop_on_close(self, channel_name):
+        try:
+            self.runner.stop(channel_name)
+        except Exception as e:
+            logger.error(f"'{channel_name}' kanalı kapanışta durdurulamadı: {str(e)}")
+    
+    def on_channel_batch_progress(self, channel_name, state, detail):
+        """Toplu işlemde kanal bazında ilerleme (arayüz iş parçacığında çalışır)"""
+        if state == "preparing":
+            self.set_channel_status(channel_name, "Hazırlanıyor")
+        elif state == "running":
+            # İşlem bu arada sonlandıysa izleyici durumu zaten güncellemiştir
+            if channel_name in self.ffmpeg_processes:
+                self.set_channel_status(channel_name, "Çalışıyor")
+        elif state == "stopped":
+            self.runner.forget(channel_name)
+            self.set_channel_status(channel_name, "Durduruldu")
+            self.release_encoder_slot(channel_name)
+        elif state == "failed":
+            if channel_name in self.ffmpeg_processes:
+                # Durdurulamayan kanal çalışmaya devam ediyor
+                self.set_channel_status(channel_name, "Çalışıyor")
+            else:
+                self.set_channel_status(channel_name, "Durduruldu")
+                self.release_encoder_slot(channel_name)
+            logger.warning(f"'{channel_name}' kanalı için toplu işlem başarısız: {detail}")
+        
+        if self.root.winfo_exists():
+            self.update_channel_row(channel_name)
+    
+    def on_start_batch_done(self, results):
+        """Toplu başlatma tamamlandığında çalışan yerleşimlerini tek seferde kaydet"""
+        if self.worker_pool:
+            self.save_config()
+        self.refresh_channel_list()
+        started = sum(1 for ok in results.values() if ok)
+        failed = len(results) - started
+        self.status_var.set(f"{started} kanal başlatıldı" + (f", {failed} kanal başlatılamadı" if failed else ""))
+        logger.info(f"Toplu başlatma tamamlandı: {started} başarılı, {failed} başarısız")
+    
+    def on_stop_batch_done(self, results):
+        """Toplu durdurma tamamlandığında listeyi güncelle"""
+        stopped = sum(1 for ok in results.values() if ok)
+        logger.info(f"Toplu durdurma tamamlandı: {stopped}/{len(results)} kanal durduruldu")
+        if self.root.winfo_exists():
+            self.refresh_channel_list()
+            self.status_var.set(f"{stopped} kanal durduruldu")
+    
+    def update_channel_row(self, channel_name):
+        """Listedeki tek bir kanal satırını güncelle (satır yoksa eklenir, kanal silindiyse kaldırılır)"""
+        channel = self.channels.get(channel_name)
+        if channel is None:
+            self.remove_channel_row(channel_name)
+            return
+        
+        # İzleyici sütunu refresh_viewer_counts ile güncellenir
+        previous = self.channel_rows.get(channel_name)
+        values = (channel["name"], len(channel.get("paths", [])), channel["port"],
+                  self.runtime.status(channel_name), previous[4] if previous else 0)
+        if previous is None:
+            self.channel_tree.insert("", self.channels.index(channel_name), iid=channel_name, values=values)
+        elif previous != values:
+            self.channel_tree.item(channel_name, values=values)
+        self.channel_rows[channel_name] = values
+
+    def viewer_stats(self):
+        """Yerel sunucu ve çalışanlardaki izleyici oturumlarını kanal bazında birleştir"""
+        stats = self.runner.viewer_sessions.snapshot(history=False)
+        if self.worker_pool:
+            for worker in self.worker_pool.workers:
+                worker_stats = (worker.last_status or {}).get("worker", {}).get("viewer_stats", {})
+                for channel_name, channel_stats in worker_stats.items():
+                    merged = stats.setdefault(channel_name, dict.fromkeys(channel_stats, 0))
+                    for key, value in channel_stats.items():
+                        merged[key] = merged.get(key, 0) + value
+        return stats
+
+    def refresh_viewer_counts(self):
+        """Kanal listesindeki izleyici sütununu güncelle (yalnızca sayısı değişen satırlar)"""
+        viewers = self.viewer_stats()
+        for channel_name in set(viewers) | self.watched_rows:
+            row = self.channel_rows.get(channel_name)
+            count = viewers.get(channel_name, {}).get("viewers", 0)
+            if row is None or row[4] == count:
+                continue
+            self.channel_tree.set(channel_name, "viewers", count)
+            self.channel_rows[channel_name] = row[:4] + (count,)
+        self.watched_rows = {name for name, stats in viewers.items() if stats.get("viewers")}
+
+    def show_viewer_stats(self):
+        """Kanal bazında anlık ve en yüksek izleyici sayılarını gösteren pencere"""
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("İzleyici İstatistikleri")
+        stats_window.geometry("700x350")
+
+        columns = ("name", "viewers", "peak_1h", "peak_24h", "peak", "bytes")
+        stats_tree = ttk.Treeview(stats_window, columns=columns, show="headings")
+        headings = {
+            "name": ("Kanal", 150), "viewers": ("Anlık", 70), "peak_1h": ("En Yüksek (1 sa)", 110),
+            "peak_24h": ("En Yüksek (24 sa)", 110), "peak": ("Tüm Zamanlar", 100), "bytes": ("Açık Oturum Verisi", 120)
+        }
+        for column, (text, width) in headings.items():
+            stats_tree.heading(column, text=text)
+            stats_tree.column(column, width=width)
+        stats_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def refresh():
+            if not stats_window.winfo_exists():
+                return
+            stats_tree.delete(*stats_tree.get_children())
+            for channel_name, channel_stats in sorted(self.viewer_stats().items()):
+                stats_tree.insert("", "end", values=(
+                    channel_name,
+                    channel_stats["viewers"],
+                    channel_stats["peak_1h"],
+                    channel_stats["peak_24h"],
+                    channel_stats["peak"],
+                    self.epg_generator.format_size(channel_stats["bytes"])
+                ))
+            stats_window.after(2000, refresh)
+
+        refresh()
     
     def start_selected_channel(self):
         if self.editing_index < 0:
@@ -1905,205 +5964,657 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
         channel_name = self.channels[self.editing_index]["name"]
         self.stop_channel(channel_name)
     
+    def set_channel_status(self, channel_name, status):
+        """Kanalın durumunu güncelle (yalnızca bellekte tutulur)"""
+        self.runtime.set_status(channel_name, status)
+    
+    def release_encoder_slot(self, channel_name):
+        """Kanalın kodlayıcı yuvasını bırak ve sırada bekleyen kanalı başlat"""
+        next_channel = self.scheduler.release(channel_name)
+        if next_channel:
+            logger.info(f"Kuyruktaki '{next_channel}' kanalı başlatılıyor")
+            self.start_channel(next_channel)
+    
+    def find_channel(self, channel_name):
+        """Ada göre kanalı bul"""
+        return self.channels.get(channel_name)
+    
+    def prepare_channel(self, channel_name):
+        """Kanal dizinini ve oynatma listesini hazırla (arka plan iş parçacıklarından da çağrılabilir)"""
+        channel = self.find_channel(channel_name)
+        if not channel:
+            return None
+        
+        # Uzak çalışanlar varsa kanal en az yüklü çalışana yerleştirilir, hazırlığı çalışan yapar
+        if self.worker_pool:
+            return {"worker": self.worker_pool.pick()}
+        return self.runner.prepare(channel)
+    
+    def launch_channel_process(self, channel_name, context):
+        """Hazırlanan kanal için FFmpeg işlemini başlat (arka plan iş parçacıklarından da çağrılabilir)"""
+        with self.launch_lock:
+            # Kapanış başladıysa işlem başlatılmaz, yoksa sahipsiz kalırdı
+            if self.closing_event.is_set():
+                raise RuntimeError("Uygulama kapanıyor, kanal başlatılmadı")
+            return self._launch_channel_process(channel_name, context)
+    
+    def _launch_channel_process(self, channel_name, context):
+        worker = context.get("worker")
+        if worker is None:
+            return self.runner.launch(channel_name, context)
+        
+        channel = self.find_channel(channel_name)
+        state = worker.start_channel(channel)
+        logger.info(f"'{channel_name}' kanalı {worker.url} çalışanına yerleştirildi ({state})")
+        channel["worker"] = worker.url
+        process = RemoteChannelProcess(worker, channel_name)
+        self.ffmpeg_processes[channel_name] = process
+        self.runner.count_launch(channel_name)
+        return process
+    
     def start_channel(self, channel_name):
         # Kanalı bul
-        channel = None
-        for ch in self.channels:
-            if ch["name"] == channel_name:
-                channel = ch
-                break
+        channel = self.find_channel(channel_name)
         
         if not channel:
             return
         
-        # Kanal zaten çalışıyor mu kontrol et
-        if channel.get("status") == "Çalışıyor" and channel_name in self.ffmpeg_processes:
+        # Kanal zaten çalışıyor mu ya da başlatılıp durduruluyor mu kontrol et
+        if self.runtime.status(channel_name) == "Çalışıyor" and channel_name in self.ffmpeg_processes:
+            return
+        if channel_name in self.channel_tasks:
+            self.status_var.set(f"'{channel_name}' kanalı için süren bir işlem var")
             return
         
-        # Kanal dizini ve oynatma listesi oluştur
-        channel_dir = os.path.join(self.output_dir, channel_name)
-        if not os.path.exists(channel_dir):
-            os.makedirs(channel_dir)
+        # Kodlayıcı yuvası iste - sınır doluysa kanal kuyruğa alınır
+        priority = self.scheduler.normalize_priority(channel.get("priority", DEFAULT_PRIORITY))
+        decision, victim = self.scheduler.request(channel_name, priority)
+        if decision == "queued":
+            self.set_channel_status(channel_name, "Sırada")
+            self.update_channel_row(channel_name)
+            self.status_var.set(f"'{channel_name}' kanalı kuyruğa alındı (kodlayıcı sınırı: {self.scheduler.max_active})")
+            return
         
-        # Oynatma listesi oluştur
-        playlist_file = os.path.join(channel_dir, "playlist.txt")
-        video_files = []
+        # Yer açmak için düşük öncelikli bir kanal kuyruğa geri alındıysa onu durdur
+        if victim:
+            self.stop_channel(victim)
         
-        # Tüm klasörleri tara (alt klasörler dahil)
-        paths = channel.get("paths", [])
-        for path in paths:
-            if os.path.exists(path):
-                # MP4 dosyalarını bul
-                for root, _, _ in os.walk(path):
-                    mp4_files = glob.glob(os.path.join(root, "*.mp4"))
-                    mkv_files = glob.glob(os.path.join(root, "*.mkv"))
-                    video_files.extend(mp4_files + mkv_files)
+        # Klasör tarama, oynatma listesi ve FFmpeg başlatma arka planda yapılır
+        self.set_channel_status(channel_name, "Hazırlanıyor")
+        self.update_channel_row(channel_name)
+        self.submit_channel_task(channel_name, "start", self._start_channel_task)
+    
+    def submit_channel_task(self, channel_name, kind, fn):
+        """Kanal görevini arka planda başlat; sonucu arayüz iş parçacığında işlenir"""
+        if kind == "stop":
+            on_done = lambda result: self._on_channel_stopped(channel_name)
+            on_error = lambda e: self._on_channel_stop_failed(channel_name, e)
+        else:
+            on_done = lambda process: self._on_channel_started(channel_name, process)
+            on_error = lambda e: self._on_channel_start_failed(channel_name, e)
+        # Kayıt görev kuyruğa alınmadan yapılır; görev hemen biter ve geri çağırma kaydı silerse
+        # eski bir kayıt geride kalmaz
+        self.channel_tasks[channel_name] = (kind, None)
+        future = self.tasks.submit(functools.partial(run_with_log_context, fn, channel=channel_name), channel_name,
+                                   on_done=on_done, on_error=on_error)
+        if channel_name in self.channel_tasks:
+            self.channel_tasks[channel_name] = (kind, future)
+        return future
+    
+    def _start_channel_task(self, channel_name):
+        """Kanalı hazırla ve FFmpeg'i başlat (arka planda); video dosyası yoksa None döndürür"""
+        context = self.prepare_channel(channel_name)
+        if not context:
+            return None
+        return self.launch_channel_process(channel_name, context)
+    
+    def _restart_channel_task(self, channel_name):
+        """Kanalın FFmpeg işlemini durdurup yeniden başlat (arka planda)"""
+        self.runner.stop(channel_name)
+        return self._start_channel_task(channel_name)
+    
+    def _on_channel_started(self, channel_name, process):
+        self.channel_tasks.pop(channel_name, None)
         
-        if not video_files:
-            messagebox.showwarning("Uyarı", f"'{channel_name}' kanalı için video dosyası bulunamadı!")
+        # Başlatılırken durdurulması istendiyse ya da kanal silindiyse hemen durdur
+        if channel_name in self.cancelled_starts or not self.find_channel(channel_name):
+            self.cancelled_starts.discard(channel_name)
+            if process is not None:
+                self.stop_channel(channel_name)
+            else:
+                self.set_channel_status(channel_name, "Durduruldu")
+                self.update_channel_row(channel_name)
+                self.release_encoder_slot(channel_name)
             return
         
-        with open(playlist_file, "w", encoding="utf-8") as f:
-            for video in video_files:
-                f.write(f"file '{video}'\n")
+        if process is None:
+            self.set_channel_status(channel_name, "Durduruldu")
+            self.update_channel_row(channel_name)
+            self.release_encoder_slot(channel_name)
+            messagebox.showwarning("Uyarı", f"'{channel_name}' kanalı için video dosyası bulunamadı!")
+            return
         
-        # FFmpeg komutunu hazırla ve başlat
-        port = channel["port"]
-        output_file = os.path.join(channel_dir, f"{channel_name}.m3u8")
+        # Kanal durumunu güncelle
+        self.set_channel_status(channel_name, "Çalışıyor")
         
-        try:
-            ffmpeg_cmd = [
-                "ffmpeg", "-re", "-f", "concat", "-safe", "0", "-i", playlist_file,
-                "-c", "copy", "-f", "hls", "-hls_time", "4", "-hls_playlist_type", "event",
-                "-hls_flags", "append_list+omit_endlist", 
-                "-hls_segment_filename", os.path.join(channel_dir, "segment_%03d.ts"),
-                output_file
-            ]
-            
-            logger.info(f"FFmpeg komutu: {' '.join(ffmpeg_cmd)}")
-            process = subprocess.Popen(ffmpeg_cmd)
-            self.ffmpeg_processes[channel_name] = process
-            
-            # Kanal durumunu güncelle
-            for ch in self.channels:
-                if ch["name"] == channel_name:
-                    ch["status"] = "Çalışıyor"
-                    break
-            
+        # Uzak çalışana yerleştirilen kanalın adresi yapılandırmada tutulur
+        if self.worker_pool:
             self.save_config()
-            self.refresh_channel_list()
+        self.update_channel_row(channel_name)
+        
+        if self.editing_index >= 0 and channel_name == self.channels[self.editing_index]["name"]:
+            self.start_channel_btn.config(state="disabled")
+            self.stop_channel_btn.config(state="normal")
             
-            if channel_name == self.channels[self.editing_index]["name"]:
-                self.start_channel_btn.config(state="disabled")
-                self.stop_channel_btn.config(state="normal")
-                
-            self.status_var.set(f"'{channel_name}' kanalı başlatıldı")
-        except Exception as e:
-            logger.error(f"Kanal başlatılırken hata: {str(e)}")
-            messagebox.showerror("Hata", f"Kanal başlatılamadı: {str(e)}")
+        self.status_var.set(f"'{channel_name}' kanalı başlatıldı")
+    
+    def _on_channel_start_failed(self, channel_name, error):
+        self.channel_tasks.pop(channel_name, None)
+        cancelled = channel_name in self.cancelled_starts or self.closing_event.is_set()
+        self.cancelled_starts.discard(channel_name)
+        logger.error(f"Kanal başlatılırken hata: {str(error)}")
+        if channel_name not in self.ffmpeg_processes:
+            self.set_channel_status(channel_name, "Durduruldu")
+            self.release_encoder_slot(channel_name)
+        self.update_channel_row(channel_name)
+        if not cancelled:
+            messagebox.showerror("Hata", f"Kanal başlatılamadı: {str(error)}")
     
     def stop_channel(self, channel_name):
+        # Başlatılmakta olan kanal, başlatma görevi bitince durdurulur
+        if channel_name in self.channel_tasks:
+            if self.channel_tasks[channel_name][0] == "start":
+                self.cancelled_starts.add(channel_name)
+                self.set_channel_status(channel_name, "Durduruluyor")
+                self.update_channel_row(channel_name)
+            return
+        
+        # Kuyrukta bekleyen kanal için çalışan bir işlem yok, sadece kuyruktan çıkar
+        if channel_name not in self.ffmpeg_processes and self.scheduler.cancel(channel_name):
+            self.set_channel_status(channel_name, "Durduruldu")
+            self.update_channel_row(channel_name)
+            self.status_var.set(f"'{channel_name}' kanalı kuyruktan çıkarıldı")
+            return
+        
+        if channel_name in self.ffmpeg_processes:
+            # FFmpeg'in kapanması birkaç saniye sürebilir, beklemeyi arka planda yap
+            self.set_channel_status(channel_name, "Durduruluyor")
+            self.update_channel_row(channel_name)
+            self.submit_channel_task(channel_name, "stop", self.runner.stop)
+    
+    def _on_channel_stopped(self, channel_name):
+        self.channel_tasks.pop(channel_name, None)
+        
+        # Kanal durumunu güncelle - daha öncelikli bir kanala yer açtıysa kuyrukta bekler
+        if not self.find_channel(channel_name):
+            self.runtime.forget(channel_name)
+        elif self.scheduler.is_queued(channel_name):
+            self.set_channel_status(channel_name, "Sırada")
+        else:
+            self.set_channel_status(channel_name, "Durduruldu")
+        
+        self.update_channel_row(channel_name)
+        
+        if self.editing_index >= 0 and channel_name == self.channels[self.editing_index]["name"]:
+            self.start_channel_btn.config(state="normal")
+            self.stop_channel_btn.config(state="disabled")
+        
+        self.status_var.set(f"'{channel_name}' kanalı durduruldu")
+        
+        # Boşalan yuvayı kuyruktaki kanala ver
+        self.release_encoder_slot(channel_name)
+    
+    def _on_channel_stop_failed(self, channel_name, error):
+        self.channel_tasks.pop(channel_name, None)
+        logger.error(f"Kanal durdurulurken hata: {str(error)}")
         if channel_name in self.ffmpeg_processes:
+            self.set_channel_status(channel_name, "Çalışıyor")
+        self.update_channel_row(channel_name)
+        messagebox.showerror("Hata", f"Kanal durdurulamadı: {str(error)}")
+    
+    def restart_channel(self, channel_name):
+        """Çalışan kanalın kodlayıcısını yeni ayarlarla arka planda yeniden başlat (kodlayıcı yuvası korunur)
+
+        Yeniden başlatma planlandıysa True döndürür.
+        """
+        if channel_name not in self.ffmpeg_processes or channel_name in self.channel_tasks:
+            return False
+        self.set_channel_status(channel_name, "Hazırlanıyor")
+        self.update_channel_row(channel_name)
+        self.submit_channel_task(channel_name, "start", self._restart_channel_task)
+        return True
+
+    def apply_channel_changes(self, channels, renames=None):
+        """Yeni kanal listesini etkinleştir; yalnızca etkilenen kodlayıcıları durdur/yeniden başlat"""
+        diff = diff_channels(self.channels, channels, renames)
+        
+        # Silinen ve yeniden adlandırılan kanalların eski adlarıyla çalışan işlemlerini durdur
+        restart_renamed = []
+        for channel_name in diff["removed"] + list(diff["renamed"]):
+            if channel_name in self.ffmpeg_processes or self.scheduler.is_queued(channel_name):
+                self.stop_channel(channel_name)
+                if channel_name in diff["renamed"]:
+                    restart_renamed.append(diff["renamed"][channel_name])
+            self.runtime.forget(channel_name)
+        
+        self.channels.replace(channels)
+        
+        for channel_name in diff["restart"]:
+            self.restart_channel(channel_name)
+        for channel_name in diff["reprioritize"]:
+            priority = self.scheduler.normalize_priority(self.find_channel(channel_name).get("priority", DEFAULT_PRIORITY))
+            self.scheduler.set_priority(channel_name, priority)
+            process = self.ffmpeg_processes.get(channel_name)
+            if process is not None and not isinstance(process, RemoteChannelProcess):
+                failures = self.scheduler.apply_priority(process, priority)
+                if failures:
+                    diff["priority_failed"][channel_name] = failures
+        for channel_name in restart_renamed:
+            self.start_channel(channel_name)
+        
+        self.catalog.invalidate()
+        self.refresh_channel_list()
+        if any(diff.values()):
+            logger.info(f"Kanal değişiklikleri uygulandı: {describe_channel_diff(diff)}")
+        return diff
+
+    def reload_config(self):
+        """Yapılandırma dosyasını yeniden oku ve kanal farkını çalışan kanallara uygula"""
+        try:
+            config = self.config_store.load()
+        except (OSError, ValueError) as e:
+            logger.error(f"Yapılandırma yeniden yüklenemedi: {str(e)}")
+            self.status_var.set(f"Yapılandırma yeniden yüklenemedi: {str(e)}")
+            return
+        channels = config.get("channels", [])
+        for channel in channels:
+            channel.pop("status", None)
+        
+        self.clear_form()
+        diff = self.apply_channel_changes(channels)
+        epg_file = config.get("epg_file", self.epg_file)
+        if epg_file != self.epg_file:
+            self.epg_file = epg_file
+            self.catalog.set_epg_file(epg_file)
+        self.status_var.set(f"Yapılandırma yeniden yüklendi: {describe_channel_diff(diff)}")
+
+    def ui_call(self, fn, *args, timeout=60):
+        """Fonksiyonu arayüz iş parçacığında çalıştır ve sonucunu bekle (API iş parçacıklarından)"""
+        if threading.current_thread() is threading.main_thread():
+            return fn(*args)
+        done = threading.Event()
+        outcome = {}
+        
+        def run():
             try:
-                # FFmpeg işlemini durdur
-                process = self.ffmpeg_processes[channel_name]
-               
+                outcome["value"] = fn(*args)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+        
+        self.root.after(0, run)
+        if not done.wait(timeout):
+            raise TimeoutError("Arayüz iş parçacığı yanıt vermedi")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("value")
 
-                process.terminate()
-                process.wait(timeout=5)
-                
-                # İşlem listesinden kaldır
-                del self.ffmpeg_processes[channel_name]
-                
-                # Kanal durumunu güncelle
-                for ch in self.channels:
-                    if ch["name"] == channel_name:
-                        ch["status"] = "Durduruldu"
-                        break
-                
-                self.save_config()
-                self.refresh_channel_list()
+    # Denetim API'si (/api/...) - HTTP iş parçacıklarından çağrılır, değişiklikler arayüz iş parçacığında yapılır
+    def api_status(self):
+        return self.ui_call(lambda: {
+            "server_running": self.server_running,
+            "encoders": {"active": len(self.ffmpeg_processes), "queued": len(self.scheduler.queue),
+                         "capacity": self.scheduler.max_active},
+            "channels": {channel["name"]: self.runtime.status(channel["name"]) for channel in self.channels},
+            "viewers": self.viewer_stats(),
+            "epg": {"file": self.epg_file, "exists": os.path.exists(self.epg_file)}
+        })
+
+    def api_channels(self):
+        def collect():
+            viewers = self.viewer_stats()
+            return [dict(channel, status=self.runtime.status(channel["name"]),
+                         viewers=viewers.get(channel["name"], {}).get("viewers", 0)) for channel in self.channels]
+        return self.ui_call(collect)
+
+    def api_save_channel(self, channel_name, data):
+        """Kanal ekle (channel_name None ise) ya da güncelle; verilmeyen alanlar korunur"""
+        def save():
+            channels = list(self.channels)
+            names = {channel["name"] for channel in channels}
+            renames = None
+            if channel_name is None:
+                channel = validate_channel(data, names)
+                channels.append(channel)
+            else:
+                index = next((i for i, ch in enumerate(channels) if ch["name"] == channel_name), None)
+                if index is None:
+                    raise KeyError(channel_name)
+                channel = validate_channel(dict(channels[index], **data), names - {channel_name})
+                channels[index] = channel
+                if channel["name"] != channel_name:
+                    renames = {channel_name: channel["name"]}
+            self.clear_form()
+            diff = self.apply_channel_changes(channels, renames)
+            self.save_config()
+            return {"channel": channel, "changes": diff}
+        return self.ui_call(save)
+
+    def api_delete_channel(self, channel_name):
+        def delete():
+            if not self.find_channel(channel_name):
+                raise KeyError(channel_name)
+            self.clear_form()
+            diff = self.apply_channel_changes([ch for ch in self.channels if ch["name"] != channel_name])
+            self.save_config()
+            return {"deleted": channel_name, "changes": diff}
+        return self.ui_call(delete)
+
+    def api_channel_action(self, action, channel_names, progress):
+        """Kanalları başlat/durdur/yeniden başlat (iş olarak çalışır); kanal başına durum döndürür"""
+        if action != "stop" and not self.server_running:
+            raise ValueError("HTTP sunucusu çalışmıyor")
+        if channel_names is None:
+            channel_names = self.ui_call(lambda: [channel["name"] for channel in self.channels])
+        
+        def run(channel_name):
+            if not self.find_channel(channel_name):
+                raise KeyError(channel_name)
+            if action == "start":
+                self.start_channel(channel_name)
+            elif action == "stop":
+                self.stop_channel(channel_name)
+            elif not self.restart_channel(channel_name):
+                self.start_channel(channel_name)
+            return self.channel_tasks.get(channel_name, (None, None))[1]
+        
+        results = {}
+        for channel_name in channel_names:
+            try:
+                # Kanallar tek tek işlenir, arayüz işlemler arasında yanıt vermeye devam eder
+                future = self.ui_call(run, channel_name)
+                if future is not None:
+                    # Görev bitip sonucu arayüzde işlenene kadar bekle (hata durumu aşağıda okunur)
+                    future.exception()
+                results[channel_name] = self.ui_call(self.runtime.status, channel_name)
+            except KeyError:
+                results[channel_name] = "unknown"
+            except Exception as e:
+                results[channel_name] = f"error: {str(e)}"
+            progress(f"'{channel_name}': {results[channel_name]}")
+        return results
+
+    def api_generate_epg(self, folders, days, output, progress):
+        # Arayüzdeki üreticiyle durum paylaşılmasın diye ayrı bir üretici kullanılır
+        output = output or self.epg_file
+        result = generate_epg_file(folders or self.epg_folders, output, days or 7, progress=progress)
+        
+        def activate():
+            self.epg_file = result["path"]
+            self.catalog.set_epg_file(result["path"])
+            self.save_config()
+        self.ui_call(activate)
+        return result
+
+    def watch_config_file(self):
+        """Yapılandırma dosyası dışarıdan değiştirildiyse yeniden yükle"""
+        try:
+            if self.config_store.changed_on_disk():
+                self.reload_config()
+        except Exception as e:
+            logger.error(f"Yapılandırma izleme hatası: {str(e)}")
+        finally:
+            self.root.after(2000, self.watch_config_file)
+
+    def watch_channel_processes(self):
+        """Kendiliğinden sonlanan FFmpeg işlemlerini tespit et ve yuvalarını serbest bırak"""
+        try:
+            for channel_name, process in list(self.ffmpeg_processes.items()):
+                if process.poll() is None:
+                    continue
                 
-                if self.editing_index >= 0 and channel_name == self.channels[self.editing_index]["name"]:
-                    self.start_channel_btn.config(state="normal")
-                    self.stop_channel_btn.config(state="disabled")
+                # Toplu durdurma ya da kanal görevi sürerken sonlanan işlemleri onlar ele alır
+                if self.runtime.status(channel_name) == "Durduruluyor" or channel_name in self.channel_tasks:
+                    continue
                 
-                self.status_var.set(f"'{channel_name}' kanalı durduruldu")
-            except Exception as e:
-                logger.error(f"Kanal durdurulurken hata: {str(e)}")
-                messagebox.showerror("Hata", f"Kanal durdurulamadı: {str(e)}")
+                logger.warning(f"'{channel_name}' kanalının FFmpeg işlemi sonlandı (çıkış kodu: {process.returncode})")
+                METRICS.inc("iptv_ffmpeg_exits_total", channel=channel_name)
+                self.runner.forget(channel_name)
+                self.set_channel_status(channel_name, "Durduruldu")
+                self.update_channel_row(channel_name)
+                self.release_encoder_slot(channel_name)
+            self.refresh_viewer_counts()
+        except Exception as e:
+            logger.error(f"FFmpeg işlem kontrolü hatası: {str(e)}")
+        finally:
+            self.root.after(2000, self.watch_channel_processes)
     
+    def channel_worker_url(self, channel):
+        """Kanal bir çalışana yerleştirildiyse çalışanın yayın adresi, değilse None"""
+        worker = self.worker_pool.get(channel["worker"]) if self.worker_pool and channel.get("worker") else None
+        return worker.public_url if worker else None
+
     def create_m3u_playlist(self):
         if not self.channels:
             messagebox.showwarning("Uyarı", "Kanal listesi boş!")
             return
         
-        try:            # Yerel IP adresini al
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
+        try:
+            # Yerel IP adresini yalnızca ilk seferde çözümle
+            if not getattr(self, "local_ip", None):
+                self.local_ip = socket.gethostbyname(socket.gethostname())
             
-            # M3U dosyasını oluştur
+            # M3U dosyasını oluştur - içerik /playlist.m3u ile aynıdır
             playlist_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TumKanallar.m3u")
+            data, _ = self.catalog.playlist_m3u(f"http://{self.local_ip}:{self.http_port}")
+            with open(playlist_path, "wb") as f:
+                f.write(data)
             
-            with open(playlist_path, "w", encoding="utf-8") as f:
-                f.write("#EXTM3U\n")
-                for channel in self.channels:
-                    # Logo ve EPG bilgilerini al
-                    logo = channel.get("logo", "")
-                    epg_url = channel.get("epg_url", "")
-                    epg_id = channel.get("epg_id", "")
-                    
-                    # EXTINF satırını oluştur - logo ve EPG varsa ekle
-                    extinf_line = f'#EXTINF:-1 tvg-id="{epg_id if epg_id else channel["name"]}" tvg-name="{channel["name"]}" group-title="Yerel"'
-                    if logo:
-                        extinf_line += f' tvg-logo="{logo}"'
-                    if epg_url:
-                        extinf_line += f' tvg-epg="{epg_url}"'
-                    extinf_line += f',{channel["name"]}\n'
-                    
-                    f.write(extinf_line)
-                    f.write(f'http://{ip_address}:{self.http_port}/{channel["name"]}/{channel["name"]}.m3u8\n')
-            
-            messagebox.showinfo("Bilgi", f"M3U oynatma listesi oluşturuldu: {playlist_path}")
+            messagebox.showinfo("Bilgi", f"M3U oynatma listesi oluşturuldu: {playlist_path}\n\n"
+                                         f"Liste HTTP sunucusu üzerinden de yayınlanır: "
+                                         f"http://{self.local_ip}:{self.http_port}/playlist.m3u")
         except Exception as e:
             logger.error(f"M3U dosyası oluşturulurken hata: {str(e)}")
             messagebox.showerror("Hata", f"M3U dosyası oluşturulamadı: {str(e)}")
-    
+
+    def show_encoder_stats(self):
+        """Kanal bazında FFmpeg telemetrisini gösteren pencere"""
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("Kodlayıcı İstatistikleri")
+        stats_window.geometry("900x400")
+
+        # Araç çubuğu
+        toolbar = ttk.Frame(stats_window)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
+
+        export_btn = ttk.Button(toolbar, text="Dışa Aktar", command=self.export_encoder_stats)
+        export_btn.pack(side=tk.LEFT, padx=5, pady=5)
+
+        cache_var = tk.StringVar()
+        ttk.Label(toolbar, textvariable=cache_var).pack(side=tk.RIGHT, padx=10)
+
+        columns = ("name", "speed", "fps", "bitrate", "size", "drop", "dup", "input")
+        stats_tree = ttk.Treeview(stats_window, columns=columns, show="headings")
+        headings = {
+            "name": ("Kanal", 120), "speed": ("Hız", 60), "fps": ("FPS", 60), "bitrate": ("Bitrate", 100),
+            "size": ("Çıktı Boyutu", 90), "drop": ("Düşen Kare", 80), "dup": ("Tekrar Kare", 80),
+            "input": ("Girdi Dosyası", 300)
+        }
+        for column, (text, width) in headings.items():
+            stats_tree.heading(column, text=text)
+            stats_tree.column(column, width=width)
+        stats_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def refresh():
+            if not stats_window.winfo_exists():
+                return
+            stats_tree.delete(*stats_tree.get_children())
+            if self.runner.segment_cache is not None:
+                cache = self.runner.segment_cache.stats()
+                cache_var.set(f"Önbellek: %{cache['hit_ratio'] * 100:.1f} isabet, "
+                              f"{self.epg_generator.format_size(cache['bytes'])} / "
+                              f"{self.epg_generator.format_size(cache['max_bytes'])} ({cache['entries']} dosya)")
+            for channel_name, sample in sorted(self.telemetry.snapshot().items()):
+                if not sample:
+                    stats_tree.insert("", "end", values=(channel_name, "-", "-", "-", "-", "-", "-", "-"))
+                    continue
+                stats_tree.insert("", "end", values=(
+                    channel_name,
+                    f"{sample['speed']:.2f}x" if sample["speed"] is not None else "N/A",
+                    f"{sample['fps']:.1f}" if sample["fps"] is not None else "N/A",
+                    f"{sample['bitrate_kbps']:.0f} kbit/s" if sample["bitrate_kbps"] is not None else "N/A",
+                    self.epg_generator.format_size(sample["total_size"]),
+                    sample["drop_frames"],
+                    sample["dup_frames"],
+                    os.path.basename(sample["input_file"])
+                ))
+            stats_window.after(2000, refresh)
+
+        refresh()
+
+    def export_encoder_stats(self):
+        """Telemetri zaman serisini dosyaya aktar"""
+        file_path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="İstatistikleri Dışa Aktar",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")]
+        )
+        if not file_path:
+            return
+        try:
+            self.telemetry.export(file_path)
+            self.status_var.set(f"Kodlayıcı istatistikleri kaydedildi: {file_path}")
+        except Exception as e:
+            logger.error(f"İstatistikler dışa aktarılamadı: {str(e)}")
+            messagebox.showerror("Hata", f"İstatistikler dışa aktarılamadı: {str(e)}")
+
     # Yeni metot: Hata günlüğü gösterme
     def show_error_log(self):
-        """Hata günlüğü dosyasını göster"""
-        if os.path.exists(log_file):
-            log_window = tk.Toplevel(self.root)
-            log_window.title("Hata Günlüğü")
-            log_window.geometry("800x600")
-            
-            # Araç çubuğu
-            toolbar = ttk.Frame(log_window)
-            toolbar.pack(side=tk.TOP, fill=tk.X)
-            
-            refresh_btn = ttk.Button(toolbar, text="Yenile", command=lambda: self.load_log_file(log_text))
-            refresh_btn.pack(side=tk.LEFT, padx=5, pady=5)
-            
-            copy_btn = ttk.Button(toolbar, text="Kopyala", 
-                                 command=lambda: self.copy_log_to_clipboard(log_text))
-            copy_btn.pack(side=tk.LEFT, padx=5, pady=5)
-            
-            open_btn = ttk.Button(toolbar, text="Log Klasörünü Aç", 
-                                 command=lambda: os.startfile(log_dir))
-            open_btn.pack(side=tk.LEFT, padx=5, pady=5)
-            
-            # Log içeriği için metin alanı
-            frame = ttk.Frame(log_window)
-            frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            scrollbar = ttk.Scrollbar(frame)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            log_text = tk.Text(frame, wrap=tk.WORD, yscrollcommand=scrollbar.set)
-            log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            scrollbar.config(command=log_text.yview)
-            
-            # Log dosyasını yükle
-            self.load_log_file(log_text)
-            
-            # Durumu göster
-            status_bar = ttk.Label(log_window, text=f"Log dosyası: {log_file}", relief=tk.SUNKEN, anchor=tk.W)
-            status_bar.pack(side=tk.BOTTOM, fill=tk.X)
-        else:
+        """Hata günlüğünü göster: dosyanın yalnızca son kısmı okunur, yeni satırlar izlenir"""
+        if not os.path.exists(log_file):
             messagebox.showinfo("Bilgi", "Henüz bir hata günlüğü oluşturulmamış.")
+            return
+        
+        log_window = tk.Toplevel(self.root)
+        log_window.title("Hata Günlüğü")
+        log_window.geometry("900x600")
+        
+        # Okunan bölümün bayt ofsetleri: start'tan öncesi "Daha Eski" ile, end'den sonrası takiple okunur
+        view = {"start": 0, "end": 0}
+        level_var = tk.StringVar(value="TÜMÜ")
+        channel_var = tk.StringVar()
+        follow_var = tk.BooleanVar(value=True)
+        
+        # Araç çubuğu
+        toolbar = ttk.Frame(log_window)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
+        
+        ttk.Label(toolbar, text="Seviye:").pack(side=tk.LEFT, padx=(5, 2), pady=5)
+        level_combo = ttk.Combobox(toolbar, textvariable=level_var, values=("TÜMÜ",) + LOG_LEVELS[1:],
+                                   width=9, state="readonly")
+        level_combo.pack(side=tk.LEFT, pady=5)
+        
+        ttk.Label(toolbar, text="Kanal:").pack(side=tk.LEFT, padx=(10, 2), pady=5)
+        channel_combo = ttk.Combobox(toolbar, textvariable=channel_var, width=18,
+                                     values=[channel["name"] for channel in self.channels])
+        channel_combo.pack(side=tk.LEFT, pady=5)
+        
+        ttk.Checkbutton(toolbar, text="Takip Et", variable=follow_var).pack(side=tk.LEFT, padx=10, pady=5)
+        
+        # Log içeriği için metin alanı
+        frame = ttk.Frame(log_window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        scrollbar = ttk.Scrollbar(frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        log_text = tk.Text(frame, wrap=tk.WORD, yscrollcommand=scrollbar.set)
+        log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=log_text.yview)
+        
+        status_bar = ttk.Label(log_window, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        def read(**offsets):
+            level = level_var.get()
+            return read_log_window(log_file, level=None if level == "TÜMÜ" else level,
+                                   channel=channel_var.get().strip() or None, **offsets)
+        
+        def update_status():
+            status_bar.config(text=f"Log dosyası: {log_file} - gösterilen bölüm: "
+                                   f"{view['start'] // 1024}-{view['end'] // 1024} KB")
+        
+        def reload(event=None):
+            try:
+                window = read()
+            except OSError as e:
+                logger.error(f"Log dosyası yüklenemedi: {str(e)}")
+                log_text.delete(1.0, tk.END)
+                log_text.insert(tk.END, f"Hata: Log dosyası yüklenemedi! {str(e)}")
+                return
+            view.update(start=window["start"], end=window["end"])
+            log_text.delete(1.0, tk.END)
+            self.insert_log_records(log_text, tk.END, window["records"])
+            log_text.see(tk.END)
+            update_status()
+        
+        def load_older():
+            if view["start"] <= 0:
+                self.status_var.set("Günlüğün başına ulaşıldı")
+                return
+            try:
+                window = read(before=view["start"])
+            except OSError as e:
+                logger.error(f"Log dosyası okunamadı: {str(e)}")
+                return
+            view["start"] = window["start"]
+            self.insert_log_records(log_text, "1.0", window["records"])
+            update_status()
+        
+        def follow():
+            if not log_window.winfo_exists():
+                return
+            try:
+                if follow_var.get():
+                    window = read(after=view["end"])
+                    if window["end"] < view["end"]:
+                        # Dosya kesildi ya da döndürüldü
+                        log_text.delete(1.0, tk.END)
+                        view["start"] = window["start"]
+                    view["end"] = window["end"]
+                    if window["records"]:
+                        self.insert_log_records(log_text, tk.END, window["records"])
+                        # Bellek sınırlı kalsın: en eski satırlar atılır ("Daha Eski" ile yeniden okunamaz)
+                        lines = int(log_text.index("end-1c").split(".")[0])
+                        if lines > self.log_viewer_lines:
+                            log_text.delete("1.0", f"{lines - self.log_viewer_lines + 1}.0")
+                        log_text.see(tk.END)
+                        update_status()
+            except OSError as e:
+                logger.error(f"Log dosyası izlenemedi: {str(e)}")
+            log_window.after(1000, follow)
+        
+        ttk.Button(toolbar, text="Daha Eski", command=load_older).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(toolbar, text="Yenile", command=reload).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(toolbar, text="Kopyala",
+                   command=lambda: self.copy_log_to_clipboard(log_text)).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(toolbar, text="Log Klasörünü Aç",
+                   command=lambda: os.startfile(log_dir)).pack(side=tk.LEFT, padx=5, pady=5)
+        
+        # Süzgeç değişince son bölüm süzülerek yeniden okunur
+        level_combo.bind("<<ComboboxSelected>>", reload)
+        channel_combo.bind("<<ComboboxSelected>>", reload)
+        channel_combo.bind("<Return>", reload)
+        
+        reload()
+        log_window.after(1000, follow)
     
-    def load_log_file(self, text_widget):
-        """Log dosyasını oku ve metin alanına yükle"""
-        text_widget.delete(1.0, tk.END)
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                text_widget.insert(tk.END, content)
-                # Sona kaydır
-                text_widget.see(tk.END)
-        except Exception as e:
-            logger.error(f"Log dosyası yüklenemedi: {str(e)}")
-            text_widget.insert(tk.END, f"Hata: Log dosyası yüklenemedi! {str(e)}")
+    def insert_log_records(self, text_widget, index, records):
+        """Günlük kayıtlarını metin alanına tek seferde ekle"""
+        if records:
+            text_widget.insert(index, "\n".join(records) + "\n")
     
     def copy_log_to_clipboard(self, text_widget):
         """Log içeriğini panoya kopyala"""
@@ -2275,6 +6786,38 @@ C: Evet, program kapatıldığında tüm yayınlar otomatik olarak durdurulur.
 # Ana uygulama çalıştırma fonksiyonu
 def main():
     """Ana uygulama fonksiyonu"""
+    # Günlük ayarları yapılandırmanın "logging" anahtarından okunur; her süreç türü kendi
+    # dosyasına yazar, böylece döndürme işlemleri çakışmaz
+    argv = sys.argv[1:]
+    try:
+        log_options = load_config_file(argv_option(argv, "--config", CONFIG_FILE)).get("logging")
+    except (OSError, ValueError):
+        log_options = None
+    # Alt komut genel seçeneklerden (--config <dosya>) sonra gelebilir
+    role = next((arg for index, arg in enumerate(argv)
+                 if not arg.startswith("-") and (index == 0 or argv[index - 1] != "--config")), "")
+    log_name = {"worker": "iptv_worker", "http-child": argv_option(argv, "--log-name", "iptv_http"),
+                "serve": "iptv_serve", "": "iptv_manager"}.get(role, "iptv_cli")
+    # Kısa komutlar aynı anda çalışabilir; ortak dosyaları döndürülmez, yalnızca sona eklenir
+    rotate = log_name != "iptv_cli"
+    try:
+        setup_logging(log_options, log_name, rotate)
+    except (TypeError, ValueError, AttributeError) as e:
+        setup_logging(None, log_name, rotate)
+        logger.warning(f"Geçersiz günlük ayarları, varsayılanlar kullanılıyor: {str(e)}")
+    logger.info("IPTV Manager başlatılıyor...")
+
+    # Başsız çalışan modu: python iptv_manager.py worker --port 9101
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        run_worker(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "http-child":
+        run_http_child(sys.argv[2:])
+        return
+    # Arayüzsüz servis ve komutlar: serve, start-channel, stop-channel, status, generate-epg, export-m3u
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    
     # Gereksinimleri kontrol et
     if not check_requirements():
         sys.exit(1)
@@ -2295,8 +6838,15 @@ def main():
     # Çıkışta kanalları durdur
     def on_closing():
         if messagebox.askokcancel("Çıkış", "Programdan çıkmak istediğinize emin misiniz?\nTüm kanallar durdurulacaktır."):
-            app.stop_all_channels()
-            root.destroy()
+            # Kanallar arka planda durdurulur, pencere o sırada yanıt vermeye devam eder
+            root.protocol("WM_DELETE_WINDOW", lambda: None)
+            app.status_var.set("Kanallar durduruluyor...")
+            
+            def finish():
+                app.config_store.flush()
+                root.destroy()
+            
+            app.close_channels(finish)
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
     